@@ -0,0 +1,271 @@
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_scoped_session, create_async_engine
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+
+from synthetic_graphs import GRAPH_BUILDERS, create_keychain_factory
+from updater import helpers
+from updater.updatable_item import AbstractAsyncUpdatableItem, AbstractSyncUpdatableItem
+from updater.update_datetime_memento.update_datetime_db_repository import \
+    AsyncUpdateDatetimeDBRepository, \
+    UpdateDatetimeDBRecord, \
+    UpdateDatetimeDBRepository
+from updater.update_datetime_memento.update_datetime_memento import \
+    AsyncUpdateDatetimeMementoWithDBRepo, \
+    InMemoryUpdateDatetimeMemento, \
+    UpdateDatetimeMementoWithDBRepo
+from updater.updater_service.async_updater_service import AsyncUpdaterService
+from updater.updater_service.sync_updater_service import SyncUpdaterService
+
+DEFAULT_BASELINE_PATH = Path(__file__).with_name("baseline.json")
+UPDATE_INTERVAL = timedelta(hours=1)
+
+
+class NoopSyncUpdatableItem(AbstractSyncUpdatableItem):
+
+    def _run_update(self) -> None:
+        pass
+
+
+class NoopAsyncUpdatableItem(AbstractAsyncUpdatableItem):
+
+    async def _run_update(self) -> None:
+        pass
+
+
+class _StopSyncServiceAfterCycle:
+
+    def __init__(self) -> None:
+        self.service: Optional[SyncUpdaterService] = None
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.service.stop_service()
+
+
+class _StopAsyncServiceAfterCycle:
+
+    def __init__(self) -> None:
+        self.service: Optional[AsyncUpdaterService] = None
+
+    async def __aenter__(self) -> None:
+        pass
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.service.stop_service()
+
+
+def measure(function: Callable[[], None], setup: Callable[[], None], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        setup()
+        start_time = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start_time)
+    return min(timings)
+
+
+def run_helpers_benchmarks(shape: str, items_count: int, repeat: int) -> Dict[str, float]:
+    root = GRAPH_BUILDERS[shape](items_count, create_keychain_factory(UPDATE_INTERVAL))
+    update_start_datetime = datetime.now(tz=timezone.utc)
+
+    def warm_up_graph() -> None:
+        root.get_dependency_graph()
+
+    def outdate_graph() -> None:
+        root.set_dependencies(root.get_dependencies())
+
+    return {
+        "dependency_graph_build": measure(root.get_dependency_graph, outdate_graph, repeat),
+        "get_dependencies_list": measure(lambda: helpers.get_dependencies_list(root), warm_up_graph, repeat),
+        "is_need_update_item": measure(
+            lambda: helpers.is_need_update_item(root, update_start_datetime),
+            warm_up_graph,
+            repeat
+        ),
+        "calc_next_update_datetime": measure(lambda: helpers.calc_next_update_datetime(root), warm_up_graph, repeat),
+    }
+
+
+def run_sync_service_cycle(root: AbstractSyncUpdatableItem) -> float:
+    stop_context = _StopSyncServiceAfterCycle()
+    updater_service = SyncUpdaterService(root, update_cycle_contexts=[stop_context])
+    stop_context.service = updater_service
+    start_time = time.perf_counter()
+    updater_service.start_service()
+    updater_service.join()
+    return time.perf_counter() - start_time
+
+
+async def run_async_service_cycle(root: AbstractAsyncUpdatableItem) -> float:
+    stop_context = _StopAsyncServiceAfterCycle()
+    updater_service = AsyncUpdaterService(root, update_cycle_contexts=[stop_context])
+    stop_context.service = updater_service
+    start_time = time.perf_counter()
+    await updater_service.start_service()
+    await updater_service.join()
+    return time.perf_counter() - start_time
+
+
+def run_sync_service_benchmark(shape: str, items_count: int, memento_kind: str, db_path: Path) -> float:
+    engine = None
+    if memento_kind == "sqlite":
+        engine = create_engine(f"sqlite:///{db_path}")
+        with engine.begin() as conn:
+            UpdateDatetimeDBRecord.metadata.drop_all(conn)
+            UpdateDatetimeDBRecord.metadata.create_all(conn)
+        session_factory = scoped_session(sessionmaker(autocommit=False, bind=engine, class_=Session))
+        repository = UpdateDatetimeDBRepository(session_factory)
+
+        def create_memento(item_number: int) -> UpdateDatetimeMementoWithDBRepo:
+            return UpdateDatetimeMementoWithDBRepo(session_factory, repository, f"item_{item_number}")
+    else:
+        def create_memento(_: int) -> InMemoryUpdateDatetimeMemento:
+            return InMemoryUpdateDatetimeMemento()
+
+    def create_item(item_number: int, dependencies: List[NoopSyncUpdatableItem]) -> NoopSyncUpdatableItem:
+        return NoopSyncUpdatableItem(
+            update_interval=UPDATE_INTERVAL,
+            dependencies=dependencies,
+            update_datetime_memento=create_memento(item_number)
+        )
+
+    root = GRAPH_BUILDERS[shape](items_count, create_item)
+    try:
+        return run_sync_service_cycle(root)
+    finally:
+        if engine is not None:
+            engine.dispose()
+
+
+async def run_async_service_benchmark(shape: str, items_count: int, memento_kind: str, db_path: Path) -> float:
+    engine = None
+    if memento_kind == "sqlite":
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        async with engine.begin() as conn:
+            await conn.run_sync(UpdateDatetimeDBRecord.metadata.drop_all)
+            await conn.run_sync(UpdateDatetimeDBRecord.metadata.create_all)
+        session_factory = async_scoped_session(
+            sessionmaker(bind=engine, class_=AsyncSession),
+            scopefunc=asyncio.current_task
+        )
+        repository = AsyncUpdateDatetimeDBRepository(session_factory)
+
+        def create_memento(item_number: int) -> AsyncUpdateDatetimeMementoWithDBRepo:
+            return AsyncUpdateDatetimeMementoWithDBRepo(session_factory, repository, f"item_{item_number}")
+    else:
+        def create_memento(_: int) -> InMemoryUpdateDatetimeMemento:
+            return InMemoryUpdateDatetimeMemento()
+
+    def create_item(item_number: int, dependencies: List[NoopAsyncUpdatableItem]) -> NoopAsyncUpdatableItem:
+        return NoopAsyncUpdatableItem(
+            update_interval=UPDATE_INTERVAL,
+            dependencies=dependencies,
+            update_datetime_memento=create_memento(item_number)
+        )
+
+    root = GRAPH_BUILDERS[shape](items_count, create_item)
+    try:
+        return await run_async_service_cycle(root)
+    finally:
+        if engine is not None:
+            await engine.dispose()
+
+
+def run_service_benchmarks(shape: str, items_count: int, repeat: int, db_dir: Path) -> Dict[str, float]:
+    results = {}
+    for memento_kind in ("memory", "sqlite"):
+        db_path = db_dir / f"{shape}_{items_count}_{memento_kind}.sqlite"
+        results[f"sync_service_cycle_{memento_kind}"] = min(
+            run_sync_service_benchmark(shape, items_count, memento_kind, db_path) for _ in range(repeat)
+        )
+        results[f"async_service_cycle_{memento_kind}"] = min(
+            asyncio.run(run_async_service_benchmark(shape, items_count, memento_kind, db_path))
+            for _ in range(repeat)
+        )
+    return results
+
+
+def run_benchmarks(sizes: List[int], service_sizes: List[int], repeat: int) -> Dict[str, float]:
+    results = {}
+    with tempfile.TemporaryDirectory() as db_dir:
+        for shape in GRAPH_BUILDERS:
+            for items_count in sizes:
+                for benchmark_name, duration in run_helpers_benchmarks(shape, items_count, repeat).items():
+                    results[f"{benchmark_name}[{shape}-{items_count}]"] = duration
+                    print(f"{benchmark_name}[{shape}-{items_count}]: {duration:.6f}s", flush=True)
+            for items_count in service_sizes:
+                service_results = run_service_benchmarks(shape, items_count, repeat, Path(db_dir))
+                for benchmark_name, duration in service_results.items():
+                    results[f"{benchmark_name}[{shape}-{items_count}]"] = duration
+                    print(f"{benchmark_name}[{shape}-{items_count}]: {duration:.6f}s", flush=True)
+    return results
+
+
+def compare_with_baseline(results: Dict[str, float],
+                          baseline: Dict[str, float],
+                          tolerance: float,
+                          min_slowdown: float
+                          ) -> List[str]:
+    regressions = []
+    for benchmark_key, duration in results.items():
+        baseline_duration = baseline.get(benchmark_key)
+        if baseline_duration is None or baseline_duration <= 0:
+            continue
+        ratio = duration / baseline_duration
+        if ratio > 1 + tolerance and duration - baseline_duration > min_slowdown:
+            regressions.append(f"{benchmark_key}: {duration:.6f}s vs baseline {baseline_duration:.6f}s (x{ratio:.2f})")
+    return regressions
+
+
+def parse_sizes(sizes: str) -> List[int]:
+    return [int(size) for size in sizes.split(",") if size]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark updater scheduler and storage hot paths")
+    parser.add_argument("--sizes", type=parse_sizes, default=[10, 1000, 10000],
+                        help="comma separated graph sizes for helpers benchmarks, up to 100000")
+    parser.add_argument("--service-sizes", type=parse_sizes, default=[10, 1000],
+                        help="comma separated graph sizes for full service cycle benchmarks")
+    parser.add_argument("--repeat", type=int, default=5, help="repeats per benchmark, the best one is reported")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH, help="baseline results json")
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite baseline with current results")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed relative slowdown before a benchmark is reported as regression")
+    parser.add_argument("--min-slowdown", type=float, default=0.001,
+                        help="absolute slowdown in seconds below which timing noise is ignored")
+    arguments = parser.parse_args()
+
+    results = run_benchmarks(arguments.sizes, arguments.service_sizes, arguments.repeat)
+    if arguments.save_baseline:
+        arguments.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline is saved to {arguments.baseline}")
+        return 0
+    if not arguments.baseline.exists():
+        print(f"Baseline {arguments.baseline} does not exist, nothing to compare with")
+        return 0
+    regressions = compare_with_baseline(
+        results,
+        json.loads(arguments.baseline.read_text()),
+        arguments.tolerance,
+        arguments.min_slowdown
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
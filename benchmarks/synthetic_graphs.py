@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, TypeVar
+
+from updater.update_keychain import UpdateKeychain
+
+ItemT = TypeVar("ItemT", bound=UpdateKeychain)
+ItemFactory = Callable[[int, List[ItemT]], ItemT]
+
+
+def create_keychain_factory(update_interval: timedelta = timedelta(hours=1)) -> ItemFactory:
+    last_update_datetime = datetime.now(tz=timezone.utc)
+
+    def create_keychain(item_number: int, dependencies: List[UpdateKeychain]) -> UpdateKeychain:
+        keychain = UpdateKeychain(update_interval=update_interval, dependencies=dependencies)
+        keychain.set_last_update_datetime(last_update_datetime + timedelta(microseconds=item_number))
+        return keychain
+
+    return create_keychain
+
+
+def build_chain(items_count: int, item_factory: ItemFactory) -> ItemT:
+    item = item_factory(0, [])
+    for item_number in range(1, items_count):
+        item = item_factory(item_number, [item])
+    return item
+
+
+def build_fan(items_count: int, item_factory: ItemFactory) -> ItemT:
+    leaves = [item_factory(item_number, []) for item_number in range(1, items_count)]
+    return item_factory(items_count, leaves)
+
+
+def build_diamonds(items_count: int, item_factory: ItemFactory) -> ItemT:
+    item_number = 0
+    item = item_factory(item_number, [])
+    while item_number + 3 < items_count:
+        left = item_factory(item_number + 1, [item])
+        right = item_factory(item_number + 2, [item])
+        item = item_factory(item_number + 3, [left, right])
+        item_number += 3
+    return item
+
+
+GRAPH_BUILDERS: Dict[str, Callable[[int, ItemFactory], UpdateKeychain]] = {
+    "chain": build_chain,
+    "fan": build_fan,
+    "diamonds": build_diamonds,
+}
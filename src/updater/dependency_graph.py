@@ -0,0 +1,100 @@
+from typing import Dict, FrozenSet, Iterable, List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from updater.update_keychain import UpdateKeychain
+
+
+class DependencyGraph:
+
+    def __init__(self, roots: Iterable['UpdateKeychain']) -> None:
+        self._roots: Tuple['UpdateKeychain', ...] = tuple(dict.fromkeys(roots))
+        self._is_outdated = False
+        self._items: Tuple['UpdateKeychain', ...] = ()
+        self._item_index: Dict['UpdateKeychain', int] = {}
+        self._dependencies: Dict['UpdateKeychain', Tuple['UpdateKeychain', ...]] = {}
+        self._dependents: Dict['UpdateKeychain', Tuple['UpdateKeychain', ...]] = {}
+        self._ancestors: Dict['UpdateKeychain', FrozenSet['UpdateKeychain']] = {}
+        self._compile()
+
+    def __contains__(self, item: 'UpdateKeychain') -> bool:
+        return item in self._item_index
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get_roots(self) -> Tuple['UpdateKeychain', ...]:
+        return self._roots
+
+    def is_outdated(self) -> bool:
+        return self._is_outdated
+
+    def mark_outdated(self) -> None:
+        self._is_outdated = True
+
+    def get_items(self) -> Tuple['UpdateKeychain', ...]:
+        return self._items
+
+    def get_item_index(self, item: 'UpdateKeychain') -> int:
+        return self._item_index[item]
+
+    def get_dependencies(self, item: 'UpdateKeychain') -> Tuple['UpdateKeychain', ...]:
+        return self._dependencies[item]
+
+    def get_dependents(self, item: 'UpdateKeychain') -> Tuple['UpdateKeychain', ...]:
+        return self._dependents[item]
+
+    def get_ancestors(self, item: 'UpdateKeychain') -> FrozenSet['UpdateKeychain']:
+        ancestors = self._ancestors.get(item)
+        if ancestors is None:
+            ancestors = self._collect_ancestors(item)
+            self._ancestors[item] = ancestors
+        return ancestors
+
+    def get_ordered_ancestors(self, item: 'UpdateKeychain') -> List['UpdateKeychain']:
+        return sorted(self.get_ancestors(item), key=self._item_index.__getitem__)
+
+    def _compile(self) -> None:
+        items = []
+        dependents: Dict['UpdateKeychain', List['UpdateKeychain']] = {}
+        entered = set()
+        for root in self._roots:
+            if root in entered:
+                continue
+            entered.add(root)
+            root.attach_dependency_graph(self)
+            stack = [(root, iter(root.get_dependencies()))]
+            while stack:
+                item, dependencies_iterator = stack[-1]
+                for dependency in dependencies_iterator:
+                    if dependency not in entered:
+                        entered.add(dependency)
+                        dependency.attach_dependency_graph(self)
+                        stack.append((dependency, iter(dependency.get_dependencies())))
+                        break
+                    if dependency not in self._item_index:
+                        raise ValueError(f"Dependency cycle detected at item {dependency}")
+                else:
+                    stack.pop()
+                    item_dependencies = tuple(dict.fromkeys(item.get_dependencies()))
+                    self._item_index[item] = len(items)
+                    self._dependencies[item] = item_dependencies
+                    dependents[item] = []
+                    for dependency in item_dependencies:
+                        dependents[dependency].append(item)
+                    items.append(item)
+        self._items = tuple(items)
+        self._dependents = {item: tuple(item_dependents) for item, item_dependents in dependents.items()}
+
+    def _collect_ancestors(self, item: 'UpdateKeychain') -> FrozenSet['UpdateKeychain']:
+        ancestors = set()
+        stack = list(self._dependencies[item])
+        while stack:
+            dependency = stack.pop()
+            if dependency not in ancestors:
+                ancestors.add(dependency)
+                cached_ancestors = self._ancestors.get(dependency)
+                if cached_ancestors is not None:
+                    ancestors.update(cached_ancestors)
+                else:
+                    stack.extend(self._dependencies[dependency])
+        return frozenset(ancestors)
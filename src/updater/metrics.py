@@ -0,0 +1,158 @@
+import bisect
+import threading
+from typing import Callable, Dict, Hashable, List, Sequence, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from updater.update_keychain import UpdateKeychain
+
+DEFAULT_DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0)
+
+
+class AbstractUpdaterMetricsHook:
+
+    def on_item_update(self, item: 'UpdateKeychain', duration: float, succeeded: bool) -> None:
+        raise NotImplementedError
+
+    def on_item_staleness_lag(self, item: 'UpdateKeychain', staleness_lag: float) -> None:
+        raise NotImplementedError
+
+    def on_update_cycle(self, duration: float) -> None:
+        raise NotImplementedError
+
+    def on_forced_items_queue_depth(self, queue_depth: int) -> None:
+        raise NotImplementedError
+
+    def on_memento_operation(self, memento_name: str, operation: str, duration: float) -> None:
+        raise NotImplementedError
+
+
+class _Histogram:
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self._buckets = buckets
+        self._bucket_counts = [0] * len(buckets)
+        self._sum = 0.0
+        self._count = 0
+
+    def observe(self, value: float) -> None:
+        bucket_index = bisect.bisect_left(self._buckets, value)
+        if bucket_index < len(self._buckets):
+            self._bucket_counts[bucket_index] += 1
+        self._sum += value
+        self._count += 1
+
+    def render(self, metric_name: str, labels: str) -> List[str]:
+        lines = []
+        cumulative_count = 0
+        for bucket, bucket_count in zip(self._buckets, self._bucket_counts):
+            cumulative_count += bucket_count
+            lines.append(f'{metric_name}_bucket{{{_join_labels(labels, f"le={_quote(repr(bucket))}")}}} '
+                         f'{cumulative_count}')
+        lines.append(f'{metric_name}_bucket{{{_join_labels(labels, "le=" + _quote("+Inf"))}}} {self._count}')
+        lines.append(f'{metric_name}_sum{_wrap_labels(labels)} {self._sum!r}')
+        lines.append(f'{metric_name}_count{_wrap_labels(labels)} {self._count}')
+        return lines
+
+
+class UpdaterMetrics(AbstractUpdaterMetricsHook):
+
+    def __init__(self,
+                 item_label_getter: Callable[['UpdateKeychain'], str] = lambda item: item.__class__.__name__,
+                 duration_buckets: Sequence[float] = DEFAULT_DURATION_BUCKETS,
+                 metrics_prefix: str = "updater"
+                 ) -> None:
+        self._item_label_getter = item_label_getter
+        self._duration_buckets = tuple(sorted(duration_buckets))
+        self._metrics_prefix = metrics_prefix
+        self._lock = threading.Lock()
+        self._item_update_durations: Dict[str, _Histogram] = {}
+        self._item_updates_counts: Dict[Tuple[str, str], int] = {}
+        self._item_staleness_lags: Dict[str, float] = {}
+        self._update_cycle_durations = _Histogram(self._duration_buckets)
+        self._forced_items_queue_depth = 0
+        self._memento_operation_durations: Dict[Tuple[str, str], _Histogram] = {}
+
+    def on_item_update(self, item: 'UpdateKeychain', duration: float, succeeded: bool) -> None:
+        item_label = self._item_label_getter(item)
+        result = "success" if succeeded else "failure"
+        with self._lock:
+            self._get_histogram(self._item_update_durations, item_label).observe(duration)
+            updates_count_key = (item_label, result)
+            self._item_updates_counts[updates_count_key] = self._item_updates_counts.get(updates_count_key, 0) + 1
+
+    def on_item_staleness_lag(self, item: 'UpdateKeychain', staleness_lag: float) -> None:
+        item_label = self._item_label_getter(item)
+        with self._lock:
+            self._item_staleness_lags[item_label] = staleness_lag
+
+    def on_update_cycle(self, duration: float) -> None:
+        with self._lock:
+            self._update_cycle_durations.observe(duration)
+
+    def on_forced_items_queue_depth(self, queue_depth: int) -> None:
+        self._forced_items_queue_depth = queue_depth
+
+    def on_memento_operation(self, memento_name: str, operation: str, duration: float) -> None:
+        with self._lock:
+            self._get_histogram(self._memento_operation_durations, (memento_name, operation)).observe(duration)
+
+    def get_item_updates_count(self, item: 'UpdateKeychain', succeeded: bool = True) -> int:
+        result = "success" if succeeded else "failure"
+        return self._item_updates_counts.get((self._item_label_getter(item), result), 0)
+
+    def render_prometheus_text(self) -> str:
+        prefix = self._metrics_prefix
+        lines = []
+        with self._lock:
+            lines.extend(_render_header(f"{prefix}_item_update_duration_seconds", "histogram",
+                                        "Duration of item updates"))
+            for item_label, histogram in sorted(self._item_update_durations.items()):
+                lines.extend(histogram.render(f"{prefix}_item_update_duration_seconds",
+                                              f"item={_quote(item_label)}"))
+            lines.extend(_render_header(f"{prefix}_item_updates_total", "counter",
+                                        "Count of item updates by result"))
+            for (item_label, result), updates_count in sorted(self._item_updates_counts.items()):
+                lines.append(f"{prefix}_item_updates_total"
+                             f"{{item={_quote(item_label)},result={_quote(result)}}} {updates_count}")
+            lines.extend(_render_header(f"{prefix}_item_staleness_lag_seconds", "gauge",
+                                        "Delay between item next update datetime and its last update start"))
+            for item_label, staleness_lag in sorted(self._item_staleness_lags.items()):
+                lines.append(f"{prefix}_item_staleness_lag_seconds{{item={_quote(item_label)}}} {staleness_lag!r}")
+            lines.extend(_render_header(f"{prefix}_update_cycle_duration_seconds", "histogram",
+                                        "Duration of update cycles"))
+            lines.extend(self._update_cycle_durations.render(f"{prefix}_update_cycle_duration_seconds", ""))
+            lines.extend(_render_header(f"{prefix}_forced_items_queue_depth", "gauge",
+                                        "Count of forced items taken by the last update cycle"))
+            lines.append(f"{prefix}_forced_items_queue_depth {self._forced_items_queue_depth}")
+            lines.extend(_render_header(f"{prefix}_memento_operation_duration_seconds", "histogram",
+                                        "Duration of update datetime memento operations"))
+            for (memento_name, operation), histogram in sorted(self._memento_operation_durations.items()):
+                lines.extend(histogram.render(f"{prefix}_memento_operation_duration_seconds",
+                                              f"memento={_quote(memento_name)},operation={_quote(operation)}"))
+        return "\n".join(lines) + "\n"
+
+    def _get_histogram(self, histograms: Dict[Hashable, _Histogram], key: Hashable) -> _Histogram:
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = _Histogram(self._duration_buckets)
+            histograms[key] = histogram
+        return histogram
+
+
+def _render_header(metric_name: str, metric_type: str, description: str) -> List[str]:
+    return [f"# HELP {metric_name} {description}", f"# TYPE {metric_name} {metric_type}"]
+
+
+def _quote(label_value: str) -> str:
+    escaped_label_value = label_value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return f'"{escaped_label_value}"'
+
+
+def _join_labels(*labels: str) -> str:
+    return ",".join(label for label in labels if label)
+
+
+def _wrap_labels(labels: str) -> str:
+    if not labels:
+        return ""
+    return f"{{{labels}}}"
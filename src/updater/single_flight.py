@@ -0,0 +1,71 @@
+import asyncio
+import threading
+from concurrent import futures
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SyncSingleFlight:
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, futures.Future] = {}
+
+    def __enter__(self) -> 'SyncSingleFlight':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.forget_done()
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = futures.Future()
+                self._flights[key] = flight
+        if not is_leader:
+            return flight.result()
+        try:
+            result = function()
+        except BaseException as exception:
+            flight.set_exception(exception)
+            raise
+        flight.set_result(result)
+        return result
+
+    def forget_done(self) -> None:
+        with self._lock:
+            self._flights = {key: flight for key, flight in self._flights.items() if not flight.done()}
+
+
+class AsyncSingleFlight:
+
+    def __init__(self) -> None:
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self._waiters_counts: Dict[asyncio.Future, int] = {}
+
+    def __enter__(self) -> 'AsyncSingleFlight':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.forget_done()
+
+    async def do(self, key: Hashable, coroutine_function: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(coroutine_function())
+            self._flights[key] = flight
+        self._waiters_counts[flight] = self._waiters_counts.get(flight, 0) + 1
+        try:
+            return await asyncio.shield(flight)
+        except asyncio.CancelledError:
+            if self._waiters_counts[flight] == 1:
+                flight.cancel()
+            raise
+        finally:
+            waiters_count = self._waiters_counts.pop(flight) - 1
+            if waiters_count:
+                self._waiters_counts[flight] = waiters_count
+
+    def forget_done(self) -> None:
+        self._flights = {key: flight for key, flight in self._flights.items() if not flight.done()}
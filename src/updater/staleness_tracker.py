@@ -0,0 +1,132 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from updater.dependency_graph import DependencyGraph
+from updater.update_keychain import UpdateKeychain
+from updater.update_timer_heap import UpdateTimerHeap
+
+
+class StalenessTracker:
+
+    def __init__(self,
+                 dependency_graph: DependencyGraph,
+                 previous_staleness_tracker: Optional[__qualname__] = None
+                 ) -> None:
+        self._dependency_graph = dependency_graph
+        self._unverified_items: Set[UpdateKeychain] = set(dependency_graph.get_items())
+        self._stale_items: Set[UpdateKeychain] = set()
+        self._failures_counts: Dict[UpdateKeychain, int] = {}
+        self._deferred_items: Set[UpdateKeychain] = set()
+        self._last_update_datetimes: Dict[UpdateKeychain, Optional[datetime]] = {}
+        self._update_timer_heap = UpdateTimerHeap()
+        if previous_staleness_tracker is not None:
+            self._take_over_state(previous_staleness_tracker)
+
+    def get_dependency_graph(self) -> DependencyGraph:
+        return self._dependency_graph
+
+    def pop_unverified_items(self) -> List[UpdateKeychain]:
+        unverified_items = self._sort_items(self._unverified_items)
+        self._unverified_items = set()
+        return unverified_items
+
+    def pop_expired_items(self, update_start_datetime: datetime) -> List[UpdateKeychain]:
+        expired_items = []
+        for item in self._update_timer_heap.pop_due_items(update_start_datetime):
+            if item in self._failures_counts:
+                self._stale_items.add(item)
+            else:
+                self._deferred_items.discard(item)
+                expired_items.append(item)
+        return self._sort_items(expired_items)
+
+    def schedule(self, item: UpdateKeychain, next_update_datetime: Optional[datetime]) -> None:
+        if next_update_datetime is None:
+            self._update_timer_heap.cancel(item)
+        else:
+            self._update_timer_heap.schedule(item, next_update_datetime)
+
+    def mark_stale(self, item: UpdateKeychain) -> None:
+        self._stale_items.add(item)
+        self._deferred_items.discard(item)
+        self._update_timer_heap.cancel(item)
+
+    def mark_deferred(self, item: UpdateKeychain, recheck_datetime: datetime) -> None:
+        self._stale_items.discard(item)
+        self._deferred_items.add(item)
+        self._update_timer_heap.schedule(item, recheck_datetime)
+
+    def mark_failed(self, item: UpdateKeychain, retry_datetime: datetime) -> None:
+        self._stale_items.discard(item)
+        self._failures_counts[item] = self._failures_counts.get(item, 0) + 1
+        self._update_timer_heap.schedule(item, retry_datetime)
+
+    def get_failures_count(self, item: UpdateKeychain) -> int:
+        return self._failures_counts.get(item, 0)
+
+    def is_stale(self, item: UpdateKeychain) -> bool:
+        return item in self._stale_items
+
+    def observe_last_update_datetime(self, item: UpdateKeychain, last_update_datetime: Optional[datetime]) -> None:
+        is_seen = item in self._last_update_datetimes
+        seen_last_update_datetime = self._last_update_datetimes.get(item)
+        self._last_update_datetimes[item] = last_update_datetime
+        if is_seen and last_update_datetime is not None and \
+                (seen_last_update_datetime is None or last_update_datetime > seen_last_update_datetime):
+            for dependent in self._dependency_graph.get_dependents(item):
+                self.mark_stale(dependent)
+
+    def mark_updated(self,
+                     item: UpdateKeychain,
+                     next_update_datetime: Optional[datetime],
+                     last_update_datetime: Optional[datetime] = None
+                     ) -> None:
+        if last_update_datetime is not None:
+            self._last_update_datetimes[item] = last_update_datetime
+        self._stale_items.discard(item)
+        self._failures_counts.pop(item, None)
+        self._deferred_items.discard(item)
+        self.schedule(item, next_update_datetime)
+        for dependent in self._dependency_graph.get_dependents(item):
+            self.mark_stale(dependent)
+
+    def get_items_to_update(self) -> Set[UpdateKeychain]:
+        waiting_items = [item for item in self._failures_counts if item not in self._stale_items]
+        waiting_items.extend(self._deferred_items)
+        blocked_items = self._collect_dependents(waiting_items, set())
+        return self._collect_dependents(self._stale_items - blocked_items, blocked_items)
+
+    def get_next_update_datetime(self) -> Optional[datetime]:
+        return self._update_timer_heap.peek_next_due_datetime()
+
+    def _take_over_state(self, previous_staleness_tracker: __qualname__) -> None:
+        previous_dependency_graph = previous_staleness_tracker.get_dependency_graph()
+        for item in self._dependency_graph.get_items():
+            if item not in previous_dependency_graph or item in previous_staleness_tracker._unverified_items:
+                continue
+            self._unverified_items.discard(item)
+            if item in previous_staleness_tracker._stale_items:
+                self._stale_items.add(item)
+            failures_count = previous_staleness_tracker._failures_counts.get(item)
+            if failures_count is not None:
+                self._failures_counts[item] = failures_count
+            if item in previous_staleness_tracker._deferred_items:
+                self._deferred_items.add(item)
+            if item in previous_staleness_tracker._last_update_datetimes:
+                self._last_update_datetimes[item] = previous_staleness_tracker._last_update_datetimes[item]
+            next_update_datetime = previous_staleness_tracker._update_timer_heap.get_due_datetime(item)
+            if next_update_datetime is not None:
+                self._update_timer_heap.schedule(item, next_update_datetime)
+
+    def _collect_dependents(self, items, excluded_items: Set[UpdateKeychain]) -> Set[UpdateKeychain]:
+        collected_items = set()
+        items_to_visit = list(items)
+        while items_to_visit:
+            item = items_to_visit.pop()
+            if item not in collected_items and item not in excluded_items:
+                collected_items.add(item)
+                items_to_visit.extend(self._dependency_graph.get_dependents(item))
+        return collected_items
+
+    def _sort_items(self, items) -> List[UpdateKeychain]:
+        return sorted(items, key=self._dependency_graph.get_item_index)
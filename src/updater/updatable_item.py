@@ -1,7 +1,10 @@
-from datetime import datetime, timezone
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 from updater.logging import logger
 from updater.update_keychain import UpdateKeychain
+from updater.update_lease import AbstractAsyncUpdateLease, UpdateLeaseIsHeldError
 
 
 class AbstractUpdatableItem(UpdateKeychain):
@@ -9,17 +12,67 @@ class AbstractUpdatableItem(UpdateKeychain):
     def _set_last_update_datetime_to_now(self) -> None:
         datetime_now = datetime.now(tz=timezone.utc)
         self.set_last_update_datetime(datetime_now)
-        logger.debug(f"Last update datetime is set to {datetime_now}")
+        logger.debug("Last update datetime is set to %s", datetime_now)
+
+    async def _async_set_last_update_datetime_to_now(self) -> None:
+        datetime_now = datetime.now(tz=timezone.utc)
+        await self.async_set_last_update_datetime(datetime_now)
+        logger.debug("Last update datetime is set to %s", datetime_now)
+
+    def _observe_update_result(self, changed: Optional[bool]) -> None:
+        if changed is not None:
+            self.get_update_interval_policy().on_update(changed)
+
+    def _raise_update_lease_is_held(self) -> None:
+        recheck_datetime = datetime.now(tz=timezone.utc) + self.get_update_lease().get_recheck_interval()
+        logger.debug("Update lease is held by another updater, recheck at %s", recheck_datetime)
+        raise UpdateLeaseIsHeldError(recheck_datetime)
 
 
 class AbstractAsyncUpdatableItem(AbstractUpdatableItem):
 
+    def __init__(self,
+                 *args,
+                 update_timeout: Optional[timedelta] = None,
+                 **kwargs
+                 ) -> None:
+        super().__init__(*args, **kwargs)
+        self._update_timeout = update_timeout
+
     async def update(self) -> None:
         logger.debug("Updating")
-        await self._run_update()
-        self._set_last_update_datetime_to_now()
+        update_lease = self.get_update_lease()
+        if update_lease is not None:
+            await self._claim_update_lease()
+        try:
+            if self._update_timeout is None:
+                changed = await self._run_update()
+            else:
+                changed = await asyncio.wait_for(self._run_update(), timeout=self._update_timeout.total_seconds())
+            self._observe_update_result(changed)
+            await self._async_set_last_update_datetime_to_now()
+        finally:
+            if update_lease is not None:
+                await self._release_update_lease()
+
+    async def _claim_update_lease(self) -> None:
+        update_lease = self.get_update_lease()
+        last_update_datetime = await self.async_get_last_update_datetime()
+        if isinstance(update_lease, AbstractAsyncUpdateLease):
+            claimed = await update_lease.try_claim(last_update_datetime)
+        else:
+            claimed = update_lease.try_claim(last_update_datetime)
+        if not claimed:
+            self._raise_update_lease_is_held()
+
+    async def _release_update_lease(self) -> None:
+        update_lease = self.get_update_lease()
+        if isinstance(update_lease, AbstractAsyncUpdateLease):
+            await update_lease.release()
+        else:
+            update_lease.release()
 
-    async def _run_update(self) -> None:
+    async def _run_update(self) -> Optional[bool]:
         raise NotImplementedError
 
 
@@ -27,8 +80,19 @@ class AbstractSyncUpdatableItem(AbstractUpdatableItem):
 
     def update(self) -> None:
         logger.debug("Updating")
-        self._run_update()
-        self._set_last_update_datetime_to_now()
+        update_lease = self.get_update_lease()
+        if update_lease is not None:
+            if isinstance(update_lease, AbstractAsyncUpdateLease):
+                raise TypeError("Async update lease can be used only with async updatable item")
+            if not update_lease.try_claim(self.get_last_update_datetime()):
+                self._raise_update_lease_is_held()
+        try:
+            changed = self._run_update()
+            self._observe_update_result(changed)
+            self._set_last_update_datetime_to_now()
+        finally:
+            if update_lease is not None:
+                update_lease.release()
 
-    def _run_update(self) -> None:
+    def _run_update(self) -> Optional[bool]:
         raise NotImplementedError
@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import Optional
+
+
+class AbstractUpdateCycleContext:
+
+    def __enter__(self) -> 'AbstractUpdateCycleContext':
+        raise NotImplementedError
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        raise NotImplementedError
+
+    def get_next_wake_up_datetime(self) -> Optional[datetime]:
+        return None
+
+    def on_service_stop(self) -> None:
+        pass
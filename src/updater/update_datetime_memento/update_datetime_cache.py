@@ -0,0 +1,59 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Hashable, Optional, OrderedDict, Tuple, Union
+
+_MISSING = object()
+
+
+class UpdateDatetimeLRUCache:
+
+    def __init__(self,
+                 max_size: Optional[int] = None,
+                 ttl: Optional[timedelta] = None,
+                 clock: Callable[[], float] = time.monotonic
+                 ) -> None:
+        if max_size is not None and max_size < 1:
+            raise ValueError(f"Cache max size must be positive, got {max_size}")
+        self._max_size = max_size
+        self._ttl_seconds = None if ttl is None else ttl.total_seconds()
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, Tuple[Optional[datetime], Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Union[datetime, None, object]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            update_datetime, expiry_time = entry
+            if expiry_time is not None and self._clock() >= expiry_time:
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return update_datetime
+
+    def put(self, key: Hashable, update_datetime: Optional[datetime]) -> None:
+        expiry_time = None
+        if self._ttl_seconds is not None:
+            expiry_time = self._clock() + self._ttl_seconds
+        with self._lock:
+            self._entries[key] = (update_datetime, expiry_time)
+            self._entries.move_to_end(key)
+            if self._max_size is not None and len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def is_cache_miss(value: Union[datetime, None, object]) -> bool:
+    return value is _MISSING
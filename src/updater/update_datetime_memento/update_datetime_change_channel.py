@@ -0,0 +1,85 @@
+import os
+import threading
+import uuid
+from typing import Iterable, List, Optional
+
+from updater.logging import logger
+from updater.update_datetime_memento.update_datetime_cache import UpdateDatetimeLRUCache
+
+
+class AbstractUpdateDatetimeChangeChannel:
+
+    def publish(self, record_names: Iterable[str]) -> None:
+        raise NotImplementedError
+
+    def poll(self) -> List[str]:
+        raise NotImplementedError
+
+
+class FileUpdateDatetimeChangeChannel(AbstractUpdateDatetimeChangeChannel):
+
+    def __init__(self, path: str, publisher_id: Optional[str] = None) -> None:
+        if publisher_id is None:
+            publisher_id = uuid.uuid4().hex
+        if " " in publisher_id:
+            raise ValueError(f"Publisher id must not contain spaces, got {publisher_id!r}")
+        self._path = path
+        self._publisher_id = publisher_id
+        self._read_offset = self._get_file_size()
+        self._lock = threading.Lock()
+
+    def publish(self, record_names: Iterable[str]) -> None:
+        lines = "".join(f"{self._publisher_id} {record_name}\n" for record_name in record_names)
+        if not lines:
+            return
+        file_descriptor = os.open(self._path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(file_descriptor, lines.encode())
+        finally:
+            os.close(file_descriptor)
+
+    def poll(self) -> List[str]:
+        with self._lock:
+            if self._get_file_size() <= self._read_offset:
+                return []
+            with open(self._path, "rb") as changes_file:
+                changes_file.seek(self._read_offset)
+                changes = changes_file.read()
+            complete_changes_length = changes.rfind(b"\n") + 1
+            self._read_offset += complete_changes_length
+        changed_record_names = []
+        for line in changes[:complete_changes_length].decode().splitlines():
+            publisher_id, record_name = line.split(" ", 1)
+            if publisher_id != self._publisher_id:
+                changed_record_names.append(record_name)
+        return changed_record_names
+
+    def _get_file_size(self) -> int:
+        try:
+            return os.path.getsize(self._path)
+        except FileNotFoundError:
+            return 0
+
+
+class UpdateDatetimeCacheInvalidator:
+
+    def __init__(self,
+                 cache: UpdateDatetimeLRUCache,
+                 change_channel: AbstractUpdateDatetimeChangeChannel
+                 ) -> None:
+        self._cache = cache
+        self._change_channel = change_channel
+
+    def __enter__(self) -> 'UpdateDatetimeCacheInvalidator':
+        self.invalidate_changed()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        pass
+
+    def invalidate_changed(self) -> None:
+        changed_record_names = self._change_channel.poll()
+        if changed_record_names:
+            logger.debug("Invalidating %s changed update datetimes", len(changed_record_names))
+        for record_name in changed_record_names:
+            self._cache.invalidate(record_name)
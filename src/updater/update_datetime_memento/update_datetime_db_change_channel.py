@@ -0,0 +1,38 @@
+import threading
+from typing import Iterable, List, Optional
+
+from sqlalchemy.orm import scoped_session
+from updater.update_datetime_memento.update_datetime_change_channel import AbstractUpdateDatetimeChangeChannel
+from updater.update_datetime_memento.update_datetime_db_repository import UpdateDatetimeDBRepository
+from updater.update_datetime_memento.update_datetime_db_session_scope import is_session_scope_active
+
+
+class DBRevisionUpdateDatetimeChangeChannel(AbstractUpdateDatetimeChangeChannel):
+
+    def __init__(self,
+                 db_session_factory: scoped_session,
+                 update_datetime_repository: UpdateDatetimeDBRepository,
+                 remove_session_after_use: bool = True
+                 ) -> None:
+        if not update_datetime_repository.is_tracking_revisions():
+            raise ValueError("Update datetime repository must be created with track_revisions=True")
+        self._session_factory = db_session_factory
+        self._repository = update_datetime_repository
+        self._remove_session_after_use = remove_session_after_use
+        self._revision: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def publish(self, record_names: Iterable[str]) -> None:
+        pass
+
+    def poll(self) -> List[str]:
+        with self._lock:
+            with self._session_factory.begin():
+                if self._revision is None:
+                    self._revision = self._repository.get_revision()
+                    changed_updates_datetime = {}
+                else:
+                    self._revision, changed_updates_datetime = self._repository.get_changed_since(self._revision)
+            if self._remove_session_after_use and not is_session_scope_active(self._session_factory):
+                self._session_factory.remove()
+        return list(changed_updates_datetime)
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import async_scoped_session
+from sqlalchemy.orm import scoped_session
+from updater.update_datetime_memento.update_datetime_db_repository import \
+    AsyncUpdateDatetimeDBRepository, \
+    UpdateDatetimeDBRepository
+from updater.update_datetime_memento.update_datetime_db_session_scope import \
+    begin_async_session, \
+    is_session_scope_active
+from updater.update_lease import AbstractAsyncUpdateLease, AbstractUpdateLease
+
+
+class UpdateDatetimeDBLease(AbstractUpdateLease):
+
+    def __init__(self,
+                 db_session_factory: scoped_session,
+                 update_datetime_repository: UpdateDatetimeDBRepository,
+                 record_name: str,
+                 lease_owner: str,
+                 lease_duration: timedelta = timedelta(minutes=5),
+                 recheck_interval: timedelta = timedelta(seconds=1),
+                 remove_session_after_use: bool = True
+                 ) -> None:
+        self._session_factory = db_session_factory
+        self._repository = update_datetime_repository
+        self._record_name = record_name
+        self._lease_owner = lease_owner
+        self._lease_duration = lease_duration
+        self._recheck_interval = recheck_interval
+        self._remove_session_after_use = remove_session_after_use
+
+    def try_claim(self, last_update_datetime: Optional[datetime]) -> bool:
+        with self._session_factory.begin():
+            claimed = self._repository.try_claim_lease(
+                self._record_name,
+                self._lease_owner,
+                self._lease_duration,
+                last_update_datetime
+            )
+        if self._remove_session_after_use and not is_session_scope_active(self._session_factory):
+            self._session_factory.remove()
+        return claimed
+
+    def release(self) -> None:
+        with self._session_factory.begin():
+            self._repository.release_lease(self._record_name, self._lease_owner)
+        if self._remove_session_after_use and not is_session_scope_active(self._session_factory):
+            self._session_factory.remove()
+
+    def get_recheck_interval(self) -> timedelta:
+        return self._recheck_interval
+
+
+class AsyncUpdateDatetimeDBLease(AbstractAsyncUpdateLease):
+
+    def __init__(self,
+                 db_session_factory: async_scoped_session,
+                 update_datetime_repository: AsyncUpdateDatetimeDBRepository,
+                 record_name: str,
+                 lease_owner: str,
+                 lease_duration: timedelta = timedelta(minutes=5),
+                 recheck_interval: timedelta = timedelta(seconds=1),
+                 remove_session_after_use: bool = True
+                 ) -> None:
+        self._session_factory = db_session_factory
+        self._repository = update_datetime_repository
+        self._record_name = record_name
+        self._lease_owner = lease_owner
+        self._lease_duration = lease_duration
+        self._recheck_interval = recheck_interval
+        self._remove_session_after_use = remove_session_after_use
+
+    async def try_claim(self, last_update_datetime: Optional[datetime]) -> bool:
+        async with begin_async_session(self._session_factory):
+            claimed = await self._repository.try_claim_lease(
+                self._record_name,
+                self._lease_owner,
+                self._lease_duration,
+                last_update_datetime
+            )
+        if self._remove_session_after_use and not is_session_scope_active(self._session_factory):
+            await self._session_factory.remove()
+        return claimed
+
+    async def release(self) -> None:
+        async with begin_async_session(self._session_factory):
+            await self._repository.release_lease(self._record_name, self._lease_owner)
+        if self._remove_session_after_use and not is_session_scope_active(self._session_factory):
+            await self._session_factory.remove()
+
+    def get_recheck_interval(self) -> timedelta:
+        return self._recheck_interval
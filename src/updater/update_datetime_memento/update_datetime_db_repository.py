@@ -1,35 +1,143 @@
-from datetime import datetime, timezone
-from typing import Union, Dict, Iterator
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
 
-from sqlalchemy import select, Column, INTEGER, VARCHAR, DATETIME
-from sqlalchemy.orm import scoped_session, declarative_base
+from sqlalchemy import or_, select, update, Column, INTEGER, VARCHAR, DATETIME
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import async_scoped_session, AsyncSession
+from sqlalchemy.orm import scoped_session, declarative_base, Session
+from sqlalchemy.sql import Insert, Select, Update
+from sqlalchemy.sql.expression import ScalarSelect
 
 
 class UpdateDatetimeDBRepository:
 
-    def __init__(self, db_session_factory: scoped_session) -> None:
+    def __init__(self, db_session_factory: scoped_session, track_revisions: bool = False) -> None:
         self._session_factory = db_session_factory
+        self._track_revisions = track_revisions
+        self._snapshot: Optional[Dict[str, datetime]] = None
+
+    def is_tracking_revisions(self) -> bool:
+        return self._track_revisions
+
+    def load_snapshot(self) -> None:
+        self._snapshot = self.get_all_last_updates_datetime()
+
+    def drop_snapshot(self) -> None:
+        self._snapshot = None
+
+    def has_snapshot(self) -> bool:
+        return self._snapshot is not None
 
     def set_last_update_datetime(self, record_name: str, update_datetime: datetime) -> None:
+        self.set_many_last_update_datetime({record_name: update_datetime})
+
+    def set_many_last_update_datetime(self, update_datetimes: Dict[str, datetime]) -> None:
+        if not update_datetimes:
+            return
         session = self._session_factory()
-        statement = select(UpdateDatetimeDBRecord).filter(UpdateDatetimeDBRecord.name == record_name)
-        record = session.execute(statement).scalars().first()
-        if record is not None:
-            record.update_datetime = update_datetime.astimezone(timezone.utc)
-            session.merge(record)
+        update_datetimes = {
+            record_name: update_datetime.astimezone(timezone.utc)
+            for record_name, update_datetime in update_datetimes.items()
+        }
+        dialect_name = session.get_bind().dialect.name
+        revision = None
+        if self._track_revisions:
+            self._increment_revision(session, dialect_name)
+            revision = _create_select_revision_statement().scalar_subquery()
+        if dialect_name in _UPSERT_STATEMENT_FACTORIES:
+            self._upsert_records(session, dialect_name, update_datetimes, revision)
         else:
-            record = UpdateDatetimeDBRecord(name=record_name, update_datetime=update_datetime.astimezone(timezone.utc))
-            session.add(record)
+            self._merge_records(session, update_datetimes, revision)
+        if self._snapshot is not None:
+            self._snapshot.update(update_datetimes)
 
     def get_last_update_datetime(self, record_name) -> Union[datetime, None]:
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot.get(record_name)
         last_update_datetime = None
         session = self._session_factory()
         statement = select(UpdateDatetimeDBRecord).filter(UpdateDatetimeDBRecord.name == record_name)
         record = session.execute(statement).scalars().first()
-        if record is not None:
+        if record is not None and record.update_datetime is not None:
             last_update_datetime = record.update_datetime.replace(tzinfo=timezone.utc)
         return last_update_datetime
 
+    def get_many_last_update_datetime(self, record_names: Iterable[str]) -> Dict[str, datetime]:
+        record_names = set(record_names)
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return {
+                record_name: snapshot[record_name]
+                for record_name in record_names
+                if record_name in snapshot
+            }
+        if not record_names:
+            return {}
+        session = self._session_factory()
+        statement = select(UpdateDatetimeDBRecord).filter(UpdateDatetimeDBRecord.name.in_(record_names))
+        last_updates_datetime: Dict[str, datetime] = {}
+        records: Iterator[UpdateDatetimeDBRecord] = session.execute(statement).scalars()
+        for record in records:
+            if record.update_datetime is not None:
+                # noinspection PyTypeChecker
+                last_updates_datetime[record.name] = record.update_datetime.replace(tzinfo=timezone.utc)
+        return last_updates_datetime
+
+    @staticmethod
+    def _upsert_records(session: Session,
+                        dialect_name: str,
+                        update_datetimes: Dict[str, datetime],
+                        revision: Optional[ScalarSelect]
+                        ) -> None:
+        upsert_statement_factory = _UPSERT_STATEMENT_FACTORIES[dialect_name]
+        records_values = [
+            {"name": record_name, "update_datetime": update_datetime}
+            for record_name, update_datetime in update_datetimes.items()
+        ]
+        if revision is not None:
+            for record_values in records_values:
+                record_values["revision"] = revision
+        for batch_start in range(0, len(records_values), _UPSERT_BATCH_SIZE):
+            batch = records_values[batch_start:batch_start + _UPSERT_BATCH_SIZE]
+            session.execute(upsert_statement_factory(batch))
+
+    @staticmethod
+    def _merge_records(session: Session,
+                       update_datetimes: Dict[str, datetime],
+                       revision: Optional[ScalarSelect]
+                       ) -> None:
+        statement = select(UpdateDatetimeDBRecord).filter(UpdateDatetimeDBRecord.name.in_(update_datetimes))
+        records: Dict[str, UpdateDatetimeDBRecord] = {
+            record.name: record for record in session.execute(statement).scalars()
+        }
+        for record_name, update_datetime in update_datetimes.items():
+            record = records.get(record_name)
+            if record is not None:
+                record.update_datetime = update_datetime
+                if revision is not None:
+                    record.revision = revision
+            else:
+                session.add(
+                    UpdateDatetimeDBRecord(name=record_name, update_datetime=update_datetime, revision=revision)
+                )
+
+    def try_claim_lease(self,
+                        record_name: str,
+                        lease_owner: str,
+                        lease_duration: timedelta,
+                        last_update_datetime: Optional[datetime]
+                        ) -> bool:
+        session = self._session_factory()
+        dialect_name = session.get_bind().dialect.name
+        self._insert_if_absent(session, dialect_name, UpdateDatetimeDBRecord, {"name": record_name})
+        statement = _create_claim_lease_statement(record_name, lease_owner, lease_duration, last_update_datetime)
+        return session.execute(statement).rowcount == 1
+
+    def release_lease(self, record_name: str, lease_owner: str) -> None:
+        session = self._session_factory()
+        session.execute(_create_release_lease_statement(record_name, lease_owner))
+
     def get_all_last_updates_datetime(self) -> Dict[str, datetime]:
         session = self._session_factory()
         statement = select(UpdateDatetimeDBRecord)
@@ -37,10 +145,222 @@ class UpdateDatetimeDBRepository:
         last_updates_datetime: Dict[str, datetime] = {}
         records: Iterator[UpdateDatetimeDBRecord] = session.execute(statement).scalars()
         for record in records:
-            # noinspection PyTypeChecker
-            last_updates_datetime[record.name] = record.update_datetime.replace(tzinfo=timezone.utc)
+            if record.update_datetime is not None:
+                # noinspection PyTypeChecker
+                last_updates_datetime[record.name] = record.update_datetime.replace(tzinfo=timezone.utc)
+        return last_updates_datetime
+
+    def get_revision(self) -> int:
+        session = self._session_factory()
+        revision = session.execute(_create_select_revision_statement()).scalar()
+        return revision or 0
+
+    def get_changed_since(self, revision: int) -> Tuple[int, Dict[str, datetime]]:
+        session = self._session_factory()
+        current_revision = self.get_revision()
+        statement = select(UpdateDatetimeDBRecord).filter(
+            UpdateDatetimeDBRecord.revision > revision,
+            UpdateDatetimeDBRecord.revision <= current_revision
+        )
+        changed_updates_datetime: Dict[str, datetime] = {}
+        records: Iterator[UpdateDatetimeDBRecord] = session.execute(statement).scalars()
+        for record in records:
+            if record.update_datetime is not None:
+                # noinspection PyTypeChecker
+                changed_updates_datetime[record.name] = record.update_datetime.replace(tzinfo=timezone.utc)
+        return current_revision, changed_updates_datetime
+
+    @staticmethod
+    def _increment_revision(session: Session, dialect_name: str) -> None:
+        if session.execute(_create_increment_revision_statement()).rowcount == 0:
+            UpdateDatetimeDBRepository._insert_if_absent(
+                session,
+                dialect_name,
+                UpdateDatetimeRevisionDBRecord,
+                {"id": _REVISION_RECORD_ID},
+                {"revision": 0}
+            )
+            session.execute(_create_increment_revision_statement())
+
+    @staticmethod
+    def _insert_if_absent(session: Session,
+                          dialect_name: str,
+                          db_record_class: Type,
+                          key_values: Dict,
+                          default_values: Optional[Dict] = None
+                          ) -> None:
+        values = {**key_values, **(default_values or {})}
+        if dialect_name in _INSERT_IF_ABSENT_STATEMENT_FACTORIES:
+            session.execute(_INSERT_IF_ABSENT_STATEMENT_FACTORIES[dialect_name](db_record_class, values))
+        elif session.execute(select(db_record_class).filter_by(**key_values)).first() is None:
+            session.add(db_record_class(**values))
+            session.flush()
+
+
+class AsyncUpdateDatetimeDBRepository:
+
+    def __init__(self, db_session_factory: async_scoped_session, track_revisions: bool = False) -> None:
+        self._session_factory = db_session_factory
+        self._track_revisions = track_revisions
+
+    def is_tracking_revisions(self) -> bool:
+        return self._track_revisions
+
+    async def set_last_update_datetime(self, record_name: str, update_datetime: datetime) -> None:
+        await self.set_many_last_update_datetime({record_name: update_datetime})
+
+    async def set_many_last_update_datetime(self, update_datetimes: Dict[str, datetime]) -> None:
+        if not update_datetimes:
+            return
+        session = self._session_factory()
+        update_datetimes = {
+            record_name: update_datetime.astimezone(timezone.utc)
+            for record_name, update_datetime in update_datetimes.items()
+        }
+        dialect_name = session.get_bind().dialect.name
+        revision = None
+        if self._track_revisions:
+            await self._increment_revision(session, dialect_name)
+            revision = _create_select_revision_statement().scalar_subquery()
+        if dialect_name in _UPSERT_STATEMENT_FACTORIES:
+            await self._upsert_records(session, dialect_name, update_datetimes, revision)
+        else:
+            await self._merge_records(session, update_datetimes, revision)
+
+    async def get_last_update_datetime(self, record_name) -> Union[datetime, None]:
+        last_update_datetime = None
+        session = self._session_factory()
+        statement = select(UpdateDatetimeDBRecord).filter(UpdateDatetimeDBRecord.name == record_name)
+        record = (await session.execute(statement)).scalars().first()
+        if record is not None and record.update_datetime is not None:
+            last_update_datetime = record.update_datetime.replace(tzinfo=timezone.utc)
+        return last_update_datetime
+
+    async def get_many_last_update_datetime(self, record_names: Iterable[str]) -> Dict[str, datetime]:
+        record_names = set(record_names)
+        if not record_names:
+            return {}
+        session = self._session_factory()
+        statement = select(UpdateDatetimeDBRecord).filter(UpdateDatetimeDBRecord.name.in_(record_names))
+        last_updates_datetime: Dict[str, datetime] = {}
+        records: Iterator[UpdateDatetimeDBRecord] = (await session.execute(statement)).scalars()
+        for record in records:
+            if record.update_datetime is not None:
+                # noinspection PyTypeChecker
+                last_updates_datetime[record.name] = record.update_datetime.replace(tzinfo=timezone.utc)
+        return last_updates_datetime
+
+    async def try_claim_lease(self,
+                              record_name: str,
+                              lease_owner: str,
+                              lease_duration: timedelta,
+                              last_update_datetime: Optional[datetime]
+                              ) -> bool:
+        session = self._session_factory()
+        dialect_name = session.get_bind().dialect.name
+        await self._insert_if_absent(session, dialect_name, UpdateDatetimeDBRecord, {"name": record_name})
+        statement = _create_claim_lease_statement(record_name, lease_owner, lease_duration, last_update_datetime)
+        return (await session.execute(statement)).rowcount == 1
+
+    async def release_lease(self, record_name: str, lease_owner: str) -> None:
+        session = self._session_factory()
+        await session.execute(_create_release_lease_statement(record_name, lease_owner))
+
+    async def get_all_last_updates_datetime(self) -> Dict[str, datetime]:
+        session = self._session_factory()
+        statement = select(UpdateDatetimeDBRecord)
+        last_updates_datetime: Dict[str, datetime] = {}
+        records: Iterator[UpdateDatetimeDBRecord] = (await session.execute(statement)).scalars()
+        for record in records:
+            if record.update_datetime is not None:
+                # noinspection PyTypeChecker
+                last_updates_datetime[record.name] = record.update_datetime.replace(tzinfo=timezone.utc)
         return last_updates_datetime
 
+    @staticmethod
+    async def _upsert_records(session: AsyncSession,
+                              dialect_name: str,
+                              update_datetimes: Dict[str, datetime],
+                              revision: Optional[ScalarSelect]
+                              ) -> None:
+        upsert_statement_factory = _UPSERT_STATEMENT_FACTORIES[dialect_name]
+        records_values = [
+            {"name": record_name, "update_datetime": update_datetime}
+            for record_name, update_datetime in update_datetimes.items()
+        ]
+        if revision is not None:
+            for record_values in records_values:
+                record_values["revision"] = revision
+        for batch_start in range(0, len(records_values), _UPSERT_BATCH_SIZE):
+            batch = records_values[batch_start:batch_start + _UPSERT_BATCH_SIZE]
+            await session.execute(upsert_statement_factory(batch))
+
+    @staticmethod
+    async def _merge_records(session: AsyncSession,
+                             update_datetimes: Dict[str, datetime],
+                             revision: Optional[ScalarSelect]
+                             ) -> None:
+        statement = select(UpdateDatetimeDBRecord).filter(UpdateDatetimeDBRecord.name.in_(update_datetimes))
+        records: Dict[str, UpdateDatetimeDBRecord] = {
+            record.name: record for record in (await session.execute(statement)).scalars()
+        }
+        for record_name, update_datetime in update_datetimes.items():
+            record = records.get(record_name)
+            if record is not None:
+                record.update_datetime = update_datetime
+                if revision is not None:
+                    record.revision = revision
+            else:
+                session.add(
+                    UpdateDatetimeDBRecord(name=record_name, update_datetime=update_datetime, revision=revision)
+                )
+
+    async def get_revision(self) -> int:
+        session = self._session_factory()
+        revision = (await session.execute(_create_select_revision_statement())).scalar()
+        return revision or 0
+
+    async def get_changed_since(self, revision: int) -> Tuple[int, Dict[str, datetime]]:
+        session = self._session_factory()
+        current_revision = await self.get_revision()
+        statement = select(UpdateDatetimeDBRecord).filter(
+            UpdateDatetimeDBRecord.revision > revision,
+            UpdateDatetimeDBRecord.revision <= current_revision
+        )
+        changed_updates_datetime: Dict[str, datetime] = {}
+        records: Iterator[UpdateDatetimeDBRecord] = (await session.execute(statement)).scalars()
+        for record in records:
+            if record.update_datetime is not None:
+                # noinspection PyTypeChecker
+                changed_updates_datetime[record.name] = record.update_datetime.replace(tzinfo=timezone.utc)
+        return current_revision, changed_updates_datetime
+
+    @staticmethod
+    async def _increment_revision(session: AsyncSession, dialect_name: str) -> None:
+        if (await session.execute(_create_increment_revision_statement())).rowcount == 0:
+            await AsyncUpdateDatetimeDBRepository._insert_if_absent(
+                session,
+                dialect_name,
+                UpdateDatetimeRevisionDBRecord,
+                {"id": _REVISION_RECORD_ID},
+                {"revision": 0}
+            )
+            await session.execute(_create_increment_revision_statement())
+
+    @staticmethod
+    async def _insert_if_absent(session: AsyncSession,
+                                dialect_name: str,
+                                db_record_class: Type,
+                                key_values: Dict,
+                                default_values: Optional[Dict] = None
+                                ) -> None:
+        values = {**key_values, **(default_values or {})}
+        if dialect_name in _INSERT_IF_ABSENT_STATEMENT_FACTORIES:
+            await session.execute(_INSERT_IF_ABSENT_STATEMENT_FACTORIES[dialect_name](db_record_class, values))
+        elif (await session.execute(select(db_record_class).filter_by(**key_values))).first() is None:
+            session.add(db_record_class(**values))
+            await session.flush()
+
 
 UpdateDatetimeDBRecordBase = declarative_base()
 
@@ -50,3 +370,116 @@ class UpdateDatetimeDBRecord(UpdateDatetimeDBRecordBase):
     id = Column(INTEGER, primary_key=True, autoincrement=True)
     name = Column(VARCHAR(32), unique=True, nullable=False)
     update_datetime = Column(DATETIME)
+    lease_owner = Column(VARCHAR(64))
+    lease_expiry_datetime = Column(DATETIME)
+    revision = Column(INTEGER, index=True)
+
+
+class UpdateDatetimeRevisionDBRecord(UpdateDatetimeDBRecordBase):
+    __tablename__ = "update_datetime_revision"
+    id = Column(INTEGER, primary_key=True, autoincrement=False)
+    revision = Column(INTEGER, nullable=False)
+
+
+def _get_updated_columns(records_values: List[Dict]) -> List[str]:
+    return [column_name for column_name in records_values[0] if column_name != "name"]
+
+
+def _create_sqlite_upsert_statement(records_values: List[Dict]) -> Insert:
+    statement = sqlite.insert(UpdateDatetimeDBRecord).values(records_values)
+    return statement.on_conflict_do_update(
+        index_elements=[UpdateDatetimeDBRecord.name],
+        set_={column_name: statement.excluded[column_name] for column_name in _get_updated_columns(records_values)}
+    )
+
+
+def _create_postgresql_upsert_statement(records_values: List[Dict]) -> Insert:
+    statement = postgresql.insert(UpdateDatetimeDBRecord).values(records_values)
+    return statement.on_conflict_do_update(
+        index_elements=[UpdateDatetimeDBRecord.name],
+        set_={column_name: statement.excluded[column_name] for column_name in _get_updated_columns(records_values)}
+    )
+
+
+def _create_mysql_upsert_statement(records_values: List[Dict]) -> Insert:
+    statement = mysql.insert(UpdateDatetimeDBRecord).values(records_values)
+    return statement.on_duplicate_key_update({
+        column_name: statement.inserted[column_name] for column_name in _get_updated_columns(records_values)
+    })
+
+
+def _create_sqlite_insert_if_absent_statement(db_record_class: Type, values: Dict) -> Insert:
+    return sqlite.insert(db_record_class).values(values).on_conflict_do_nothing()
+
+
+def _create_postgresql_insert_if_absent_statement(db_record_class: Type, values: Dict) -> Insert:
+    return postgresql.insert(db_record_class).values(values).on_conflict_do_nothing()
+
+
+def _create_mysql_insert_if_absent_statement(db_record_class: Type, values: Dict) -> Insert:
+    return mysql.insert(db_record_class).values(values).prefix_with("IGNORE")
+
+
+def _create_increment_revision_statement() -> Update:
+    return update(UpdateDatetimeRevisionDBRecord).where(
+        UpdateDatetimeRevisionDBRecord.id == _REVISION_RECORD_ID
+    ).values(
+        revision=UpdateDatetimeRevisionDBRecord.revision + 1
+    ).execution_options(synchronize_session=False)
+
+
+def _create_select_revision_statement() -> Select:
+    return select(UpdateDatetimeRevisionDBRecord.revision).filter(
+        UpdateDatetimeRevisionDBRecord.id == _REVISION_RECORD_ID
+    )
+
+
+def _create_claim_lease_statement(record_name: str,
+                                  lease_owner: str,
+                                  lease_duration: timedelta,
+                                  last_update_datetime: Optional[datetime]
+                                  ) -> Update:
+    datetime_now = datetime.now(tz=timezone.utc)
+    if last_update_datetime is None:
+        update_datetime_not_changed = UpdateDatetimeDBRecord.update_datetime.is_(None)
+    else:
+        update_datetime_not_changed = or_(
+            UpdateDatetimeDBRecord.update_datetime.is_(None),
+            UpdateDatetimeDBRecord.update_datetime <= last_update_datetime.astimezone(timezone.utc)
+        )
+    return update(UpdateDatetimeDBRecord).where(
+        UpdateDatetimeDBRecord.name == record_name,
+        update_datetime_not_changed,
+        or_(
+            UpdateDatetimeDBRecord.lease_owner.is_(None),
+            UpdateDatetimeDBRecord.lease_owner == lease_owner,
+            UpdateDatetimeDBRecord.lease_expiry_datetime < datetime_now
+        )
+    ).values(
+        lease_owner=lease_owner,
+        lease_expiry_datetime=datetime_now + lease_duration
+    ).execution_options(synchronize_session=False)
+
+
+def _create_release_lease_statement(record_name: str, lease_owner: str) -> Update:
+    return update(UpdateDatetimeDBRecord).where(
+        UpdateDatetimeDBRecord.name == record_name,
+        UpdateDatetimeDBRecord.lease_owner == lease_owner
+    ).values(
+        lease_owner=None,
+        lease_expiry_datetime=None
+    ).execution_options(synchronize_session=False)
+
+
+_UPSERT_BATCH_SIZE = 500
+_REVISION_RECORD_ID = 1
+_UPSERT_STATEMENT_FACTORIES: Dict[str, Callable[[List[Dict]], Insert]] = {
+    "sqlite": _create_sqlite_upsert_statement,
+    "postgresql": _create_postgresql_upsert_statement,
+    "mysql": _create_mysql_upsert_statement,
+}
+_INSERT_IF_ABSENT_STATEMENT_FACTORIES: Dict[str, Callable[[Type, Dict], Insert]] = {
+    "sqlite": _create_sqlite_insert_if_absent_statement,
+    "postgresql": _create_postgresql_insert_if_absent_statement,
+    "mysql": _create_mysql_insert_if_absent_statement,
+}
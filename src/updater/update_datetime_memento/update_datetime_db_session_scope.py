@@ -0,0 +1,120 @@
+import asyncio
+from contextvars import ContextVar, Token
+from typing import Optional, Union
+
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import async_scoped_session, AsyncConnection, AsyncSession
+from sqlalchemy.ext.asyncio.session import AsyncSessionTransaction
+from sqlalchemy.orm import scoped_session
+from sqlalchemy.util import ScopedRegistry
+
+_SESSION_SCOPE_INFO_KEY = "updater_session_scope"
+_SESSION_SCOPE_LOCK_INFO_KEY = "updater_session_scope_lock"
+
+
+def is_session_scope_active(db_session_factory: Union[scoped_session, async_scoped_session]) -> bool:
+    return db_session_factory().info.get(_SESSION_SCOPE_INFO_KEY, False)
+
+
+def begin_async_session(db_session_factory: async_scoped_session) -> '_AsyncSessionScopeTransaction':
+    return _AsyncSessionScopeTransaction(db_session_factory)
+
+
+class UpdateDatetimeDBSessionScope:
+
+    def __init__(self, db_session_factory: scoped_session) -> None:
+        self._session_factory = db_session_factory
+        self._connection: Optional[Connection] = None
+
+    def __enter__(self) -> 'UpdateDatetimeDBSessionScope':
+        session = self._session_factory()
+        if session.bind is not None:
+            self._session_factory.remove()
+            self._connection = session.bind.connect()
+            session = self._session_factory.session_factory(bind=self._connection)
+            self._session_factory.registry.set(session)
+        session.info[_SESSION_SCOPE_INFO_KEY] = True
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        try:
+            self._session_factory.remove()
+        finally:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class AsyncUpdateDatetimeDBSessionScope:
+
+    def __init__(self, db_session_factory: async_scoped_session) -> None:
+        self._session_factory = db_session_factory
+        self._scope_key_variable = _get_scope_key_variable(db_session_factory.registry)
+        self._scope_key_token: Optional[Token] = None
+        self._connection: Optional[AsyncConnection] = None
+
+    async def __aenter__(self) -> 'AsyncUpdateDatetimeDBSessionScope':
+        self._scope_key_token = self._scope_key_variable.set(object())
+        session = self._session_factory()
+        if session.bind is not None:
+            await self._session_factory.remove()
+            self._connection = await session.bind.connect()
+            session = self._session_factory.session_factory(bind=self._connection)
+            self._session_factory.registry.set(session)
+        session.info[_SESSION_SCOPE_INFO_KEY] = True
+        session.info[_SESSION_SCOPE_LOCK_INFO_KEY] = asyncio.Lock()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        try:
+            await self._session_factory.remove()
+        finally:
+            if self._connection is not None:
+                await self._connection.close()
+                self._connection = None
+            self._scope_key_variable.reset(self._scope_key_token)
+            self._scope_key_token = None
+
+
+class _AsyncSessionScopeTransaction:
+
+    def __init__(self, db_session_factory: async_scoped_session) -> None:
+        self._session_factory = db_session_factory
+        self._lock: Optional[asyncio.Lock] = None
+        self._transaction: Optional[AsyncSessionTransaction] = None
+
+    async def __aenter__(self) -> AsyncSession:
+        session = self._session_factory()
+        self._lock = session.info.get(_SESSION_SCOPE_LOCK_INFO_KEY)
+        if self._lock is not None:
+            await self._lock.acquire()
+        try:
+            self._transaction = session.begin()
+            await self._transaction.__aenter__()
+        except BaseException:
+            if self._lock is not None:
+                self._lock.release()
+            raise
+        return session
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        try:
+            await self._transaction.__aexit__(exc_type, exc_val, exc_tb)
+        finally:
+            if self._lock is not None:
+                self._lock.release()
+
+
+def _get_scope_key_variable(registry: ScopedRegistry) -> ContextVar:
+    scope_key_variable = getattr(registry.scopefunc, "scope_key_variable", None)
+    if scope_key_variable is None:
+        default_scopefunc = registry.scopefunc
+        scope_key_variable = ContextVar("update_datetime_db_session_scope_key", default=None)
+
+        def scopefunc():
+            scope_key = scope_key_variable.get()
+            return default_scopefunc() if scope_key is None else scope_key
+
+        scopefunc.scope_key_variable = scope_key_variable
+        registry.scopefunc = scopefunc
+    return scope_key_variable
@@ -0,0 +1,25 @@
+from sqlalchemy.orm import scoped_session
+from updater.update_datetime_memento.update_datetime_db_repository import UpdateDatetimeDBRepository
+from updater.update_datetime_memento.update_datetime_db_session_scope import is_session_scope_active
+
+
+class UpdateDatetimeDBSnapshot:
+
+    def __init__(self,
+                 db_session_factory: scoped_session,
+                 update_datetime_repository: UpdateDatetimeDBRepository,
+                 remove_session_after_use: bool = True
+                 ) -> None:
+        self._session_factory = db_session_factory
+        self._repository = update_datetime_repository
+        self._remove_session_after_use = remove_session_after_use
+
+    def __enter__(self) -> 'UpdateDatetimeDBSnapshot':
+        with self._session_factory.begin():
+            self._repository.load_snapshot()
+        if self._remove_session_after_use and not is_session_scope_active(self._session_factory):
+            self._session_factory.remove()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._repository.drop_snapshot()
@@ -1,7 +1,19 @@
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
+from typing import Hashable, Optional
 
+from sqlalchemy.ext.asyncio import async_scoped_session
 from sqlalchemy.orm import scoped_session
-from updater.update_datetime_memento.update_datetime_db_repository import UpdateDatetimeDBRepository
+from updater.metrics import AbstractUpdaterMetricsHook
+from updater.update_datetime_memento.update_datetime_db_repository import \
+    AsyncUpdateDatetimeDBRepository, \
+    UpdateDatetimeDBRepository
+from updater.update_datetime_memento.update_datetime_db_session_scope import \
+    begin_async_session, \
+    is_session_scope_active
+from updater.update_datetime_memento.update_datetime_cache import is_cache_miss, UpdateDatetimeLRUCache
+from updater.update_datetime_memento.update_datetime_change_channel import AbstractUpdateDatetimeChangeChannel
+from updater.update_datetime_memento.update_datetime_write_behind_buffer import UpdateDatetimeWriteBehindBuffer
 
 
 class AbstractUpdateDatetimeMemento:
@@ -13,33 +25,206 @@ class AbstractUpdateDatetimeMemento:
         raise NotImplementedError
 
 
+class AbstractAsyncUpdateDatetimeMemento:
+
+    async def store(self, update_datetime: datetime) -> None:
+        raise NotImplementedError
+
+    async def load(self) -> datetime:
+        raise NotImplementedError
+
+
 class UpdateDatetimeMementoWithDBRepo(AbstractUpdateDatetimeMemento):
 
     def __init__(self,
                  db_session_factory: scoped_session,
                  update_datetime_repository: UpdateDatetimeDBRepository,
                  memento_name: str,
-                 remove_session_after_use: bool = True
+                 remove_session_after_use: bool = True,
+                 metrics_hook: Optional[AbstractUpdaterMetricsHook] = None
                  ) -> None:
         self._session_factory = db_session_factory
         self._repository = update_datetime_repository
         self._memento_name = memento_name
         self._remove_session_after_use = remove_session_after_use
+        self._metrics_hook = metrics_hook
 
     def store(self, update_datetime: datetime) -> None:
+        operation_start_time = time.perf_counter()
         with self._session_factory.begin() as session:
             self._repository.set_last_update_datetime(self._memento_name, update_datetime)
             session.commit()
-        if self._remove_session_after_use:
+        if self._remove_session_after_use and not is_session_scope_active(self._session_factory):
             self._session_factory.remove()
+        self._observe_operation("store", operation_start_time)
 
     def load(self) -> datetime:
+        if self._repository.has_snapshot():
+            return self._repository.get_last_update_datetime(self._memento_name)
+        operation_start_time = time.perf_counter()
         with self._session_factory.begin():
             last_update_datetime = self._repository.get_last_update_datetime(self._memento_name)
-        if self._remove_session_after_use:
+        if self._remove_session_after_use and not is_session_scope_active(self._session_factory):
             self._session_factory.remove()
+        self._observe_operation("load", operation_start_time)
+        return last_update_datetime
+
+    def _observe_operation(self, operation: str, operation_start_time: float) -> None:
+        if self._metrics_hook is not None:
+            self._metrics_hook.on_memento_operation(
+                self._memento_name,
+                operation,
+                time.perf_counter() - operation_start_time
+            )
+
+
+class WriteBehindUpdateDatetimeMementoWithDBRepo(UpdateDatetimeMementoWithDBRepo):
+
+    def __init__(self,
+                 db_session_factory: scoped_session,
+                 update_datetime_repository: UpdateDatetimeDBRepository,
+                 write_behind_buffer: UpdateDatetimeWriteBehindBuffer,
+                 memento_name: str,
+                 remove_session_after_use: bool = True,
+                 metrics_hook: Optional[AbstractUpdaterMetricsHook] = None
+                 ) -> None:
+        super().__init__(
+            db_session_factory=db_session_factory,
+            update_datetime_repository=update_datetime_repository,
+            memento_name=memento_name,
+            remove_session_after_use=remove_session_after_use,
+            metrics_hook=metrics_hook
+        )
+        self._write_behind_buffer = write_behind_buffer
+
+    def store(self, update_datetime: datetime) -> None:
+        self._write_behind_buffer.put(self._memento_name, update_datetime)
+
+    def load(self) -> datetime:
+        last_update_datetime = self._write_behind_buffer.get(self._memento_name)
+        if last_update_datetime is None:
+            last_update_datetime = super().load()
+        return last_update_datetime
+
+
+class AsyncUpdateDatetimeMementoWithDBRepo(AbstractAsyncUpdateDatetimeMemento):
+
+    def __init__(self,
+                 db_session_factory: async_scoped_session,
+                 update_datetime_repository: AsyncUpdateDatetimeDBRepository,
+                 memento_name: str,
+                 remove_session_after_use: bool = True,
+                 metrics_hook: Optional[AbstractUpdaterMetricsHook] = None
+                 ) -> None:
+        self._session_factory = db_session_factory
+        self._repository = update_datetime_repository
+        self._memento_name = memento_name
+        self._remove_session_after_use = remove_session_after_use
+        self._metrics_hook = metrics_hook
+
+    async def store(self, update_datetime: datetime) -> None:
+        operation_start_time = time.perf_counter()
+        async with begin_async_session(self._session_factory):
+            await self._repository.set_last_update_datetime(self._memento_name, update_datetime)
+        if self._remove_session_after_use and not is_session_scope_active(self._session_factory):
+            await self._session_factory.remove()
+        self._observe_operation("store", operation_start_time)
+
+    async def load(self) -> datetime:
+        operation_start_time = time.perf_counter()
+        async with begin_async_session(self._session_factory):
+            last_update_datetime = await self._repository.get_last_update_datetime(self._memento_name)
+        if self._remove_session_after_use and not is_session_scope_active(self._session_factory):
+            await self._session_factory.remove()
+        self._observe_operation("load", operation_start_time)
         return last_update_datetime
 
+    def _observe_operation(self, operation: str, operation_start_time: float) -> None:
+        if self._metrics_hook is not None:
+            self._metrics_hook.on_memento_operation(
+                self._memento_name,
+                operation,
+                time.perf_counter() - operation_start_time
+            )
+
+
+class CachingUpdateDatetimeMemento(AbstractUpdateDatetimeMemento):
+
+    def __init__(self,
+                 memento: AbstractUpdateDatetimeMemento,
+                 cache: Optional[UpdateDatetimeLRUCache] = None,
+                 cache_key: Optional[Hashable] = None,
+                 ttl: Optional[timedelta] = None,
+                 change_channel: Optional[AbstractUpdateDatetimeChangeChannel] = None
+                 ) -> None:
+        if cache is None:
+            cache = UpdateDatetimeLRUCache(max_size=1, ttl=ttl)
+        elif ttl is not None:
+            raise ValueError("TTL of shared cache must be set on the cache itself")
+        if cache_key is None:
+            if change_channel is not None:
+                raise ValueError("Cache key must be set to the record name to publish changes")
+            cache_key = self
+        self._memento = memento
+        self._cache = cache
+        self._cache_key = cache_key
+        self._change_channel = change_channel
+
+    def store(self, update_datetime: datetime) -> None:
+        self._memento.store(update_datetime)
+        self._cache.put(self._cache_key, update_datetime)
+        if self._change_channel is not None:
+            self._change_channel.publish([self._cache_key])
+
+    def load(self) -> datetime:
+        last_update_datetime = self._cache.get(self._cache_key)
+        if is_cache_miss(last_update_datetime):
+            last_update_datetime = self._memento.load()
+            self._cache.put(self._cache_key, last_update_datetime)
+        return last_update_datetime
+
+    def invalidate(self) -> None:
+        self._cache.invalidate(self._cache_key)
+
+
+class AsyncCachingUpdateDatetimeMemento(AbstractAsyncUpdateDatetimeMemento):
+
+    def __init__(self,
+                 memento: AbstractAsyncUpdateDatetimeMemento,
+                 cache: Optional[UpdateDatetimeLRUCache] = None,
+                 cache_key: Optional[Hashable] = None,
+                 ttl: Optional[timedelta] = None,
+                 change_channel: Optional[AbstractUpdateDatetimeChangeChannel] = None
+                 ) -> None:
+        if cache is None:
+            cache = UpdateDatetimeLRUCache(max_size=1, ttl=ttl)
+        elif ttl is not None:
+            raise ValueError("TTL of shared cache must be set on the cache itself")
+        if cache_key is None:
+            if change_channel is not None:
+                raise ValueError("Cache key must be set to the record name to publish changes")
+            cache_key = self
+        self._memento = memento
+        self._cache = cache
+        self._cache_key = cache_key
+        self._change_channel = change_channel
+
+    async def store(self, update_datetime: datetime) -> None:
+        await self._memento.store(update_datetime)
+        self._cache.put(self._cache_key, update_datetime)
+        if self._change_channel is not None:
+            self._change_channel.publish([self._cache_key])
+
+    async def load(self) -> datetime:
+        last_update_datetime = self._cache.get(self._cache_key)
+        if is_cache_miss(last_update_datetime):
+            last_update_datetime = await self._memento.load()
+            self._cache.put(self._cache_key, last_update_datetime)
+        return last_update_datetime
+
+    def invalidate(self) -> None:
+        self._cache.invalidate(self._cache_key)
+
 
 class InMemoryUpdateDatetimeMemento(AbstractUpdateDatetimeMemento):
 
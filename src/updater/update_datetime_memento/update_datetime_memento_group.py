@@ -0,0 +1,180 @@
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy.ext.asyncio import async_scoped_session
+from sqlalchemy.orm import scoped_session
+from updater.metrics import AbstractUpdaterMetricsHook
+from updater.update_datetime_memento.update_datetime_db_repository import \
+    AsyncUpdateDatetimeDBRepository, \
+    UpdateDatetimeDBRepository
+from updater.update_datetime_memento.update_datetime_db_session_scope import \
+    begin_async_session, \
+    is_session_scope_active
+from updater.update_datetime_memento.update_datetime_memento import \
+    AbstractAsyncUpdateDatetimeMemento, \
+    AbstractUpdateDatetimeMemento, \
+    AsyncUpdateDatetimeMementoWithDBRepo, \
+    UpdateDatetimeMementoWithDBRepo
+
+
+class AbstractUpdateDatetimeMementoGroup:
+
+    def get_memento(self, memento_name: str) -> AbstractUpdateDatetimeMemento:
+        raise NotImplementedError
+
+    def load_many(self, memento_names: Iterable[str]) -> Dict[str, datetime]:
+        raise NotImplementedError
+
+    def store_many(self, update_datetimes: Dict[str, datetime]) -> None:
+        raise NotImplementedError
+
+
+class AbstractAsyncUpdateDatetimeMementoGroup:
+
+    def get_memento(self, memento_name: str) -> AbstractAsyncUpdateDatetimeMemento:
+        raise NotImplementedError
+
+    async def load_many(self, memento_names: Iterable[str]) -> Dict[str, datetime]:
+        raise NotImplementedError
+
+    async def store_many(self, update_datetimes: Dict[str, datetime]) -> None:
+        raise NotImplementedError
+
+
+class UpdateDatetimeMementoGroupMember(AbstractUpdateDatetimeMemento):
+
+    def __init__(self, memento_group: AbstractUpdateDatetimeMementoGroup, memento_name: str) -> None:
+        self._memento_group = memento_group
+        self._memento_name = memento_name
+
+    def store(self, update_datetime: datetime) -> None:
+        self._memento_group.store_many({self._memento_name: update_datetime})
+
+    def load(self) -> datetime:
+        return self._memento_group.load_many([self._memento_name]).get(self._memento_name)
+
+
+class InMemoryUpdateDatetimeMementoGroup(AbstractUpdateDatetimeMementoGroup):
+
+    def __init__(self) -> None:
+        self._update_datetimes: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+
+    def get_memento(self, memento_name: str) -> UpdateDatetimeMementoGroupMember:
+        return UpdateDatetimeMementoGroupMember(self, memento_name)
+
+    def load_many(self, memento_names: Iterable[str]) -> Dict[str, datetime]:
+        with self._lock:
+            return {
+                memento_name: self._update_datetimes[memento_name]
+                for memento_name in memento_names
+                if memento_name in self._update_datetimes
+            }
+
+    def store_many(self, update_datetimes: Dict[str, datetime]) -> None:
+        with self._lock:
+            self._update_datetimes.update(update_datetimes)
+
+
+class UpdateDatetimeMementoGroupWithDBRepo(AbstractUpdateDatetimeMementoGroup):
+
+    def __init__(self,
+                 db_session_factory: scoped_session,
+                 update_datetime_repository: UpdateDatetimeDBRepository,
+                 remove_session_after_use: bool = True,
+                 metrics_hook: Optional[AbstractUpdaterMetricsHook] = None,
+                 group_name: str = "update_datetime_memento_group"
+                 ) -> None:
+        self._session_factory = db_session_factory
+        self._repository = update_datetime_repository
+        self._remove_session_after_use = remove_session_after_use
+        self._metrics_hook = metrics_hook
+        self._group_name = group_name
+
+    def get_memento(self, memento_name: str) -> UpdateDatetimeMementoWithDBRepo:
+        return UpdateDatetimeMementoWithDBRepo(
+            db_session_factory=self._session_factory,
+            update_datetime_repository=self._repository,
+            memento_name=memento_name,
+            remove_session_after_use=self._remove_session_after_use,
+            metrics_hook=self._metrics_hook
+        )
+
+    def load_many(self, memento_names: Iterable[str]) -> Dict[str, datetime]:
+        if self._repository.has_snapshot():
+            return self._repository.get_many_last_update_datetime(memento_names)
+        operation_start_time = time.perf_counter()
+        with self._session_factory.begin():
+            last_updates_datetime = self._repository.get_many_last_update_datetime(memento_names)
+        if self._remove_session_after_use and not is_session_scope_active(self._session_factory):
+            self._session_factory.remove()
+        self._observe_operation("load_many", operation_start_time)
+        return last_updates_datetime
+
+    def store_many(self, update_datetimes: Dict[str, datetime]) -> None:
+        operation_start_time = time.perf_counter()
+        with self._session_factory.begin():
+            self._repository.set_many_last_update_datetime(update_datetimes)
+        if self._remove_session_after_use and not is_session_scope_active(self._session_factory):
+            self._session_factory.remove()
+        self._observe_operation("store_many", operation_start_time)
+
+    def _observe_operation(self, operation: str, operation_start_time: float) -> None:
+        if self._metrics_hook is not None:
+            self._metrics_hook.on_memento_operation(
+                self._group_name,
+                operation,
+                time.perf_counter() - operation_start_time
+            )
+
+
+class AsyncUpdateDatetimeMementoGroupWithDBRepo(AbstractAsyncUpdateDatetimeMementoGroup):
+
+    def __init__(self,
+                 db_session_factory: async_scoped_session,
+                 update_datetime_repository: AsyncUpdateDatetimeDBRepository,
+                 remove_session_after_use: bool = True,
+                 metrics_hook: Optional[AbstractUpdaterMetricsHook] = None,
+                 group_name: str = "update_datetime_memento_group"
+                 ) -> None:
+        self._session_factory = db_session_factory
+        self._repository = update_datetime_repository
+        self._remove_session_after_use = remove_session_after_use
+        self._metrics_hook = metrics_hook
+        self._group_name = group_name
+
+    def get_memento(self, memento_name: str) -> AsyncUpdateDatetimeMementoWithDBRepo:
+        return AsyncUpdateDatetimeMementoWithDBRepo(
+            db_session_factory=self._session_factory,
+            update_datetime_repository=self._repository,
+            memento_name=memento_name,
+            remove_session_after_use=self._remove_session_after_use,
+            metrics_hook=self._metrics_hook
+        )
+
+    async def load_many(self, memento_names: Iterable[str]) -> Dict[str, datetime]:
+        operation_start_time = time.perf_counter()
+        async with begin_async_session(self._session_factory):
+            last_updates_datetime = await self._repository.get_many_last_update_datetime(memento_names)
+        if self._remove_session_after_use and not is_session_scope_active(self._session_factory):
+            await self._session_factory.remove()
+        self._observe_operation("load_many", operation_start_time)
+        return last_updates_datetime
+
+    async def store_many(self, update_datetimes: Dict[str, datetime]) -> None:
+        operation_start_time = time.perf_counter()
+        async with begin_async_session(self._session_factory):
+            await self._repository.set_many_last_update_datetime(update_datetimes)
+        if self._remove_session_after_use and not is_session_scope_active(self._session_factory):
+            await self._session_factory.remove()
+        self._observe_operation("store_many", operation_start_time)
+
+    def _observe_operation(self, operation: str, operation_start_time: float) -> None:
+        if self._metrics_hook is not None:
+            self._metrics_hook.on_memento_operation(
+                self._group_name,
+                operation,
+                time.perf_counter() - operation_start_time
+            )
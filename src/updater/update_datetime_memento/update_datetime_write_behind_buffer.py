@@ -0,0 +1,100 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy.orm import scoped_session
+from updater.logging import logger
+from updater.update_cycle_context import AbstractUpdateCycleContext
+from updater.update_datetime_memento.update_datetime_db_repository import UpdateDatetimeDBRepository
+from updater.update_datetime_memento.update_datetime_db_session_scope import is_session_scope_active
+
+
+class UpdateDatetimeWriteBehindBuffer(AbstractUpdateCycleContext):
+
+    def __init__(self,
+                 db_session_factory: scoped_session,
+                 update_datetime_repository: UpdateDatetimeDBRepository,
+                 max_pending_count: Optional[int] = None,
+                 max_pending_time: Optional[timedelta] = None,
+                 remove_session_after_use: bool = True,
+                 flush_retry_delay: timedelta = timedelta(seconds=5)
+                 ) -> None:
+        self._session_factory = db_session_factory
+        self._repository = update_datetime_repository
+        self._max_pending_count = max_pending_count
+        self._max_pending_time = max_pending_time
+        self._remove_session_after_use = remove_session_after_use
+        self._lock = threading.RLock()
+        self._pending_update_datetimes: Dict[str, datetime] = {}
+        self._first_pending_monotonic_time: Optional[float] = None
+        self._last_flush_duration: Optional[timedelta] = None
+        self._flush_retry_delay = flush_retry_delay
+        self._flush_retry_datetime: Optional[datetime] = None
+
+    def __enter__(self) -> 'UpdateDatetimeWriteBehindBuffer':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._try_flush()
+
+    def get_next_wake_up_datetime(self) -> Optional[datetime]:
+        if not self._pending_update_datetimes:
+            return None
+        return self._flush_retry_datetime
+
+    def on_service_stop(self) -> None:
+        self.flush()
+
+    def put(self, record_name: str, update_datetime: datetime) -> None:
+        with self._lock:
+            if not self._pending_update_datetimes:
+                self._first_pending_monotonic_time = time.monotonic()
+            self._pending_update_datetimes[record_name] = update_datetime
+            if self._is_flush_threshold_reached():
+                self._try_flush()
+
+    def get(self, record_name: str) -> Optional[datetime]:
+        with self._lock:
+            return self._pending_update_datetimes.get(record_name)
+
+    def get_pending_count(self) -> int:
+        return len(self._pending_update_datetimes)
+
+    def get_last_flush_duration(self) -> Optional[timedelta]:
+        return self._last_flush_duration
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._pending_update_datetimes:
+                return
+            logger.debug("Flushing %s update datetimes", len(self._pending_update_datetimes))
+            flush_start_time = time.perf_counter()
+            try:
+                with self._session_factory.begin() as session:
+                    self._repository.set_many_last_update_datetime(self._pending_update_datetimes)
+                    session.commit()
+            finally:
+                if self._remove_session_after_use and not is_session_scope_active(self._session_factory):
+                    self._session_factory.remove()
+            self._last_flush_duration = timedelta(seconds=time.perf_counter() - flush_start_time)
+            self._pending_update_datetimes = {}
+            self._first_pending_monotonic_time = None
+            self._flush_retry_datetime = None
+
+    def _try_flush(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Flushing %s update datetimes failed, retry in %s",
+                             len(self._pending_update_datetimes), self._flush_retry_delay)
+            self._flush_retry_datetime = datetime.now(tz=timezone.utc) + self._flush_retry_delay
+
+    def _is_flush_threshold_reached(self) -> bool:
+        if self._max_pending_count is not None and \
+                len(self._pending_update_datetimes) >= self._max_pending_count:
+            return True
+        if self._max_pending_time is not None and \
+                time.monotonic() - self._first_pending_monotonic_time >= self._max_pending_time.total_seconds():
+            return True
+        return False
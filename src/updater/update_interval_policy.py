@@ -0,0 +1,58 @@
+import threading
+from datetime import timedelta
+from typing import Optional
+
+
+class AbstractUpdateIntervalPolicy:
+
+    def get_update_interval(self) -> Optional[timedelta]:
+        raise NotImplementedError
+
+    def on_update(self, changed: bool) -> None:
+        raise NotImplementedError
+
+
+class FixedUpdateIntervalPolicy(AbstractUpdateIntervalPolicy):
+
+    def __init__(self, update_interval: Optional[timedelta]) -> None:
+        self._update_interval = update_interval
+
+    def get_update_interval(self) -> Optional[timedelta]:
+        return self._update_interval
+
+    def on_update(self, changed: bool) -> None:
+        pass
+
+
+class AdaptiveUpdateIntervalPolicy(AbstractUpdateIntervalPolicy):
+
+    def __init__(self,
+                 min_update_interval: timedelta,
+                 max_update_interval: timedelta,
+                 initial_update_interval: Optional[timedelta] = None,
+                 lengthen_factor: float = 2.0,
+                 shorten_factor: float = 0.5
+                 ) -> None:
+        if min_update_interval <= timedelta(0) or min_update_interval > max_update_interval:
+            raise ValueError(f"Invalid update interval bounds [{min_update_interval}, {max_update_interval}]")
+        if lengthen_factor < 1.0 or not 0.0 < shorten_factor <= 1.0:
+            raise ValueError(f"Invalid update interval factors {lengthen_factor}, {shorten_factor}")
+        if initial_update_interval is None:
+            initial_update_interval = min_update_interval
+        self._min_update_interval = min_update_interval
+        self._max_update_interval = max_update_interval
+        self._lengthen_factor = lengthen_factor
+        self._shorten_factor = shorten_factor
+        self._update_interval = self._clamp(initial_update_interval)
+        self._lock = threading.Lock()
+
+    def get_update_interval(self) -> Optional[timedelta]:
+        return self._update_interval
+
+    def on_update(self, changed: bool) -> None:
+        with self._lock:
+            factor = self._shorten_factor if changed else self._lengthen_factor
+            self._update_interval = self._clamp(self._update_interval * factor)
+
+    def _clamp(self, update_interval: timedelta) -> timedelta:
+        return min(max(update_interval, self._min_update_interval), self._max_update_interval)
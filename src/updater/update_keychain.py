@@ -1,9 +1,16 @@
+import threading
+import weakref
+import zlib
 from datetime import timedelta, datetime
 from typing import List, Optional, Union
 
+from updater.dependency_graph import DependencyGraph
 from updater.update_datetime_memento.update_datetime_memento import \
+    AbstractAsyncUpdateDatetimeMemento, \
     AbstractUpdateDatetimeMemento, \
     InMemoryUpdateDatetimeMemento
+from updater.update_interval_policy import AbstractUpdateIntervalPolicy, FixedUpdateIntervalPolicy
+from updater.update_lease import AbstractAsyncUpdateLease, AbstractUpdateLease
 
 
 class UpdateKeychain:
@@ -11,28 +18,101 @@ class UpdateKeychain:
     def __init__(self,
                  update_interval: Optional[timedelta] = None,
                  dependencies: Optional[List[__qualname__]] = None,
-                 update_datetime_memento: AbstractUpdateDatetimeMemento = None
+                 update_datetime_memento: Union[AbstractUpdateDatetimeMemento,
+                                                AbstractAsyncUpdateDatetimeMemento] = None,
+                 update_interval_policy: Optional[AbstractUpdateIntervalPolicy] = None,
+                 update_jitter: float = 0.0,
+                 jitter_key: Optional[str] = None,
+                 update_lease: Union[AbstractUpdateLease, AbstractAsyncUpdateLease, None] = None
                  ) -> None:
-        self._update_interval = update_interval
+        if update_interval_policy is None:
+            update_interval_policy = FixedUpdateIntervalPolicy(update_interval)
+        elif update_interval is not None:
+            raise ValueError("Update interval and update interval policy are mutually exclusive")
+        self._update_interval_policy = update_interval_policy
+        if not 0.0 <= update_jitter <= 1.0:
+            raise ValueError(f"Update jitter must be in [0, 1], got {update_jitter}")
+        if update_jitter and jitter_key is None:
+            raise ValueError("Jitter key must be set to a name that is stable across processes to use update jitter")
+        self._update_jitter = update_jitter
+        self._jitter_key = jitter_key
+        self._update_lease = update_lease
         if dependencies is None:
             dependencies = []
         self._dependencies = dependencies.copy()
         if update_datetime_memento is None:
             update_datetime_memento = InMemoryUpdateDatetimeMemento()
         self._update_datetime_memento = update_datetime_memento
+        self._is_update_datetime_memento_async = \
+            isinstance(update_datetime_memento, AbstractAsyncUpdateDatetimeMemento)
+        self._dependency_graph: Optional[DependencyGraph] = None
+        self._attached_dependency_graphs: 'weakref.WeakSet[DependencyGraph]' = weakref.WeakSet()
+        self._attached_dependency_graphs_lock = threading.Lock()
 
     def get_dependencies(self) -> List[__qualname__]:
         return self._dependencies.copy()
 
+    def set_dependencies(self, dependencies: List[__qualname__]) -> None:
+        self._dependencies = dependencies.copy()
+        with self._attached_dependency_graphs_lock:
+            attached_dependency_graphs = list(self._attached_dependency_graphs)
+        for dependency_graph in attached_dependency_graphs:
+            dependency_graph.mark_outdated()
+
+    def attach_dependency_graph(self, dependency_graph: DependencyGraph) -> None:
+        with self._attached_dependency_graphs_lock:
+            self._attached_dependency_graphs.add(dependency_graph)
+
+    def get_dependency_graph(self) -> DependencyGraph:
+        dependency_graph = self._dependency_graph
+        if dependency_graph is None or dependency_graph.is_outdated():
+            dependency_graph = DependencyGraph([self])
+            self._dependency_graph = dependency_graph
+        return dependency_graph
+
+    def get_update_lease(self) -> Union[AbstractUpdateLease, AbstractAsyncUpdateLease, None]:
+        return self._update_lease
+
+    def get_update_interval_policy(self) -> AbstractUpdateIntervalPolicy:
+        return self._update_interval_policy
+
     def get_next_update_datetime(self) -> Union[datetime, None]:
-        next_update_datetime = None
-        last_update_datetime = self.get_last_update_datetime()
-        if self._update_interval is not None and last_update_datetime is not None:
-            next_update_datetime = last_update_datetime + self._update_interval
-        return next_update_datetime
+        return self._calc_next_update_datetime(self.get_last_update_datetime())
+
+    async def async_get_next_update_datetime(self) -> Union[datetime, None]:
+        return self._calc_next_update_datetime(await self.async_get_last_update_datetime())
 
     def get_last_update_datetime(self) -> datetime:
+        if self._is_update_datetime_memento_async:
+            raise TypeError("Async update datetime memento can be loaded only with async_get_last_update_datetime")
+        return self._update_datetime_memento.load()
+
+    async def async_get_last_update_datetime(self) -> datetime:
+        if self._is_update_datetime_memento_async:
+            return await self._update_datetime_memento.load()
         return self._update_datetime_memento.load()
 
     def set_last_update_datetime(self, update_datetime: datetime) -> None:
+        if self._is_update_datetime_memento_async:
+            raise TypeError("Async update datetime memento can be stored only with async_set_last_update_datetime")
         self._update_datetime_memento.store(update_datetime)
+
+    async def async_set_last_update_datetime(self, update_datetime: datetime) -> None:
+        if self._is_update_datetime_memento_async:
+            await self._update_datetime_memento.store(update_datetime)
+        else:
+            self._update_datetime_memento.store(update_datetime)
+
+    def _calc_next_update_datetime(self, last_update_datetime: Optional[datetime]) -> Union[datetime, None]:
+        next_update_datetime = None
+        update_interval = self._update_interval_policy.get_update_interval()
+        if update_interval is not None and last_update_datetime is not None:
+            next_update_datetime = last_update_datetime + update_interval
+            if self._update_jitter:
+                next_update_datetime += update_interval * (self._update_jitter *
+                                                           self._calc_jitter_fraction(last_update_datetime))
+        return next_update_datetime
+
+    def _calc_jitter_fraction(self, last_update_datetime: datetime) -> float:
+        jitter_seed = f"{self._jitter_key}:{last_update_datetime.timestamp()!r}".encode()
+        return zlib.crc32(jitter_seed) / 2 ** 32
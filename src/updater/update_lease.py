@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+
+class UpdateLeaseIsHeldError(Exception):
+
+    def __init__(self, recheck_datetime: datetime) -> None:
+        super().__init__(f"Update lease is held by another updater, recheck at {recheck_datetime}")
+        self._recheck_datetime = recheck_datetime
+
+    def get_recheck_datetime(self) -> datetime:
+        return self._recheck_datetime
+
+
+class AbstractUpdateLease:
+
+    def try_claim(self, last_update_datetime: Optional[datetime]) -> bool:
+        raise NotImplementedError
+
+    def release(self) -> None:
+        raise NotImplementedError
+
+    def get_recheck_interval(self) -> timedelta:
+        raise NotImplementedError
+
+
+class AbstractAsyncUpdateLease:
+
+    async def try_claim(self, last_update_datetime: Optional[datetime]) -> bool:
+        raise NotImplementedError
+
+    async def release(self) -> None:
+        raise NotImplementedError
+
+    def get_recheck_interval(self) -> timedelta:
+        raise NotImplementedError
@@ -0,0 +1,30 @@
+import threading
+import time
+from typing import Callable
+
+
+class UpdateRateLimiter:
+
+    def __init__(self,
+                 updates_per_second: float,
+                 burst: int = 1,
+                 clock: Callable[[], float] = time.monotonic
+                 ) -> None:
+        if updates_per_second <= 0 or burst < 1:
+            raise ValueError(f"Invalid rate limit {updates_per_second} updates per second with burst {burst}")
+        self._updates_per_second = updates_per_second
+        self._burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._last_refill_time = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self._burst, self._tokens + (now - self._last_refill_time) * self._updates_per_second)
+            self._last_refill_time = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self._updates_per_second
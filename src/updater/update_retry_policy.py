@@ -0,0 +1,40 @@
+import random
+from datetime import timedelta
+from typing import Optional
+
+
+class AbstractUpdateRetryPolicy:
+
+    def get_retry_delay(self, failures_count: int) -> timedelta:
+        raise NotImplementedError
+
+
+class ExponentialBackoffRetryPolicy(AbstractUpdateRetryPolicy):
+
+    _max_exponent = 64
+
+    def __init__(self,
+                 initial_delay: timedelta = timedelta(seconds=1),
+                 max_delay: timedelta = timedelta(minutes=10),
+                 multiplier: float = 2.0,
+                 jitter: float = 0.1,
+                 random_generator: Optional[random.Random] = None
+                 ) -> None:
+        if initial_delay < timedelta(0) or initial_delay > max_delay:
+            raise ValueError(f"Invalid retry delay bounds [{initial_delay}, {max_delay}]")
+        if multiplier < 1.0 or not 0.0 <= jitter <= 1.0:
+            raise ValueError(f"Invalid retry multiplier {multiplier} or jitter {jitter}")
+        if random_generator is None:
+            random_generator = random.Random()
+        self._initial_delay_seconds = initial_delay.total_seconds()
+        self._max_delay_seconds = max_delay.total_seconds()
+        self._multiplier = multiplier
+        self._jitter = jitter
+        self._random_generator = random_generator
+
+    def get_retry_delay(self, failures_count: int) -> timedelta:
+        exponent = min(max(failures_count - 1, 0), self._max_exponent)
+        delay_seconds = min(self._initial_delay_seconds * self._multiplier ** exponent, self._max_delay_seconds)
+        if self._jitter:
+            delay_seconds *= 1.0 + self._random_generator.uniform(-self._jitter, self._jitter)
+        return timedelta(seconds=delay_seconds)
@@ -0,0 +1,64 @@
+import heapq
+import itertools
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from updater.update_keychain import UpdateKeychain
+
+
+class UpdateTimerHeap:
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[datetime, int, UpdateKeychain]] = []
+        self._scheduled_entries: Dict[UpdateKeychain, Tuple[datetime, int]] = {}
+        self._entries_counter = itertools.count()
+
+    def __contains__(self, item: UpdateKeychain) -> bool:
+        return item in self._scheduled_entries
+
+    def __len__(self) -> int:
+        return len(self._scheduled_entries)
+
+    def schedule(self, item: UpdateKeychain, due_datetime: datetime) -> None:
+        entry_number = next(self._entries_counter)
+        self._scheduled_entries[item] = (due_datetime, entry_number)
+        heapq.heappush(self._heap, (due_datetime, entry_number, item))
+        if len(self._heap) > 2 * len(self._scheduled_entries) + 64:
+            self._compact()
+
+    def cancel(self, item: UpdateKeychain) -> None:
+        self._scheduled_entries.pop(item, None)
+
+    def get_due_datetime(self, item: UpdateKeychain) -> Optional[datetime]:
+        scheduled_entry = self._scheduled_entries.get(item)
+        if scheduled_entry is None:
+            return None
+        return scheduled_entry[0]
+
+    def peek_next_due_datetime(self) -> Optional[datetime]:
+        self._drop_cancelled_heap_top()
+        if not self._heap:
+            return None
+        return self._heap[0][0]
+
+    def pop_due_items(self, current_datetime: datetime) -> List[UpdateKeychain]:
+        due_items = []
+        self._drop_cancelled_heap_top()
+        while self._heap and self._heap[0][0] <= current_datetime:
+            _, _, item = heapq.heappop(self._heap)
+            del self._scheduled_entries[item]
+            due_items.append(item)
+            self._drop_cancelled_heap_top()
+        return due_items
+
+    def _is_entry_actual(self, entry: Tuple[datetime, int, UpdateKeychain]) -> bool:
+        due_datetime, entry_number, item = entry
+        return self._scheduled_entries.get(item) == (due_datetime, entry_number)
+
+    def _drop_cancelled_heap_top(self) -> None:
+        while self._heap and not self._is_entry_actual(self._heap[0]):
+            heapq.heappop(self._heap)
+
+    def _compact(self) -> None:
+        self._heap = [entry for entry in self._heap if self._is_entry_actual(entry)]
+        heapq.heapify(self._heap)
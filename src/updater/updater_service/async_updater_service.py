@@ -1,10 +1,21 @@
 import asyncio
+import time
+from contextlib import AsyncExitStack
 from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import Optional
+from typing import AsyncContextManager, ContextManager, Dict, Iterable, List, Optional, Union
 
+from updater.dependency_graph import DependencyGraph
 from updater.logging import logger
+from updater.metrics import AbstractUpdaterMetricsHook
+from updater.single_flight import AsyncSingleFlight
+from updater.staleness_tracker import StalenessTracker
+from updater.update_cycle_context import AbstractUpdateCycleContext
 from updater.updatable_item import AbstractAsyncUpdatableItem
+from updater.update_lease import UpdateLeaseIsHeldError
+from updater.update_rate_limiter import UpdateRateLimiter
+from updater.update_retry_policy import AbstractUpdateRetryPolicy, ExponentialBackoffRetryPolicy
+from updater.updater_service.ready_items_tracker import ReadyItemsTracker
 from updater import helpers
 
 
@@ -15,21 +26,66 @@ class AsyncUpdaterService:
         STOPPING = 2
         STOPPED = 3
 
-    def __init__(self, item_to_update: AbstractAsyncUpdatableItem) -> None:
-        self._item_to_update = item_to_update
-        self._items_forced_update_queue = asyncio.Queue()
+    def __init__(self,
+                 item_to_update: Optional[AbstractAsyncUpdatableItem] = None,
+                 max_concurrent_updates: int = 1,
+                 update_cycle_contexts: Optional[List[Union[ContextManager, AsyncContextManager]]] = None,
+                 single_flight: Optional[AsyncSingleFlight] = None,
+                 metrics_hook: Optional[AbstractUpdaterMetricsHook] = None,
+                 retry_policy: Optional[AbstractUpdateRetryPolicy] = None,
+                 update_cycle_timeout: Optional[timedelta] = None,
+                 rate_limiter: Optional[UpdateRateLimiter] = None
+                 ) -> None:
+        if max_concurrent_updates < 1:
+            raise ValueError(f"Max concurrent updates must be positive, got {max_concurrent_updates}")
+        self._root_items: Dict[AbstractAsyncUpdatableItem, None] = {}
+        if item_to_update is not None:
+            self._root_items[item_to_update] = None
+        self._dependency_graph: Optional[DependencyGraph] = None
+        self._max_concurrent_updates = max_concurrent_updates
+        if update_cycle_contexts is None:
+            update_cycle_contexts = []
+        if single_flight is None:
+            single_flight = AsyncSingleFlight()
+        self._single_flight = single_flight
+        self._update_cycle_contexts = [single_flight, *update_cycle_contexts]
+        self._metrics_hook = metrics_hook
+        if retry_policy is None:
+            retry_policy = ExponentialBackoffRetryPolicy()
+        self._retry_policy = retry_policy
+        self._update_cycle_timeout = update_cycle_timeout
+        self._rate_limiter = rate_limiter
+        self._update_cycle_task: Optional[asyncio.Task] = None
+        self._staleness_tracker: Optional[StalenessTracker] = None
+        self._items_forced_update: Dict[AbstractAsyncUpdatableItem, None] = {}
         self._wake_up_event = asyncio.Event()
         self._running_state_condition = asyncio.Condition()
         self._running_state = self._ServiceRunningState.STOPPED
-        logger.debug(f"Creating instance. Item to update: {item_to_update}")
+        logger.debug("Creating instance. Item to update: %s", item_to_update)
+
+    def register_root_item(self, item: AbstractAsyncUpdatableItem) -> None:
+        logger.debug("Register root item %s", item.__class__.__name__)
+        self._root_items[item] = None
+        self._dependency_graph = None
+        self._wake_up_event.set()
+
+    def unregister_root_item(self, item: AbstractAsyncUpdatableItem) -> None:
+        logger.debug("Unregister root item %s", item.__class__.__name__)
+        if item not in self._root_items:
+            raise ValueError(f"Item {item} is not registered as root item")
+        del self._root_items[item]
+        self._dependency_graph = None
+        self._wake_up_event.set()
 
     async def force_item_update(self, item: AbstractAsyncUpdatableItem) -> None:
-        logger.debug(f"Force item update {item.__class__.__name__}")
-        all_items = helpers.get_dependencies_list(self._item_to_update)
-        all_items.append(self._item_to_update)
-        if item not in all_items:
-            raise ValueError(f"Service does not own item  {item}")
-        await self._items_forced_update_queue.put(item)
+        logger.debug("Force item update %s", item.__class__.__name__)
+        await self.force_items_update([item])
+
+    async def force_items_update(self, items: Iterable[AbstractAsyncUpdatableItem]) -> None:
+        items = dict.fromkeys(items)
+        logger.debug("Force update of %s items", len(items))
+        self._check_items_owned(items)
+        self._items_forced_update.update(items)
         self._wake_up_event.set()
 
     async def join(self, timeout: Optional[float] = None) -> None:
@@ -47,14 +103,17 @@ class AsyncUpdaterService:
                 pass
 
     def is_running(self) -> bool:
-        logger.debug(f"Service running status is {self._running_state}")
+        logger.debug("Service running status is %s", self._running_state)
         return self._running_state is not self._ServiceRunningState.STOPPED
 
-    async def stop_service(self) -> None:
+    async def stop_service(self, cancel_running_updates: bool = False) -> None:
         logger.debug("Stopping service")
         if self._running_state is self._ServiceRunningState.RUNNING:
             await self._set_running_state(self._ServiceRunningState.STOPPING)
             self._wake_up_event.set()
+        if cancel_running_updates and self._update_cycle_task is not None:
+            logger.debug("Cancelling running updates")
+            self._update_cycle_task.cancel()
 
     async def start_service(self) -> None:
         logger.debug("Starting service")
@@ -69,46 +128,240 @@ class AsyncUpdaterService:
         try:
             while self._running_state is self._ServiceRunningState.RUNNING:
                 logger.debug("Run update cycle")
-                if not self._items_forced_update_queue.empty():
-                    await self._update_one_item_from_queue()
-                await self._update_items_full_cycle()
-                await self._sleep_to_next_update_or_signal()
+                async with AsyncExitStack() as update_cycle_stack:
+                    await self._enter_update_cycle_contexts(update_cycle_stack)
+                    if self._items_forced_update:
+                        self._take_forced_items()
+                    update_cycle_start_time = time.perf_counter()
+                    update_cycle_completed = await self._run_update_cycle_task()
+                    if self._metrics_hook is not None:
+                        self._metrics_hook.on_update_cycle(time.perf_counter() - update_cycle_start_time)
+                    if update_cycle_completed:
+                        next_update_datetime = self._get_staleness_tracker().get_next_update_datetime()
+                    else:
+                        next_update_datetime = datetime.now(tz=timezone.utc)
+                next_update_datetime = self._get_next_wake_up_datetime(next_update_datetime)
+                await self._sleep_to_next_update_or_signal(next_update_datetime)
+            self._stop_update_cycle_contexts()
         finally:
             await self._set_running_state(self._ServiceRunningState.STOPPED)
 
+    async def _run_update_cycle_task(self) -> bool:
+        self._update_cycle_task = asyncio.create_task(self._update_items_full_cycle())
+        try:
+            return await self._update_cycle_task
+        except asyncio.CancelledError:
+            if self._running_state is self._ServiceRunningState.RUNNING:
+                raise
+            logger.debug("Update cycle is cancelled by service stop")
+            return False
+        finally:
+            self._update_cycle_task = None
+
+    def _get_next_wake_up_datetime(self, next_update_datetime: Optional[datetime]) -> Optional[datetime]:
+        for update_cycle_context in self._update_cycle_contexts:
+            if isinstance(update_cycle_context, AbstractUpdateCycleContext):
+                wake_up_datetime = update_cycle_context.get_next_wake_up_datetime()
+                if wake_up_datetime is not None and \
+                        (next_update_datetime is None or wake_up_datetime < next_update_datetime):
+                    next_update_datetime = wake_up_datetime
+        return next_update_datetime
+
+    def _stop_update_cycle_contexts(self) -> None:
+        for update_cycle_context in self._update_cycle_contexts:
+            if isinstance(update_cycle_context, AbstractUpdateCycleContext):
+                update_cycle_context.on_service_stop()
+
+    def _check_items_owned(self, items: Iterable[AbstractAsyncUpdatableItem]) -> None:
+        dependency_graph = self._get_dependency_graph()
+        for item in items:
+            if item not in dependency_graph:
+                raise ValueError(f"Service does not own item  {item}")
+
     async def _set_running_state(self, state: _ServiceRunningState) -> None:
-        logger.debug(f"Set running state to {state.name}")
+        logger.debug("Set running state to %s", state.name)
         async with self._running_state_condition:
             self._running_state = state
             self._running_state_condition.notify_all()
 
-    async def _update_items_full_cycle(self) -> None:
+    async def _enter_update_cycle_contexts(self, update_cycle_stack: AsyncExitStack) -> None:
+        for update_cycle_context in self._update_cycle_contexts:
+            if hasattr(update_cycle_context, "__aenter__"):
+                await update_cycle_stack.enter_async_context(update_cycle_context)
+            else:
+                update_cycle_stack.enter_context(update_cycle_context)
+
+    def _get_dependency_graph(self) -> DependencyGraph:
+        dependency_graph = self._dependency_graph
+        if dependency_graph is None or dependency_graph.is_outdated():
+            dependency_graph = DependencyGraph(self._root_items)
+            self._dependency_graph = dependency_graph
+        return dependency_graph
+
+    def _get_staleness_tracker(self) -> StalenessTracker:
+        dependency_graph = self._get_dependency_graph()
+        if self._staleness_tracker is None or \
+                self._staleness_tracker.get_dependency_graph() is not dependency_graph:
+            logger.debug("Creating staleness tracker for dependency graph")
+            self._staleness_tracker = StalenessTracker(dependency_graph, self._staleness_tracker)
+        return self._staleness_tracker
+
+    async def _update_items_full_cycle(self) -> bool:
         logger.debug("Requested items to update unpacked graph")
+        loop = asyncio.get_running_loop()
+        update_cycle_deadline = None
+        if self._update_cycle_timeout is not None:
+            update_cycle_deadline = loop.time() + self._update_cycle_timeout.total_seconds()
         update_start_datetime = datetime.now(tz=timezone.utc)
-        items_to_update_list = helpers.get_dependencies_list(self._item_to_update)
-        items_to_update_list.append(self._item_to_update)
-        for item in items_to_update_list:
-            if helpers.is_need_update_item(item, update_start_datetime):
-                logger.debug(f"Updating item {item.__class__.__name__}")
-                # noinspection PyUnresolvedReferences
-                await item.update()
+        staleness_tracker = self._get_staleness_tracker()
+        await self._verify_items_staleness(staleness_tracker, update_start_datetime)
+        ready_items_tracker = ReadyItemsTracker(
+            staleness_tracker.get_dependency_graph(),
+            staleness_tracker.get_items_to_update()
+        )
+        running_updates: Dict[asyncio.Task, AbstractAsyncUpdatableItem] = {}
+        try:
+            while not ready_items_tracker.is_finished():
+                if update_cycle_deadline is not None and loop.time() >= update_cycle_deadline:
+                    logger.warning("Update cycle deadline is exceeded, cancelling %s running updates",
+                                   len(running_updates))
+                    for update_task in running_updates:
+                        update_task.cancel()
+                    if running_updates:
+                        await asyncio.wait(running_updates)
+                    for update_task, item in running_updates.items():
+                        await self._complete_item_update(update_task, item, staleness_tracker, ready_items_tracker)
+                    running_updates.clear()
+                    return False
+                while ready_items_tracker.has_ready_items() and \
+                        len(running_updates) < self._max_concurrent_updates:
+                    item = ready_items_tracker.pop_ready_item()
+                    if staleness_tracker.is_stale(item):
+                        logger.debug("Updating item %s", item.__class__.__name__)
+                        await self._wait_rate_limit()
+                        running_updates[asyncio.create_task(self._update_item(item))] = item
+                    else:
+                        ready_items_tracker.mark_done(item)
+                if running_updates:
+                    wait_timeout = None
+                    if update_cycle_deadline is not None:
+                        wait_timeout = max(update_cycle_deadline - loop.time(), 0)
+                    done_updates, _ = await asyncio.wait(
+                        running_updates,
+                        timeout=wait_timeout,
+                        return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for update_task in done_updates:
+                        item = running_updates.pop(update_task)
+                        await self._complete_item_update(update_task, item, staleness_tracker, ready_items_tracker)
+        finally:
+            for update_task in running_updates:
+                update_task.cancel()
         logger.debug("Items are updated")
+        return True
+
+    async def _complete_item_update(self,
+                                    update_task: asyncio.Task,
+                                    item: AbstractAsyncUpdatableItem,
+                                    staleness_tracker: StalenessTracker,
+                                    ready_items_tracker: ReadyItemsTracker
+                                    ) -> None:
+        try:
+            update_task.result()
+        except UpdateLeaseIsHeldError as error:
+            staleness_tracker.mark_deferred(item, error.get_recheck_datetime())
+            ready_items_tracker.mark_failed(item)
+        except (Exception, asyncio.CancelledError):
+            self._handle_item_update_failure(item, staleness_tracker, ready_items_tracker)
+        else:
+            staleness_tracker.mark_updated(
+                item,
+                await item.async_get_next_update_datetime(),
+                await item.async_get_last_update_datetime()
+            )
+            ready_items_tracker.mark_done(item)
+
+    async def _wait_rate_limit(self) -> None:
+        if self._rate_limiter is not None:
+            delay = self._rate_limiter.reserve()
+            if delay:
+                logger.debug("Rate limit is reached, waiting %s seconds", delay)
+                await asyncio.sleep(delay)
+
+    async def _update_item(self, item: AbstractAsyncUpdatableItem) -> None:
+        if self._metrics_hook is None:
+            # noinspection PyUnresolvedReferences
+            await self._single_flight.do(item, item.update)
+            return
+        next_update_datetime = await item.async_get_next_update_datetime()
+        if next_update_datetime is not None:
+            staleness_lag = datetime.now(tz=timezone.utc) - next_update_datetime
+            self._metrics_hook.on_item_staleness_lag(item, staleness_lag.total_seconds())
+        update_start_time = time.perf_counter()
+        succeeded = False
+        try:
+            # noinspection PyUnresolvedReferences
+            await self._single_flight.do(item, item.update)
+            succeeded = True
+        finally:
+            self._metrics_hook.on_item_update(item, time.perf_counter() - update_start_time, succeeded)
+
+    def _handle_item_update_failure(self,
+                                    item: AbstractAsyncUpdatableItem,
+                                    staleness_tracker: StalenessTracker,
+                                    ready_items_tracker: ReadyItemsTracker
+                                    ) -> None:
+        failures_count = staleness_tracker.get_failures_count(item) + 1
+        retry_delay = self._retry_policy.get_retry_delay(failures_count)
+        logger.exception("Item %s update failed %s times in a row, retry in %s",
+                         item.__class__.__name__, failures_count, retry_delay)
+        staleness_tracker.mark_failed(item, datetime.now(tz=timezone.utc) + retry_delay)
+        skipped_items = ready_items_tracker.mark_failed(item)
+        logger.debug("Skipped update of %s dependent items", len(skipped_items))
+
+    @staticmethod
+    async def _verify_items_staleness(staleness_tracker: StalenessTracker, update_start_datetime: datetime) -> None:
+        dependency_graph = staleness_tracker.get_dependency_graph()
+        for item in staleness_tracker.pop_unverified_items():
+            if await helpers.async_is_need_update_item(item, update_start_datetime, dependency_graph):
+                staleness_tracker.mark_stale(item)
+            else:
+                staleness_tracker.observe_last_update_datetime(item, await item.async_get_last_update_datetime())
+                staleness_tracker.schedule(item, await item.async_get_next_update_datetime())
+        for item in staleness_tracker.pop_expired_items(update_start_datetime):
+            if await helpers.async_have_item_update_datetime_been_come(item, update_start_datetime):
+                staleness_tracker.mark_stale(item)
+            else:
+                staleness_tracker.observe_last_update_datetime(item, await item.async_get_last_update_datetime())
+                staleness_tracker.schedule(item, await item.async_get_next_update_datetime())
+
+    def _take_forced_items(self) -> None:
+        items_forced_update = self._items_forced_update
+        self._items_forced_update = {}
+        logger.debug("Requested forced update of %s items", len(items_forced_update))
+        if self._metrics_hook is not None:
+            self._metrics_hook.on_forced_items_queue_depth(len(items_forced_update))
+        staleness_tracker = self._get_staleness_tracker()
+        dependency_graph = staleness_tracker.get_dependency_graph()
+        for item in items_forced_update:
+            if item not in dependency_graph:
+                logger.debug("Dropping forced update of %s, item is no longer in dependency graph",
+                             item.__class__.__name__)
+                continue
+            staleness_tracker.mark_stale(item)
 
-    async def _update_one_item_from_queue(self) -> None:
-        logger.debug("Requested forced item update")
-        item_to_update: AbstractAsyncUpdatableItem = await self._items_forced_update_queue.get()
-        logger.debug(f"Updating item {item_to_update.__class__.__name__}")
-        await item_to_update.update()
-
-    async def _sleep_to_next_update_or_signal(self) -> None:
-        next_update_datetime = helpers.calc_next_update_datetime(self._item_to_update)
-        timedelta_to_next_update = next_update_datetime - datetime.now(tz=timezone.utc)
-        timedelta_to_next_update = max(timedelta_to_next_update, timedelta(seconds=0))
-        logger.debug(f"Sleeping {timedelta_to_next_update}")
+    async def _sleep_to_next_update_or_signal(self, next_update_datetime: Optional[datetime]) -> None:
+        timeout = None
+        if next_update_datetime is not None:
+            timedelta_to_next_update = next_update_datetime - datetime.now(tz=timezone.utc)
+            timedelta_to_next_update = max(timedelta_to_next_update, timedelta(seconds=0))
+            timeout = timedelta_to_next_update.total_seconds()
+        logger.debug("Sleeping %s seconds", timeout)
         try:
             await asyncio.wait_for(
                 self._wake_up_event.wait(),
-                timeout=timedelta_to_next_update.total_seconds()
+                timeout=timeout
             )
-        except TimeoutError:
+        except asyncio.TimeoutError:
             pass
+        self._wake_up_event.clear()
@@ -0,0 +1,60 @@
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from updater.dependency_graph import DependencyGraph
+from updater.update_keychain import UpdateKeychain
+
+
+class ReadyItemsTracker:
+
+    def __init__(self,
+                 dependency_graph: DependencyGraph,
+                 items: Optional[Iterable[UpdateKeychain]] = None
+                 ) -> None:
+        if items is None:
+            items = dependency_graph.get_items()
+        self._dependency_graph = dependency_graph
+        self._pending_dependencies_count: Dict[UpdateKeychain, int] = dict.fromkeys(items, 0)
+        self._ready_items_heap: List[Tuple[int, UpdateKeychain]] = []
+        self._unfinished_items_count = len(self._pending_dependencies_count)
+        for item in self._pending_dependencies_count:
+            for dependency in dependency_graph.get_dependencies(item):
+                if dependency in self._pending_dependencies_count:
+                    self._pending_dependencies_count[item] += 1
+            if self._pending_dependencies_count[item] == 0:
+                self._push_ready_item(item)
+
+    def has_ready_items(self) -> bool:
+        return bool(self._ready_items_heap)
+
+    def pop_ready_item(self) -> UpdateKeychain:
+        _, item = heapq.heappop(self._ready_items_heap)
+        return item
+
+    def mark_done(self, item: UpdateKeychain) -> None:
+        self._unfinished_items_count -= 1
+        for dependent in self._dependency_graph.get_dependents(item):
+            pending_dependencies_count = self._pending_dependencies_count.get(dependent)
+            if pending_dependencies_count is not None:
+                pending_dependencies_count -= 1
+                self._pending_dependencies_count[dependent] = pending_dependencies_count
+                if pending_dependencies_count == 0:
+                    self._push_ready_item(dependent)
+
+    def mark_failed(self, item: UpdateKeychain) -> List[UpdateKeychain]:
+        self._unfinished_items_count -= 1
+        skipped_items = []
+        items_to_skip = list(self._dependency_graph.get_dependents(item))
+        while items_to_skip:
+            dependent = items_to_skip.pop()
+            if self._pending_dependencies_count.pop(dependent, None) is not None:
+                self._unfinished_items_count -= 1
+                skipped_items.append(dependent)
+                items_to_skip.extend(self._dependency_graph.get_dependents(dependent))
+        return skipped_items
+
+    def is_finished(self) -> bool:
+        return self._unfinished_items_count == 0
+
+    def _push_ready_item(self, item: UpdateKeychain) -> None:
+        heapq.heappush(self._ready_items_heap, (self._dependency_graph.get_item_index(item), item))
@@ -1,11 +1,22 @@
-import queue
 import threading
+import time
+from concurrent import futures
+from contextlib import ExitStack
 from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import Optional
+from typing import Callable, ContextManager, Dict, Iterable, List, Optional
 
+from updater.dependency_graph import DependencyGraph
 from updater.logging import logger
+from updater.metrics import AbstractUpdaterMetricsHook
+from updater.single_flight import SyncSingleFlight
+from updater.staleness_tracker import StalenessTracker
+from updater.update_cycle_context import AbstractUpdateCycleContext
 from updater.updatable_item import AbstractSyncUpdatableItem
+from updater.update_lease import UpdateLeaseIsHeldError
+from updater.update_rate_limiter import UpdateRateLimiter
+from updater.update_retry_policy import AbstractUpdateRetryPolicy, ExponentialBackoffRetryPolicy
+from updater.updater_service.ready_items_tracker import ReadyItemsTracker
 from updater import helpers
 
 
@@ -16,22 +27,69 @@ class SyncUpdaterService:
         STOPPING = 2
         STOPPED = 3
 
-    def __init__(self, item_to_update: AbstractSyncUpdatableItem) -> None:
-        self._item_to_update = item_to_update
-        self._items_forced_update_queue = queue.Queue()
+    def __init__(self,
+                 item_to_update: Optional[AbstractSyncUpdatableItem] = None,
+                 executor: Optional[futures.Executor] = None,
+                 update_cycle_contexts: Optional[List[ContextManager]] = None,
+                 single_flight: Optional[SyncSingleFlight] = None,
+                 metrics_hook: Optional[AbstractUpdaterMetricsHook] = None,
+                 retry_policy: Optional[AbstractUpdateRetryPolicy] = None,
+                 rate_limiter: Optional[UpdateRateLimiter] = None
+                 ) -> None:
+        if isinstance(executor, futures.ProcessPoolExecutor):
+            raise ValueError("Items are updated in place, so the executor must run them in the service process")
+        self._root_items: Dict[AbstractSyncUpdatableItem, None] = {}
+        if item_to_update is not None:
+            self._root_items[item_to_update] = None
+        self._root_items_lock = threading.Lock()
+        self._dependency_graph: Optional[DependencyGraph] = None
+        self._executor = executor
+        if update_cycle_contexts is None:
+            update_cycle_contexts = []
+        if single_flight is None:
+            single_flight = SyncSingleFlight()
+        self._single_flight = single_flight
+        self._update_cycle_contexts = [single_flight, *update_cycle_contexts]
+        self._metrics_hook = metrics_hook
+        if retry_policy is None:
+            retry_policy = ExponentialBackoffRetryPolicy()
+        self._retry_policy = retry_policy
+        self._rate_limiter = rate_limiter
+        self._staleness_tracker: Optional[StalenessTracker] = None
+        self._items_forced_update: Dict[AbstractSyncUpdatableItem, None] = {}
+        self._items_forced_update_lock = threading.Lock()
         self._wake_up_event = threading.Event()
         self._running_state_condition = threading.Condition()
         self._running_state = self._ServiceRunningState.STOPPED
         self._runner_thread = threading.Thread(target=self._run)
-        logger.debug(f"Creating instance. Item to update: {item_to_update}")
+        logger.debug("Creating instance. Item to update: %s", item_to_update)
+
+    def register_root_item(self, item: AbstractSyncUpdatableItem) -> None:
+        logger.debug("Register root item %s", item.__class__.__name__)
+        with self._root_items_lock:
+            self._root_items[item] = None
+            self._dependency_graph = None
+        self._wake_up_event.set()
+
+    def unregister_root_item(self, item: AbstractSyncUpdatableItem) -> None:
+        logger.debug("Unregister root item %s", item.__class__.__name__)
+        with self._root_items_lock:
+            if item not in self._root_items:
+                raise ValueError(f"Item {item} is not registered as root item")
+            del self._root_items[item]
+            self._dependency_graph = None
+        self._wake_up_event.set()
 
     def force_item_update(self, item: AbstractSyncUpdatableItem):
-        logger.debug(f"Force item update {item.__class__.__name__}")
-        all_items = helpers.get_dependencies_list(self._item_to_update)
-        all_items.append(self._item_to_update)
-        if item not in all_items:
-            raise ValueError(f"Service does not own item  {item}")
-        self._items_forced_update_queue.put(item)
+        logger.debug("Force item update %s", item.__class__.__name__)
+        self.force_items_update([item])
+
+    def force_items_update(self, items: Iterable[AbstractSyncUpdatableItem]) -> None:
+        items = dict.fromkeys(items)
+        logger.debug("Force update of %s items", len(items))
+        self._check_items_owned(items)
+        with self._items_forced_update_lock:
+            self._items_forced_update.update(items)
         self._wake_up_event.set()
 
     def join(self, timeout: Optional[float] = None) -> None:
@@ -43,7 +101,7 @@ class SyncUpdaterService:
             )
 
     def is_running(self) -> bool:
-        logger.debug(f"Service running status is {self._running_state}")
+        logger.debug("Service running status is %s", self._running_state)
         return self._running_state is not self._ServiceRunningState.STOPPED
 
     def stop_service(self) -> None:
@@ -65,44 +123,199 @@ class SyncUpdaterService:
         try:
             while self._running_state is self._ServiceRunningState.RUNNING:
                 logger.debug("Run update cycle")
-                if not self._items_forced_update_queue.empty():
-                    self._update_one_item_from_queue()
-                self._update_items_full_cycle()
-                self._sleep_to_next_update_or_wake_up_event()
+                with ExitStack() as update_cycle_stack:
+                    for update_cycle_context in self._update_cycle_contexts:
+                        update_cycle_stack.enter_context(update_cycle_context)
+                    if self._items_forced_update:
+                        self._take_forced_items()
+                    update_cycle_start_time = time.perf_counter()
+                    self._update_items_full_cycle()
+                    if self._metrics_hook is not None:
+                        self._metrics_hook.on_update_cycle(time.perf_counter() - update_cycle_start_time)
+                    next_update_datetime = self._get_staleness_tracker().get_next_update_datetime()
+                next_update_datetime = self._get_next_wake_up_datetime(next_update_datetime)
+                self._sleep_to_next_update_or_wake_up_event(next_update_datetime)
+            self._stop_update_cycle_contexts()
         finally:
             self._set_running_state(self._ServiceRunningState.STOPPED)
 
+    def _get_next_wake_up_datetime(self, next_update_datetime: Optional[datetime]) -> Optional[datetime]:
+        for update_cycle_context in self._update_cycle_contexts:
+            if isinstance(update_cycle_context, AbstractUpdateCycleContext):
+                wake_up_datetime = update_cycle_context.get_next_wake_up_datetime()
+                if wake_up_datetime is not None and \
+                        (next_update_datetime is None or wake_up_datetime < next_update_datetime):
+                    next_update_datetime = wake_up_datetime
+        return next_update_datetime
+
+    def _stop_update_cycle_contexts(self) -> None:
+        for update_cycle_context in self._update_cycle_contexts:
+            if isinstance(update_cycle_context, AbstractUpdateCycleContext):
+                update_cycle_context.on_service_stop()
+
+    def _check_items_owned(self, items: Iterable[AbstractSyncUpdatableItem]) -> None:
+        dependency_graph = self._get_dependency_graph()
+        for item in items:
+            if item not in dependency_graph:
+                raise ValueError(f"Service does not own item  {item}")
+
     def _set_running_state(self, state: _ServiceRunningState) -> None:
-        logger.debug(f"Set running state to {state.name}")
+        logger.debug("Set running state to %s", state.name)
         with self._running_state_condition:
             self._running_state = state
             self._running_state_condition.notify_all()
 
+    def _get_dependency_graph(self) -> DependencyGraph:
+        with self._root_items_lock:
+            dependency_graph = self._dependency_graph
+            if dependency_graph is None or dependency_graph.is_outdated():
+                dependency_graph = DependencyGraph(self._root_items)
+                self._dependency_graph = dependency_graph
+        return dependency_graph
+
+    def _get_staleness_tracker(self) -> StalenessTracker:
+        dependency_graph = self._get_dependency_graph()
+        if self._staleness_tracker is None or \
+                self._staleness_tracker.get_dependency_graph() is not dependency_graph:
+            logger.debug("Creating staleness tracker for dependency graph")
+            self._staleness_tracker = StalenessTracker(dependency_graph, self._staleness_tracker)
+        return self._staleness_tracker
+
     def _update_items_full_cycle(self) -> None:
         logger.debug("Updating item with dependencies")
         update_start_datetime = datetime.now(tz=timezone.utc)
-        items_to_update_list = helpers.get_dependencies_list(self._item_to_update)
-        items_to_update_list.append(self._item_to_update)
-        for item in items_to_update_list:
-            if helpers.is_need_update_item(item, update_start_datetime):
-                logger.debug(f"Updating item {item.__class__.__name__}")
-                # noinspection PyUnresolvedReferences
-                item.update()
+        staleness_tracker = self._get_staleness_tracker()
+        self._verify_items_staleness(staleness_tracker, update_start_datetime)
+        ready_items_tracker = ReadyItemsTracker(
+            staleness_tracker.get_dependency_graph(),
+            staleness_tracker.get_items_to_update()
+        )
+        running_updates: Dict[futures.Future, AbstractSyncUpdatableItem] = {}
+        try:
+            while not ready_items_tracker.is_finished():
+                while ready_items_tracker.has_ready_items():
+                    item = ready_items_tracker.pop_ready_item()
+                    if staleness_tracker.is_stale(item):
+                        logger.debug("Updating item %s", item.__class__.__name__)
+                        self._wait_rate_limit()
+                        if self._executor is None:
+                            self._complete_item_update(
+                                item,
+                                lambda: self._update_item(item),
+                                staleness_tracker,
+                                ready_items_tracker
+                            )
+                        else:
+                            running_updates[self._executor.submit(self._update_item, item)] = item
+                    else:
+                        ready_items_tracker.mark_done(item)
+                if running_updates:
+                    done_updates, _ = futures.wait(running_updates, return_when=futures.FIRST_COMPLETED)
+                    for update_future in done_updates:
+                        item = running_updates.pop(update_future)
+                        self._complete_item_update(item, update_future.result, staleness_tracker, ready_items_tracker)
+        finally:
+            for update_future in running_updates:
+                update_future.cancel()
         logger.debug("Items are updated")
 
-    def _update_one_item_from_queue(self):
-        logger.debug("Requested force item update")
-        item_to_update: AbstractSyncUpdatableItem = self._items_forced_update_queue.get()
-        logger.debug(f"Updating item {item_to_update.__class__.__name__}")
-        item_to_update.update()
-
-    def _sleep_to_next_update_or_wake_up_event(self) -> None:
-        next_update_datetime = helpers.calc_next_update_datetime(self._item_to_update)
-        timedelta_to_next_update = next_update_datetime - datetime.now(tz=timezone.utc)
-        timedelta_to_next_update = max(timedelta_to_next_update, timedelta(seconds=0))
-        logger.debug(f"Sleeping {timedelta_to_next_update}")
-        timeout_expired = self._wake_up_event.wait(timedelta_to_next_update.total_seconds())
-        if timeout_expired:
-            logger.debug("Waked up by timeout")
+    def _wait_rate_limit(self) -> None:
+        if self._rate_limiter is not None:
+            delay = self._rate_limiter.reserve()
+            if delay:
+                logger.debug("Rate limit is reached, waiting %s seconds", delay)
+                time.sleep(delay)
+
+    def _update_item(self, item: AbstractSyncUpdatableItem) -> None:
+        if self._metrics_hook is None:
+            # noinspection PyUnresolvedReferences
+            self._single_flight.do(item, item.update)
+            return
+        next_update_datetime = item.get_next_update_datetime()
+        if next_update_datetime is not None:
+            staleness_lag = datetime.now(tz=timezone.utc) - next_update_datetime
+            self._metrics_hook.on_item_staleness_lag(item, staleness_lag.total_seconds())
+        update_start_time = time.perf_counter()
+        succeeded = False
+        try:
+            # noinspection PyUnresolvedReferences
+            self._single_flight.do(item, item.update)
+            succeeded = True
+        finally:
+            self._metrics_hook.on_item_update(item, time.perf_counter() - update_start_time, succeeded)
+
+    def _complete_item_update(self,
+                              item: AbstractSyncUpdatableItem,
+                              get_update_result: Callable[[], None],
+                              staleness_tracker: StalenessTracker,
+                              ready_items_tracker: ReadyItemsTracker
+                              ) -> None:
+        try:
+            get_update_result()
+        except UpdateLeaseIsHeldError as error:
+            staleness_tracker.mark_deferred(item, error.get_recheck_datetime())
+            ready_items_tracker.mark_failed(item)
+        except Exception:
+            self._handle_item_update_failure(item, staleness_tracker, ready_items_tracker)
         else:
+            staleness_tracker.mark_updated(item, item.get_next_update_datetime(), item.get_last_update_datetime())
+            ready_items_tracker.mark_done(item)
+
+    def _handle_item_update_failure(self,
+                                    item: AbstractSyncUpdatableItem,
+                                    staleness_tracker: StalenessTracker,
+                                    ready_items_tracker: ReadyItemsTracker
+                                    ) -> None:
+        failures_count = staleness_tracker.get_failures_count(item) + 1
+        retry_delay = self._retry_policy.get_retry_delay(failures_count)
+        logger.exception("Item %s update failed %s times in a row, retry in %s",
+                         item.__class__.__name__, failures_count, retry_delay)
+        staleness_tracker.mark_failed(item, datetime.now(tz=timezone.utc) + retry_delay)
+        skipped_items = ready_items_tracker.mark_failed(item)
+        logger.debug("Skipped update of %s dependent items", len(skipped_items))
+
+    @staticmethod
+    def _verify_items_staleness(staleness_tracker: StalenessTracker, update_start_datetime: datetime) -> None:
+        dependency_graph = staleness_tracker.get_dependency_graph()
+        for item in staleness_tracker.pop_unverified_items():
+            if helpers.is_need_update_item(item, update_start_datetime, dependency_graph):
+                staleness_tracker.mark_stale(item)
+            else:
+                staleness_tracker.observe_last_update_datetime(item, item.get_last_update_datetime())
+                staleness_tracker.schedule(item, item.get_next_update_datetime())
+        for item in staleness_tracker.pop_expired_items(update_start_datetime):
+            if helpers.have_item_update_datetime_been_come(item, update_start_datetime):
+                staleness_tracker.mark_stale(item)
+            else:
+                staleness_tracker.observe_last_update_datetime(item, item.get_last_update_datetime())
+                staleness_tracker.schedule(item, item.get_next_update_datetime())
+
+    def _take_forced_items(self) -> None:
+        with self._items_forced_update_lock:
+            items_forced_update = self._items_forced_update
+            self._items_forced_update = {}
+        logger.debug("Requested forced update of %s items", len(items_forced_update))
+        if self._metrics_hook is not None:
+            self._metrics_hook.on_forced_items_queue_depth(len(items_forced_update))
+        staleness_tracker = self._get_staleness_tracker()
+        dependency_graph = staleness_tracker.get_dependency_graph()
+        for item in items_forced_update:
+            if item not in dependency_graph:
+                logger.debug("Dropping forced update of %s, item is no longer in dependency graph",
+                             item.__class__.__name__)
+                continue
+            staleness_tracker.mark_stale(item)
+
+    def _sleep_to_next_update_or_wake_up_event(self, next_update_datetime: Optional[datetime]) -> None:
+        timeout = None
+        if next_update_datetime is not None:
+            timedelta_to_next_update = next_update_datetime - datetime.now(tz=timezone.utc)
+            timedelta_to_next_update = max(timedelta_to_next_update, timedelta(seconds=0))
+            timeout = timedelta_to_next_update.total_seconds()
+        logger.debug("Sleeping %s seconds", timeout)
+        waked_up_by_event = self._wake_up_event.wait(timeout)
+        self._wake_up_event.clear()
+        if waked_up_by_event:
             logger.debug("Waked up by event")
+        else:
+            logger.debug("Waked up by timeout")
@@ -0,0 +1,113 @@
+import asyncio
+from datetime import timedelta, datetime, timezone
+from random import randint
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine, async_scoped_session, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from updatable_items_for_tests import AsyncSleepingUpdatableItem
+from updater.helpers import async_is_need_update_item
+from updater.update_datetime_memento.update_datetime_db_repository import \
+    AsyncUpdateDatetimeDBRepository, \
+    UpdateDatetimeDBRecord
+from updater.update_datetime_memento.update_datetime_memento import AsyncUpdateDatetimeMementoWithDBRepo
+from updater.update_keychain import UpdateKeychain
+from updater.updater_service.async_updater_service import AsyncUpdaterService
+
+
+class TestAsyncUpdateDatetimeDBStore:
+
+    records_to_store_count = 3
+
+    @pytest.fixture
+    async def session_factory(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'update_datetime.sqlite'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(UpdateDatetimeDBRecord.metadata.drop_all)
+            await conn.run_sync(UpdateDatetimeDBRecord.metadata.create_all)
+        db_session_maker = sessionmaker(
+            bind=engine,
+            class_=AsyncSession
+        )
+        session_factory = async_scoped_session(
+            db_session_maker,
+            scopefunc=asyncio.current_task
+        )
+        yield session_factory
+        await engine.dispose()
+
+    @pytest.fixture
+    def repository(self, session_factory):
+        return AsyncUpdateDatetimeDBRepository(session_factory)
+
+    @pytest.fixture
+    def record_to_store(self):
+        records = {}
+        datetime_now = datetime.now(tz=timezone.utc)
+        for i in range(self.records_to_store_count):
+            records[f"record_{i}"] = datetime_now + timedelta(seconds=randint(0, 100))
+        return records
+
+    def _create_memento(self, session_factory, repository, memento_name):
+        return AsyncUpdateDatetimeMementoWithDBRepo(
+            db_session_factory=session_factory,
+            update_datetime_repository=repository,
+            memento_name=memento_name
+        )
+
+    @pytest.mark.asyncio
+    async def test_set_get_update_datetime(self, session_factory, repository, record_to_store):
+        async with session_factory.begin():
+            for record_name, record_time in record_to_store.items():
+                await repository.set_last_update_datetime(record_name, record_time)
+
+        async with session_factory.begin():
+            for record_name, record_time in record_to_store.items():
+                assert await repository.get_last_update_datetime(record_name) == record_time
+            assert await repository.get_all_last_updates_datetime() == record_to_store
+        await session_factory.remove()
+
+    @pytest.mark.asyncio
+    async def test_keychain_need_update_by_dependency(self, session_factory, repository):
+        keychain_1 = UpdateKeychain(
+            update_interval=timedelta(seconds=600),
+            update_datetime_memento=self._create_memento(session_factory, repository, "keychain_1")
+        )
+        keychain_2 = UpdateKeychain(
+            update_interval=timedelta(seconds=600),
+            update_datetime_memento=self._create_memento(session_factory, repository, "keychain_2"),
+            dependencies=[keychain_1]
+        )
+        datetime1 = datetime.now(tz=timezone.utc)
+        await keychain_1.async_set_last_update_datetime(datetime1)
+        await keychain_2.async_set_last_update_datetime(datetime1)
+        assert await async_is_need_update_item(keychain_2, datetime1) is False
+
+        await keychain_1.async_set_last_update_datetime(datetime1 + timedelta(seconds=1))
+        assert await async_is_need_update_item(keychain_2, datetime1) is True
+        with pytest.raises(TypeError):
+            keychain_2.get_last_update_datetime()
+
+    # noinspection SpellCheckingInspection
+    @pytest.mark.asyncio
+    @pytest.mark.timeout(60)
+    async def test_service(self, session_factory, repository):
+        item_1 = AsyncSleepingUpdatableItem(
+            update_interval=timedelta(hours=1),
+            update_datetime_memento=self._create_memento(session_factory, repository, "item_1")
+        )
+        item_to_update = AsyncSleepingUpdatableItem(
+            dependencies=[item_1],
+            update_datetime_memento=self._create_memento(session_factory, repository, "item_to_update")
+        )
+        updater_service = AsyncUpdaterService(item_to_update)
+
+        await updater_service.start_service()
+        while not updater_service.is_running():
+            await asyncio.sleep(1)
+        await asyncio.sleep(1)
+        await updater_service.stop_service()
+        await updater_service.join()
+
+        assert await item_1.async_get_last_update_datetime() < await item_to_update.async_get_last_update_datetime()
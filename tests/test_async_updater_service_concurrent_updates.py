@@ -0,0 +1,62 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from updatable_items_for_tests import AsyncSleepingUpdatableItem
+from updater.updater_service.async_updater_service import AsyncUpdaterService
+
+
+class TestAsyncUpdaterServiceConcurrentUpdates:
+
+    @pytest.fixture
+    def item_1(self):
+        return AsyncSleepingUpdatableItem(time_to_sleep=1)
+
+    @pytest.fixture
+    def item_2(self):
+        return AsyncSleepingUpdatableItem(time_to_sleep=1)
+
+    @pytest.fixture
+    def item_3(self, item_1):
+        return AsyncSleepingUpdatableItem(
+            time_to_sleep=1,
+            dependencies=[item_1]
+        )
+
+    @pytest.fixture
+    def item_to_update(self, item_1, item_2, item_3):
+        return AsyncSleepingUpdatableItem(
+            update_interval=timedelta(hours=1),
+            dependencies=[item_1, item_2, item_3]
+        )
+
+    @pytest.fixture
+    def updater_service(self, item_to_update):
+        return AsyncUpdaterService(item_to_update, max_concurrent_updates=3)
+
+    def test_invalid_max_concurrent_updates(self, item_to_update):
+        with pytest.raises(ValueError):
+            AsyncUpdaterService(item_to_update, max_concurrent_updates=0)
+
+    # noinspection SpellCheckingInspection
+    @pytest.mark.asyncio
+    @pytest.mark.timeout(60)
+    async def test_service(self,
+                           updater_service,
+                           item_1,
+                           item_2,
+                           item_3,
+                           item_to_update):
+        await updater_service.start_service()
+        while not updater_service.is_running():
+            await asyncio.sleep(1)
+        await asyncio.sleep(4)
+        await updater_service.stop_service()
+        await updater_service.join()
+
+        assert abs(item_1.get_last_update_datetime() - item_2.get_last_update_datetime()) < timedelta(seconds=0.5)
+        assert item_1.get_last_update_datetime() < item_3.get_last_update_datetime()
+        assert item_2.get_last_update_datetime() < item_3.get_last_update_datetime()
+        assert item_3.get_last_update_datetime() < item_to_update.get_last_update_datetime()
+        assert item_to_update.get_last_update_datetime() - item_1.get_last_update_datetime() < timedelta(seconds=1.5)
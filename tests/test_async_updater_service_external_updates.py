@@ -0,0 +1,34 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from updatable_items_for_tests import AsyncSleepingUpdatableItem
+from updater.updater_service.async_updater_service import AsyncUpdaterService
+
+
+class TestAsyncUpdaterServiceExternalUpdates:
+
+    @pytest.fixture
+    def item_1(self):
+        return AsyncSleepingUpdatableItem(time_to_sleep=0, update_interval=timedelta(seconds=1))
+
+    @pytest.fixture
+    def item_to_update(self, item_1):
+        return AsyncSleepingUpdatableItem(time_to_sleep=0, dependencies=[item_1])
+
+    @pytest.mark.timeout(60)
+    async def test_dependents_of_externally_updated_item_are_updated(self, item_1, item_to_update):
+        updater_service = AsyncUpdaterService(item_to_update)
+        await updater_service.start_service()
+        while item_to_update.update_count == 0:
+            await asyncio.sleep(0.1)
+
+        for _ in range(4):
+            await asyncio.sleep(0.6)
+            await item_1.update()
+        await asyncio.sleep(1.5)
+        await updater_service.stop_service()
+        await updater_service.join()
+
+        assert item_to_update.update_count >= 3
@@ -0,0 +1,68 @@
+from datetime import timedelta
+import asyncio
+
+import pytest
+
+from updatable_items_for_tests import AsyncFailingUpdatableItem, AsyncSleepingUpdatableItem
+from updater.update_retry_policy import ExponentialBackoffRetryPolicy
+from updater.updater_service.async_updater_service import AsyncUpdaterService
+
+
+class TestAsyncUpdaterServiceFailures:
+
+    @pytest.fixture
+    def failing_item(self):
+        return AsyncFailingUpdatableItem(time_to_sleep=0, failures_count=2)
+
+    @pytest.fixture
+    def dependent_item(self, failing_item):
+        return AsyncSleepingUpdatableItem(time_to_sleep=0, dependencies=[failing_item])
+
+    @pytest.fixture
+    def healthy_item(self):
+        return AsyncSleepingUpdatableItem(time_to_sleep=0)
+
+    @pytest.fixture
+    def item_to_update(self, dependent_item, healthy_item):
+        return AsyncSleepingUpdatableItem(
+            time_to_sleep=0,
+            update_interval=timedelta(hours=1),
+            dependencies=[dependent_item, healthy_item]
+        )
+
+    @pytest.fixture
+    def retry_policy(self):
+        return ExponentialBackoffRetryPolicy(initial_delay=timedelta(seconds=0.5), jitter=0)
+
+    @pytest.fixture
+    def updater_service(self, item_to_update, retry_policy):
+        return AsyncUpdaterService(item_to_update, retry_policy=retry_policy)
+
+    @pytest.mark.asyncio
+    @pytest.mark.timeout(60)
+    async def test_failing_item_is_retried_with_backoff(self,
+                                                        updater_service,
+                                                        failing_item,
+                                                        dependent_item,
+                                                        healthy_item,
+                                                        item_to_update):
+        await updater_service.start_service()
+        while not updater_service.is_running():
+            await asyncio.sleep(0.1)
+        await asyncio.sleep(0.25)
+
+        assert updater_service.is_running()
+        assert failing_item.update_count == 1
+        assert healthy_item.update_count == 1
+        assert dependent_item.update_count == 0
+        assert item_to_update.update_count == 0
+
+        while item_to_update.update_count == 0:
+            await asyncio.sleep(0.1)
+        await updater_service.stop_service()
+        await updater_service.join()
+
+        assert failing_item.update_count == 3
+        assert dependent_item.update_count == 1
+        assert healthy_item.update_count == 1
+        assert item_to_update.update_count == 1
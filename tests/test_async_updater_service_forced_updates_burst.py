@@ -0,0 +1,65 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from updatable_items_for_tests import AsyncSleepingUpdatableItem
+from updater.updater_service.async_updater_service import AsyncUpdaterService
+
+
+class TestAsyncUpdaterServiceForcedUpdatesBurst:
+
+    @pytest.fixture
+    def item_1(self):
+        return AsyncSleepingUpdatableItem(
+            time_to_sleep=1,
+            update_interval=timedelta(seconds=600)
+        )
+
+    @pytest.fixture
+    def item_2(self):
+        return AsyncSleepingUpdatableItem(
+            update_interval=timedelta(seconds=600)
+        )
+
+    @pytest.fixture
+    def item_to_update(self, item_1, item_2):
+        return AsyncSleepingUpdatableItem(
+            dependencies=[item_1, item_2]
+        )
+
+    @pytest.fixture
+    def updater_service(self, item_to_update):
+        return AsyncUpdaterService(item_to_update)
+
+    # noinspection SpellCheckingInspection
+    @pytest.mark.asyncio
+    @pytest.mark.timeout(60)
+    async def test_service(self,
+                           updater_service,
+                           item_1,
+                           item_2,
+                           item_to_update):
+        await updater_service.start_service()
+        while not updater_service.is_running():
+            await asyncio.sleep(1)
+        await asyncio.sleep(2)
+        await updater_service.force_item_update(item_1)
+        await asyncio.sleep(0.3)
+        for _ in range(10):
+            await updater_service.force_item_update(item_1)
+            await updater_service.force_items_update([item_1, item_2, item_2])
+        await asyncio.sleep(3)
+        await updater_service.stop_service()
+        await updater_service.join()
+
+        assert item_1.update_count == 3
+        assert item_2.update_count == 2
+        assert item_to_update.update_count == 3
+        assert item_1.get_last_update_datetime() < item_to_update.get_last_update_datetime()
+        assert item_2.get_last_update_datetime() < item_to_update.get_last_update_datetime()
+
+    @pytest.mark.asyncio
+    async def test_force_not_owned_items(self, updater_service, item_1):
+        with pytest.raises(ValueError):
+            await updater_service.force_items_update([item_1, AsyncSleepingUpdatableItem()])
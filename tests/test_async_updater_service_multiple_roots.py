@@ -0,0 +1,92 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from updatable_items_for_tests import AsyncSleepingUpdatableItem
+from updater.updater_service.async_updater_service import AsyncUpdaterService
+
+
+class TestAsyncUpdaterServiceMultipleRoots:
+
+    @pytest.fixture
+    def shared_item(self):
+        return AsyncSleepingUpdatableItem(
+            update_interval=timedelta(seconds=600)
+        )
+
+    @pytest.fixture
+    def root_item_1(self, shared_item):
+        return AsyncSleepingUpdatableItem(
+            dependencies=[shared_item]
+        )
+
+    @pytest.fixture
+    def root_item_2(self, shared_item):
+        return AsyncSleepingUpdatableItem(
+            dependencies=[shared_item]
+        )
+
+    @pytest.fixture
+    def root_item_3(self, shared_item):
+        return AsyncSleepingUpdatableItem(
+            dependencies=[shared_item]
+        )
+
+    @pytest.fixture
+    def updater_service(self):
+        return AsyncUpdaterService()
+
+    # noinspection SpellCheckingInspection
+    @pytest.mark.timeout(60)
+    @pytest.mark.asyncio
+    async def test_service(self,
+                           updater_service,
+                           shared_item,
+                           root_item_1,
+                           root_item_2,
+                           root_item_3):
+        updater_service.register_root_item(root_item_1)
+        updater_service.register_root_item(root_item_2)
+        await updater_service.start_service()
+        while not updater_service.is_running():
+            await asyncio.sleep(1)
+        await asyncio.sleep(1)
+        updater_service.register_root_item(root_item_3)
+        updater_service.unregister_root_item(root_item_1)
+        await asyncio.sleep(1)
+        with pytest.raises(ValueError):
+            await updater_service.force_item_update(root_item_1)
+        await updater_service.stop_service()
+        await updater_service.join()
+
+        assert shared_item.update_count == 1
+        assert root_item_1.update_count == 1
+        assert root_item_2.update_count == 1
+        assert root_item_3.update_count == 1
+        assert shared_item.get_last_update_datetime() < root_item_3.get_last_update_datetime()
+
+    def test_unregister_unknown_root_item(self, updater_service, root_item_1):
+        with pytest.raises(ValueError):
+            updater_service.unregister_root_item(root_item_1)
+
+    @pytest.mark.timeout(60)
+    @pytest.mark.asyncio
+    async def test_forced_update_of_unregistered_root_item(self,
+                                                           updater_service,
+                                                           shared_item,
+                                                           root_item_1,
+                                                           root_item_2):
+        updater_service.register_root_item(root_item_1)
+        updater_service.register_root_item(root_item_2)
+        await updater_service.force_item_update(root_item_1)
+        updater_service.unregister_root_item(root_item_1)
+        await updater_service.start_service()
+        await asyncio.sleep(2)
+        assert updater_service.is_running()
+        await updater_service.stop_service()
+        await updater_service.join()
+
+        assert root_item_1.update_count == 0
+        assert root_item_2.update_count == 1
+        assert shared_item.update_count == 1
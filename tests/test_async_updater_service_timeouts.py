@@ -0,0 +1,83 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from updatable_items_for_tests import AsyncSleepingUpdatableItem
+from updater.update_retry_policy import ExponentialBackoffRetryPolicy
+from updater.updater_service.async_updater_service import AsyncUpdaterService
+
+
+class TestAsyncUpdaterServiceTimeouts:
+
+    @pytest.fixture
+    def healthy_item(self):
+        return AsyncSleepingUpdatableItem(time_to_sleep=0)
+
+    @pytest.fixture
+    def retry_policy(self):
+        return ExponentialBackoffRetryPolicy(initial_delay=timedelta(hours=1), max_delay=timedelta(hours=1))
+
+    async def _wait_service_running(self, updater_service):
+        await updater_service.start_service()
+        while not updater_service.is_running():
+            await asyncio.sleep(0.1)
+
+    @pytest.mark.asyncio
+    @pytest.mark.timeout(60)
+    async def test_item_update_timeout(self, healthy_item, retry_policy):
+        hung_item = AsyncSleepingUpdatableItem(time_to_sleep=100, update_timeout=timedelta(seconds=0.2))
+        item_to_update = AsyncSleepingUpdatableItem(time_to_sleep=0, dependencies=[hung_item, healthy_item])
+        updater_service = AsyncUpdaterService(item_to_update, max_concurrent_updates=2, retry_policy=retry_policy)
+
+        await self._wait_service_running(updater_service)
+        await asyncio.sleep(0.5)
+
+        assert updater_service.is_running()
+        assert hung_item.update_count == 1
+        assert await hung_item.async_get_last_update_datetime() is None
+        assert healthy_item.update_count == 1
+        assert item_to_update.update_count == 0
+
+        await updater_service.stop_service()
+        await updater_service.join(timeout=5)
+        assert not updater_service.is_running()
+
+    @pytest.mark.asyncio
+    @pytest.mark.timeout(60)
+    async def test_update_cycle_timeout(self, healthy_item, retry_policy):
+        hung_item = AsyncSleepingUpdatableItem(time_to_sleep=100)
+        item_to_update = AsyncSleepingUpdatableItem(time_to_sleep=0, dependencies=[hung_item, healthy_item])
+        updater_service = AsyncUpdaterService(
+            item_to_update,
+            retry_policy=retry_policy,
+            update_cycle_timeout=timedelta(seconds=0.2)
+        )
+
+        await self._wait_service_running(updater_service)
+        await asyncio.sleep(0.5)
+
+        assert updater_service.is_running()
+        assert hung_item.update_count == 1
+        assert await hung_item.async_get_last_update_datetime() is None
+        assert healthy_item.update_count == 1
+        assert item_to_update.update_count == 0
+
+        await updater_service.stop_service()
+        await updater_service.join(timeout=5)
+        assert not updater_service.is_running()
+
+    @pytest.mark.asyncio
+    @pytest.mark.timeout(60)
+    async def test_stop_service_cancels_running_updates(self):
+        hung_item = AsyncSleepingUpdatableItem(time_to_sleep=100)
+        updater_service = AsyncUpdaterService(hung_item)
+
+        await self._wait_service_running(updater_service)
+        await asyncio.sleep(0.2)
+        await updater_service.stop_service(cancel_running_updates=True)
+        await updater_service.join(timeout=5)
+
+        assert not updater_service.is_running()
+        assert hung_item.update_count == 1
+        assert await hung_item.async_get_last_update_datetime() is None
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from updater.update_datetime_memento.update_datetime_cache import UpdateDatetimeLRUCache
+from updater.update_datetime_memento.update_datetime_memento import \
+    AbstractAsyncUpdateDatetimeMemento, \
+    AbstractUpdateDatetimeMemento, \
+    AsyncCachingUpdateDatetimeMemento, \
+    CachingUpdateDatetimeMemento
+
+
+class CountingUpdateDatetimeMemento(AbstractUpdateDatetimeMemento):
+
+    def __init__(self) -> None:
+        self.update_datetime = None
+        self.loads_count = 0
+
+    def store(self, update_datetime: datetime) -> None:
+        self.update_datetime = update_datetime
+
+    def load(self) -> datetime:
+        self.loads_count += 1
+        return self.update_datetime
+
+
+class AsyncCountingUpdateDatetimeMemento(AbstractAsyncUpdateDatetimeMemento):
+
+    def __init__(self) -> None:
+        self.update_datetime = None
+        self.loads_count = 0
+
+    async def store(self, update_datetime: datetime) -> None:
+        self.update_datetime = update_datetime
+
+    async def load(self) -> datetime:
+        self.loads_count += 1
+        return self.update_datetime
+
+
+class TestCachingUpdateDatetimeMemento:
+
+    @pytest.fixture
+    def clock(self):
+        return [0.0]
+
+    @pytest.fixture
+    def wrapped_memento(self):
+        return CountingUpdateDatetimeMemento()
+
+    @pytest.fixture
+    def update_datetime(self):
+        return datetime.now(tz=timezone.utc)
+
+    def test_read_through_and_write_through(self, wrapped_memento, update_datetime):
+        memento = CachingUpdateDatetimeMemento(wrapped_memento)
+
+        assert memento.load() is None
+        assert memento.load() is None
+        assert wrapped_memento.loads_count == 1
+
+        memento.store(update_datetime)
+        assert wrapped_memento.update_datetime == update_datetime
+        assert memento.load() == update_datetime
+        assert wrapped_memento.loads_count == 1
+
+        wrapped_memento.update_datetime += timedelta(seconds=1)
+        memento.invalidate()
+        assert memento.load() == update_datetime + timedelta(seconds=1)
+        assert wrapped_memento.loads_count == 2
+
+    def test_ttl(self, clock, wrapped_memento, update_datetime):
+        cache = UpdateDatetimeLRUCache(ttl=timedelta(seconds=10), clock=lambda: clock[0])
+        memento = CachingUpdateDatetimeMemento(wrapped_memento, cache=cache)
+        wrapped_memento.store(update_datetime)
+
+        assert memento.load() == update_datetime
+        clock[0] = 9.0
+        assert memento.load() == update_datetime
+        assert wrapped_memento.loads_count == 1
+        clock[0] = 10.0
+        assert memento.load() == update_datetime
+        assert wrapped_memento.loads_count == 2
+
+    def test_shared_lru_cache(self, update_datetime):
+        cache = UpdateDatetimeLRUCache(max_size=2)
+        wrapped_mementos = [CountingUpdateDatetimeMemento() for _ in range(3)]
+        mementos = [
+            CachingUpdateDatetimeMemento(wrapped_memento, cache=cache, cache_key=f"memento_{memento_number}")
+            for memento_number, wrapped_memento in enumerate(wrapped_mementos)
+        ]
+        for memento in mementos:
+            memento.store(update_datetime)
+
+        assert len(cache) == 2
+        assert mementos[0].load() == update_datetime
+        assert wrapped_mementos[0].loads_count == 1
+        assert mementos[2].load() == update_datetime
+        assert wrapped_mementos[2].loads_count == 0
+
+        with pytest.raises(ValueError):
+            CachingUpdateDatetimeMemento(wrapped_mementos[0], cache=cache, ttl=timedelta(seconds=1))
+
+    @pytest.mark.asyncio
+    async def test_async_memento(self, update_datetime):
+        wrapped_memento = AsyncCountingUpdateDatetimeMemento()
+        memento = AsyncCachingUpdateDatetimeMemento(wrapped_memento)
+
+        await memento.store(update_datetime)
+        assert await memento.load() == update_datetime
+        assert wrapped_memento.loads_count == 0
+        memento.invalidate()
+        assert await memento.load() == update_datetime
+        assert wrapped_memento.loads_count == 1
@@ -0,0 +1,86 @@
+import pytest
+
+from updater.dependency_graph import DependencyGraph
+from updater.helpers import get_dependencies_list
+from updater.update_keychain import UpdateKeychain
+
+
+class TestDependencyGraph:
+
+    @pytest.fixture
+    def keychain_1(self):
+        return UpdateKeychain()
+
+    @pytest.fixture
+    def keychain_2(self, keychain_1):
+        return UpdateKeychain(dependencies=[keychain_1])
+
+    @pytest.fixture
+    def keychain_3(self, keychain_1):
+        return UpdateKeychain(dependencies=[keychain_1])
+
+    @pytest.fixture
+    def keychain_4(self, keychain_2, keychain_3, keychain_1):
+        return UpdateKeychain(dependencies=[keychain_2, keychain_3, keychain_1])
+
+    def test_topological_order(self, keychain_1, keychain_2, keychain_3, keychain_4):
+        dependency_graph = keychain_4.get_dependency_graph()
+
+        assert dependency_graph.get_items() == (keychain_1, keychain_2, keychain_3, keychain_4)
+        assert get_dependencies_list(keychain_4) == [keychain_1, keychain_2, keychain_3]
+        assert get_dependencies_list(keychain_2, dependency_graph) == [keychain_1]
+
+    def test_ancestors_and_dependents(self, keychain_1, keychain_2, keychain_3, keychain_4):
+        dependency_graph = keychain_4.get_dependency_graph()
+
+        assert dependency_graph.get_ancestors(keychain_1) == frozenset()
+        assert dependency_graph.get_ancestors(keychain_2) == {keychain_1}
+        assert dependency_graph.get_ancestors(keychain_4) == {keychain_1, keychain_2, keychain_3}
+        assert set(dependency_graph.get_dependents(keychain_1)) == {keychain_2, keychain_3, keychain_4}
+        assert dependency_graph.get_dependents(keychain_4) == ()
+        assert keychain_3 in dependency_graph
+        assert UpdateKeychain() not in dependency_graph
+
+    def test_graph_is_cached_until_dependencies_change(self, keychain_1, keychain_2, keychain_4):
+        dependency_graph = keychain_4.get_dependency_graph()
+        assert keychain_4.get_dependency_graph() is dependency_graph
+
+        keychain_5 = UpdateKeychain()
+        keychain_1.set_dependencies([keychain_5])
+        rebuilt_dependency_graph = keychain_4.get_dependency_graph()
+
+        assert rebuilt_dependency_graph is not dependency_graph
+        assert keychain_5 in rebuilt_dependency_graph
+        assert rebuilt_dependency_graph.get_items()[0] is keychain_5
+
+    def test_only_graphs_with_changed_item_are_outdated(self, keychain_1, keychain_2, keychain_4):
+        dependency_graph = keychain_4.get_dependency_graph()
+        keychain_5 = UpdateKeychain()
+        unrelated_dependency_graph = UpdateKeychain(dependencies=[keychain_5]).get_dependency_graph()
+
+        keychain_2.set_dependencies([])
+
+        assert dependency_graph.is_outdated()
+        assert not unrelated_dependency_graph.is_outdated()
+        keychain_5.set_dependencies([])
+        assert unrelated_dependency_graph.is_outdated()
+
+    def test_dependency_cycle(self, keychain_1, keychain_4):
+        keychain_1.set_dependencies([keychain_4])
+        with pytest.raises(ValueError):
+            keychain_4.get_dependency_graph()
+
+    def test_long_chain(self):
+        keychain = UpdateKeychain()
+        for _ in range(10000):
+            keychain = UpdateKeychain(dependencies=[keychain])
+
+        assert len(keychain.get_dependency_graph()) == 10001
+
+    def test_multiple_roots(self, keychain_1, keychain_2, keychain_3, keychain_4):
+        keychain_5 = UpdateKeychain(dependencies=[keychain_3])
+        dependency_graph = DependencyGraph([keychain_5, keychain_4, keychain_3])
+
+        assert dependency_graph.get_roots() == (keychain_5, keychain_4, keychain_3)
+        assert dependency_graph.get_items() == (keychain_1, keychain_3, keychain_5, keychain_2, keychain_4)
+        assert set(dependency_graph.get_dependents(keychain_3)) == {keychain_4, keychain_5}
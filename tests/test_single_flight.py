@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep
+
+import pytest
+
+from updater.single_flight import AsyncSingleFlight, SyncSingleFlight
+
+
+class TestSingleFlight:
+
+    def test_sync_concurrent_calls_share_one_flight(self):
+        single_flight = SyncSingleFlight()
+        calls_count = 0
+        calls_count_lock = threading.Lock()
+
+        def function():
+            nonlocal calls_count
+            with calls_count_lock:
+                calls_count += 1
+            sleep(0.5)
+            return calls_count
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            results = list(executor.map(lambda _: single_flight.do("key", function), range(5)))
+
+        assert results == [1] * 5
+        assert calls_count == 1
+        assert single_flight.do("key", function) == 1
+
+        single_flight.forget_done()
+        assert single_flight.do("key", function) == 2
+
+    def test_sync_exception_is_shared(self):
+        single_flight = SyncSingleFlight()
+
+        def function():
+            raise RuntimeError("Update failed")
+
+        with single_flight:
+            with pytest.raises(RuntimeError):
+                single_flight.do("key", function)
+            with pytest.raises(RuntimeError):
+                single_flight.do("key", lambda: None)
+        assert single_flight.do("key", lambda: "result") == "result"
+
+    @pytest.mark.asyncio
+    async def test_async_concurrent_calls_share_one_flight(self):
+        single_flight = AsyncSingleFlight()
+        calls_count = 0
+
+        async def coroutine_function():
+            nonlocal calls_count
+            calls_count += 1
+            await asyncio.sleep(0.5)
+            return calls_count
+
+        results = await asyncio.gather(*[single_flight.do("key", coroutine_function) for _ in range(5)])
+
+        assert results == [1] * 5
+        assert await single_flight.do("key", coroutine_function) == 1
+        with single_flight:
+            pass
+        assert await single_flight.do("key", coroutine_function) == 2
+
+    @pytest.mark.asyncio
+    async def test_async_flight_is_cancelled_with_last_waiter(self):
+        single_flight = AsyncSingleFlight()
+        flight_cancelled = asyncio.Event()
+
+        async def coroutine_function():
+            try:
+                await asyncio.sleep(100)
+            except asyncio.CancelledError:
+                flight_cancelled.set()
+                raise
+
+        first_waiter = asyncio.create_task(single_flight.do("key", coroutine_function))
+        second_waiter = asyncio.create_task(single_flight.do("key", coroutine_function))
+        await asyncio.sleep(0.1)
+        first_waiter.cancel()
+        await asyncio.sleep(0.1)
+        assert not flight_cancelled.is_set()
+
+        second_waiter.cancel()
+        await asyncio.wait_for(flight_cancelled.wait(), timeout=5)
@@ -0,0 +1,118 @@
+from datetime import timedelta, datetime, timezone
+
+import pytest
+
+from updater.staleness_tracker import StalenessTracker
+from updater.update_keychain import UpdateKeychain
+
+
+class TestStalenessTracker:
+
+    @pytest.fixture
+    def keychain_1(self):
+        return UpdateKeychain(update_interval=timedelta(seconds=600))
+
+    @pytest.fixture
+    def keychain_2(self, keychain_1):
+        return UpdateKeychain(dependencies=[keychain_1])
+
+    @pytest.fixture
+    def keychain_3(self):
+        return UpdateKeychain(update_interval=timedelta(seconds=60))
+
+    @pytest.fixture
+    def keychain_4(self, keychain_2, keychain_3):
+        return UpdateKeychain(dependencies=[keychain_2, keychain_3])
+
+    @pytest.fixture
+    def staleness_tracker(self, keychain_4):
+        return StalenessTracker(keychain_4.get_dependency_graph())
+
+    def test_all_items_are_unverified_at_start(self,
+                                               staleness_tracker,
+                                               keychain_1,
+                                               keychain_2,
+                                               keychain_3,
+                                               keychain_4):
+        assert staleness_tracker.pop_unverified_items() == [keychain_1, keychain_2, keychain_3, keychain_4]
+        assert staleness_tracker.pop_unverified_items() == []
+        assert staleness_tracker.get_items_to_update() == set()
+        assert staleness_tracker.get_next_update_datetime() is None
+
+    def test_update_marks_only_dependents_stale(self,
+                                                staleness_tracker,
+                                                keychain_1,
+                                                keychain_2,
+                                                keychain_3,
+                                                keychain_4):
+        staleness_tracker.pop_unverified_items()
+        staleness_tracker.mark_stale(keychain_1)
+        assert staleness_tracker.get_items_to_update() == {keychain_1, keychain_2, keychain_4}
+
+        next_update_datetime = datetime.now(tz=timezone.utc) + timedelta(seconds=600)
+        staleness_tracker.mark_updated(keychain_1, next_update_datetime)
+
+        assert not staleness_tracker.is_stale(keychain_1)
+        assert staleness_tracker.is_stale(keychain_2)
+        assert not staleness_tracker.is_stale(keychain_3)
+        assert not staleness_tracker.is_stale(keychain_4)
+        assert staleness_tracker.get_items_to_update() == {keychain_2, keychain_4}
+        assert staleness_tracker.get_next_update_datetime() == next_update_datetime
+
+    def test_expired_items(self, staleness_tracker, keychain_1, keychain_3):
+        datetime_now = datetime.now(tz=timezone.utc)
+        staleness_tracker.schedule(keychain_1, datetime_now + timedelta(seconds=600))
+        staleness_tracker.schedule(keychain_3, datetime_now + timedelta(seconds=60))
+
+        assert staleness_tracker.get_next_update_datetime() == datetime_now + timedelta(seconds=60)
+        assert staleness_tracker.pop_expired_items(datetime_now) == []
+        assert staleness_tracker.pop_expired_items(datetime_now + timedelta(seconds=60)) == [keychain_3]
+        assert staleness_tracker.get_next_update_datetime() == datetime_now + timedelta(seconds=600)
+
+    def test_failed_item_blocks_dependents_until_retry(self,
+                                                       staleness_tracker,
+                                                       keychain_1,
+                                                       keychain_2,
+                                                       keychain_3,
+                                                       keychain_4):
+        staleness_tracker.pop_unverified_items()
+        staleness_tracker.mark_stale(keychain_1)
+        staleness_tracker.mark_stale(keychain_3)
+        retry_datetime = datetime.now(tz=timezone.utc) + timedelta(seconds=10)
+        staleness_tracker.mark_failed(keychain_1, retry_datetime)
+
+        assert staleness_tracker.get_failures_count(keychain_1) == 1
+        assert staleness_tracker.get_items_to_update() == {keychain_3}
+        assert staleness_tracker.get_next_update_datetime() == retry_datetime
+
+        assert staleness_tracker.pop_expired_items(retry_datetime) == []
+        assert staleness_tracker.get_items_to_update() == {keychain_1, keychain_2, keychain_3, keychain_4}
+
+        staleness_tracker.mark_updated(keychain_1, None)
+        assert staleness_tracker.get_failures_count(keychain_1) == 0
+
+    def test_deferred_item_is_verified_again(self, staleness_tracker, keychain_1, keychain_2, keychain_4):
+        staleness_tracker.pop_unverified_items()
+        staleness_tracker.mark_stale(keychain_1)
+        recheck_datetime = datetime.now(tz=timezone.utc) + timedelta(seconds=1)
+        staleness_tracker.mark_deferred(keychain_1, recheck_datetime)
+
+        assert staleness_tracker.get_items_to_update() == set()
+        assert staleness_tracker.get_failures_count(keychain_1) == 0
+        assert staleness_tracker.pop_expired_items(recheck_datetime) == [keychain_1]
+        assert not staleness_tracker.is_stale(keychain_1)
+
+    def test_newer_observed_update_marks_dependents_stale(self, staleness_tracker, keychain_1, keychain_2):
+        staleness_tracker.pop_unverified_items()
+        last_update_datetime = datetime.now(tz=timezone.utc)
+        staleness_tracker.observe_last_update_datetime(keychain_1, last_update_datetime)
+        staleness_tracker.observe_last_update_datetime(keychain_1, last_update_datetime)
+        assert staleness_tracker.get_items_to_update() == set()
+
+        staleness_tracker.mark_updated(keychain_1, None, last_update_datetime + timedelta(seconds=1))
+        staleness_tracker.mark_updated(keychain_2, None)
+        staleness_tracker.observe_last_update_datetime(keychain_1, last_update_datetime + timedelta(seconds=1))
+        assert not staleness_tracker.is_stale(keychain_2)
+
+        staleness_tracker.observe_last_update_datetime(keychain_1, last_update_datetime + timedelta(seconds=2))
+        assert staleness_tracker.is_stale(keychain_2)
@@ -0,0 +1,68 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+from time import sleep
+
+import pytest
+
+from updatable_items_for_tests import SyncSleepingUpdatableItem
+from updater.updater_service.sync_updater_service import SyncUpdaterService
+
+
+class TestSyncUpdaterServiceExecutor:
+
+    @pytest.fixture
+    def item_1(self):
+        return SyncSleepingUpdatableItem(time_to_sleep=1)
+
+    @pytest.fixture
+    def item_2(self):
+        return SyncSleepingUpdatableItem(time_to_sleep=1)
+
+    @pytest.fixture
+    def item_3(self, item_1):
+        return SyncSleepingUpdatableItem(
+            time_to_sleep=1,
+            dependencies=[item_1]
+        )
+
+    @pytest.fixture
+    def item_to_update(self, item_1, item_2, item_3):
+        return SyncSleepingUpdatableItem(
+            update_interval=timedelta(hours=1),
+            dependencies=[item_1, item_2, item_3]
+        )
+
+    @pytest.fixture
+    def executor(self):
+        executor = ThreadPoolExecutor(max_workers=3)
+        yield executor
+        executor.shutdown()
+
+    @pytest.fixture
+    def updater_service(self, item_to_update, executor):
+        return SyncUpdaterService(item_to_update, executor=executor)
+
+    # noinspection SpellCheckingInspection
+    @pytest.mark.timeout(60)
+    def test_service(self,
+                     updater_service,
+                     item_1,
+                     item_2,
+                     item_3,
+                     item_to_update):
+        updater_service.start_service()
+        while not updater_service.is_running():
+            sleep(1)
+        updater_service.stop_service()
+        updater_service.join()
+
+        assert abs(item_1.get_last_update_datetime() - item_2.get_last_update_datetime()) < timedelta(seconds=0.5)
+        assert item_1.get_last_update_datetime() < item_3.get_last_update_datetime()
+        assert item_2.get_last_update_datetime() < item_3.get_last_update_datetime()
+        assert item_3.get_last_update_datetime() < item_to_update.get_last_update_datetime()
+        assert item_to_update.get_last_update_datetime() - item_1.get_last_update_datetime() < timedelta(seconds=1.5)
+
+    def test_process_pool_executor_is_rejected(self, item_to_update):
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            with pytest.raises(ValueError):
+                SyncUpdaterService(item_to_update, executor=executor)
@@ -0,0 +1,34 @@
+from datetime import timedelta
+from time import sleep
+
+import pytest
+
+from updatable_items_for_tests import SyncSleepingUpdatableItem
+from updater.updater_service.sync_updater_service import SyncUpdaterService
+
+
+class TestSyncUpdaterServiceExternalUpdates:
+
+    @pytest.fixture
+    def item_1(self):
+        return SyncSleepingUpdatableItem(time_to_sleep=0, update_interval=timedelta(seconds=1))
+
+    @pytest.fixture
+    def item_to_update(self, item_1):
+        return SyncSleepingUpdatableItem(time_to_sleep=0, dependencies=[item_1])
+
+    @pytest.mark.timeout(60)
+    def test_dependents_of_externally_updated_item_are_updated(self, item_1, item_to_update):
+        updater_service = SyncUpdaterService(item_to_update)
+        updater_service.start_service()
+        while item_to_update.update_count == 0:
+            sleep(0.1)
+
+        for _ in range(4):
+            sleep(0.6)
+            item_1.update()
+        sleep(1.5)
+        updater_service.stop_service()
+        updater_service.join()
+
+        assert item_to_update.update_count >= 3
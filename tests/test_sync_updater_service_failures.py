@@ -0,0 +1,74 @@
+from datetime import timedelta
+from time import sleep
+
+import pytest
+
+from updatable_items_for_tests import SyncFailingUpdatableItem, SyncSleepingUpdatableItem
+from updater.update_retry_policy import ExponentialBackoffRetryPolicy
+from updater.updater_service.sync_updater_service import SyncUpdaterService
+
+
+class TestSyncUpdaterServiceFailures:
+
+    @pytest.fixture
+    def failing_item(self):
+        return SyncFailingUpdatableItem(time_to_sleep=0, failures_count=2)
+
+    @pytest.fixture
+    def dependent_item(self, failing_item):
+        return SyncSleepingUpdatableItem(time_to_sleep=0, dependencies=[failing_item])
+
+    @pytest.fixture
+    def healthy_item(self):
+        return SyncSleepingUpdatableItem(time_to_sleep=0)
+
+    @pytest.fixture
+    def item_to_update(self, dependent_item, healthy_item):
+        return SyncSleepingUpdatableItem(
+            time_to_sleep=0,
+            update_interval=timedelta(hours=1),
+            dependencies=[dependent_item, healthy_item]
+        )
+
+    @pytest.fixture
+    def retry_policy(self):
+        return ExponentialBackoffRetryPolicy(initial_delay=timedelta(seconds=0.5), jitter=0)
+
+    @pytest.fixture
+    def updater_service(self, item_to_update, retry_policy):
+        return SyncUpdaterService(item_to_update, retry_policy=retry_policy)
+
+    def test_retry_delay(self, retry_policy):
+        assert retry_policy.get_retry_delay(1) == timedelta(seconds=0.5)
+        assert retry_policy.get_retry_delay(3) == timedelta(seconds=2)
+        assert retry_policy.get_retry_delay(10 ** 6) == timedelta(minutes=10)
+        jittered_retry_policy = ExponentialBackoffRetryPolicy(initial_delay=timedelta(seconds=10), jitter=0.5)
+        assert timedelta(seconds=5) <= jittered_retry_policy.get_retry_delay(1) <= timedelta(seconds=15)
+
+    @pytest.mark.timeout(60)
+    def test_failing_item_is_retried_with_backoff(self,
+                                                  updater_service,
+                                                  failing_item,
+                                                  dependent_item,
+                                                  healthy_item,
+                                                  item_to_update):
+        updater_service.start_service()
+        while not updater_service.is_running():
+            sleep(0.1)
+        sleep(0.25)
+
+        assert updater_service.is_running()
+        assert failing_item.update_count == 1
+        assert healthy_item.update_count == 1
+        assert dependent_item.update_count == 0
+        assert item_to_update.update_count == 0
+
+        while item_to_update.update_count == 0:
+            sleep(0.1)
+        updater_service.stop_service()
+        updater_service.join()
+
+        assert failing_item.update_count == 3
+        assert dependent_item.update_count == 1
+        assert healthy_item.update_count == 1
+        assert item_to_update.update_count == 1
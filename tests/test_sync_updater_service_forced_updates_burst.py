@@ -0,0 +1,63 @@
+from datetime import timedelta
+from time import sleep
+
+import pytest
+
+from updatable_items_for_tests import SyncSleepingUpdatableItem
+from updater.updater_service.sync_updater_service import SyncUpdaterService
+
+
+class TestSyncUpdaterServiceForcedUpdatesBurst:
+
+    @pytest.fixture
+    def item_1(self):
+        return SyncSleepingUpdatableItem(
+            time_to_sleep=1,
+            update_interval=timedelta(seconds=600)
+        )
+
+    @pytest.fixture
+    def item_2(self):
+        return SyncSleepingUpdatableItem(
+            update_interval=timedelta(seconds=600)
+        )
+
+    @pytest.fixture
+    def item_to_update(self, item_1, item_2):
+        return SyncSleepingUpdatableItem(
+            dependencies=[item_1, item_2]
+        )
+
+    @pytest.fixture
+    def updater_service(self, item_to_update):
+        return SyncUpdaterService(item_to_update)
+
+    # noinspection SpellCheckingInspection
+    @pytest.mark.timeout(60)
+    def test_service(self,
+                     updater_service,
+                     item_1,
+                     item_2,
+                     item_to_update):
+        updater_service.start_service()
+        while not updater_service.is_running():
+            sleep(1)
+        sleep(2)
+        updater_service.force_item_update(item_1)
+        sleep(0.3)
+        for _ in range(10):
+            updater_service.force_item_update(item_1)
+            updater_service.force_items_update([item_1, item_2, item_2])
+        sleep(3)
+        updater_service.stop_service()
+        updater_service.join()
+
+        assert item_1.update_count == 3
+        assert item_2.update_count == 2
+        assert item_to_update.update_count == 3
+        assert item_1.get_last_update_datetime() < item_to_update.get_last_update_datetime()
+        assert item_2.get_last_update_datetime() < item_to_update.get_last_update_datetime()
+
+    def test_force_not_owned_items(self, updater_service, item_1):
+        with pytest.raises(ValueError):
+            updater_service.force_items_update([item_1, SyncSleepingUpdatableItem()])
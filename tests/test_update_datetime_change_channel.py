@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from updater.update_datetime_memento.update_datetime_cache import UpdateDatetimeLRUCache
+from updater.update_datetime_memento.update_datetime_change_channel import \
+    FileUpdateDatetimeChangeChannel, \
+    UpdateDatetimeCacheInvalidator
+from updater.update_datetime_memento.update_datetime_memento import \
+    CachingUpdateDatetimeMemento, \
+    InMemoryUpdateDatetimeMemento
+
+
+class TestUpdateDatetimeChangeChannel:
+
+    @pytest.fixture
+    def changes_path(self, tmp_path):
+        return str(tmp_path / "update_datetime_changes.log")
+
+    def test_poll_returns_changes_of_other_publishers(self, changes_path):
+        channel_1 = FileUpdateDatetimeChangeChannel(changes_path)
+        channel_2 = FileUpdateDatetimeChangeChannel(changes_path)
+
+        assert channel_1.poll() == []
+        channel_1.publish(["record_1", "record_2"])
+        channel_2.publish(["record_3"])
+
+        assert channel_1.poll() == ["record_3"]
+        assert channel_2.poll() == ["record_1", "record_2"]
+        assert channel_2.poll() == []
+
+    def test_incomplete_change_is_read_after_completion(self, changes_path):
+        channel = FileUpdateDatetimeChangeChannel(changes_path)
+        with open(changes_path, "a") as changes_file:
+            changes_file.write("other record_1\nother rec")
+        assert channel.poll() == ["record_1"]
+
+        with open(changes_path, "a") as changes_file:
+            changes_file.write("ord_2\n")
+        assert channel.poll() == ["record_2"]
+
+    def test_cache_is_invalidated_by_changes_of_other_process(self, changes_path):
+        shared_memento = InMemoryUpdateDatetimeMemento()
+        caches = [UpdateDatetimeLRUCache(), UpdateDatetimeLRUCache()]
+        channels = [FileUpdateDatetimeChangeChannel(changes_path), FileUpdateDatetimeChangeChannel(changes_path)]
+        mementos = [
+            CachingUpdateDatetimeMemento(shared_memento, cache=cache, cache_key="record", change_channel=channel)
+            for cache, channel in zip(caches, channels)
+        ]
+        update_datetime = datetime.now(tz=timezone.utc)
+
+        mementos[0].store(update_datetime)
+        assert mementos[1].load() == update_datetime
+        mementos[0].store(update_datetime + timedelta(seconds=1))
+        assert mementos[1].load() == update_datetime
+
+        with UpdateDatetimeCacheInvalidator(caches[1], channels[1]):
+            assert mementos[1].load() == update_datetime + timedelta(seconds=1)
+
+    def test_change_channel_requires_cache_key(self, changes_path):
+        with pytest.raises(ValueError):
+            CachingUpdateDatetimeMemento(
+                InMemoryUpdateDatetimeMemento(),
+                change_channel=FileUpdateDatetimeChangeChannel(changes_path)
+            )
@@ -0,0 +1,133 @@
+import multiprocessing
+from datetime import datetime, timedelta, timezone
+from time import sleep
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker, Session
+
+from updater.updatable_item import AbstractSyncUpdatableItem
+from updater.update_datetime_memento.update_datetime_db_lease import UpdateDatetimeDBLease
+from updater.update_datetime_memento.update_datetime_db_repository import \
+    UpdateDatetimeDBRecord, \
+    UpdateDatetimeDBRepository
+from updater.update_datetime_memento.update_datetime_memento import UpdateDatetimeMementoWithDBRepo
+from updater.update_lease import UpdateLeaseIsHeldError
+from updater.updater_service.sync_updater_service import SyncUpdaterService
+
+
+class SyncRunsLoggingUpdatableItem(AbstractSyncUpdatableItem):
+
+    def __init__(self, runs_log_path: str, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._runs_log_path = runs_log_path
+
+    def _run_update(self) -> None:
+        with open(self._runs_log_path, "a") as runs_log:
+            runs_log.write("run\n")
+        sleep(0.5)
+
+
+def create_session_factory(db_path) -> scoped_session:
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"timeout": 30})
+    return scoped_session(sessionmaker(autocommit=False, bind=engine, class_=Session))
+
+
+def run_updater_replica(db_path, runs_log_path: str, lease_owner: str, start_barrier) -> None:
+    session_factory = create_session_factory(db_path)
+    repository = UpdateDatetimeDBRepository(session_factory)
+    item = SyncRunsLoggingUpdatableItem(
+        runs_log_path,
+        update_interval=timedelta(hours=1),
+        update_datetime_memento=UpdateDatetimeMementoWithDBRepo(session_factory, repository, "shared_item"),
+        update_lease=UpdateDatetimeDBLease(
+            session_factory,
+            repository,
+            "shared_item",
+            lease_owner,
+            recheck_interval=timedelta(seconds=0.1)
+        )
+    )
+    updater_service = SyncUpdaterService(item)
+    start_barrier.wait()
+    updater_service.start_service()
+    while item.get_last_update_datetime() is None:
+        sleep(0.05)
+    updater_service.stop_service()
+    updater_service.join()
+
+
+class TestUpdateDatetimeDBLease:
+
+    replicas_count = 4
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        db_path = tmp_path / "update_datetime.sqlite"
+        engine = create_engine(f"sqlite:///{db_path}")
+        with engine.begin() as conn:
+            UpdateDatetimeDBRecord.metadata.create_all(conn)
+        engine.dispose()
+        return db_path
+
+    @pytest.fixture
+    def session_factory(self, db_path):
+        return create_session_factory(db_path)
+
+    @pytest.fixture
+    def repository(self, session_factory):
+        return UpdateDatetimeDBRepository(session_factory)
+
+    def test_claim_and_release(self, session_factory, repository):
+        lease_duration = timedelta(minutes=5)
+        with session_factory.begin():
+            assert repository.try_claim_lease("record", "owner_1", lease_duration, None)
+            assert not repository.try_claim_lease("record", "owner_2", lease_duration, None)
+            assert repository.get_last_update_datetime("record") is None
+            assert repository.get_all_last_updates_datetime() == {}
+
+        update_datetime = datetime.now(tz=timezone.utc)
+        with session_factory.begin():
+            repository.set_last_update_datetime("record", update_datetime)
+            repository.release_lease("record", "owner_1")
+        with session_factory.begin():
+            assert not repository.try_claim_lease("record", "owner_2", lease_duration, None)
+            assert repository.try_claim_lease("record", "owner_2", lease_duration, update_datetime)
+
+    def test_expired_lease_can_be_claimed(self, session_factory, repository):
+        with session_factory.begin():
+            assert repository.try_claim_lease("record", "owner_1", timedelta(seconds=-1), None)
+            assert repository.try_claim_lease("record", "owner_2", timedelta(minutes=5), None)
+
+    def test_item_update_is_deferred_while_lease_is_held(self, tmp_path, session_factory, repository):
+        with session_factory.begin():
+            repository.try_claim_lease("shared_item", "other_replica", timedelta(minutes=5), None)
+        item = SyncRunsLoggingUpdatableItem(
+            str(tmp_path / "runs.log"),
+            update_datetime_memento=UpdateDatetimeMementoWithDBRepo(session_factory, repository, "shared_item"),
+            update_lease=UpdateDatetimeDBLease(session_factory, repository, "shared_item", "replica")
+        )
+
+        with pytest.raises(UpdateLeaseIsHeldError):
+            item.update()
+        assert not (tmp_path / "runs.log").exists()
+
+    @pytest.mark.timeout(120)
+    def test_only_one_replica_updates_item(self, tmp_path, db_path):
+        runs_log_path = str(tmp_path / "runs.log")
+        start_barrier = multiprocessing.Barrier(self.replicas_count)
+        replicas = [
+            multiprocessing.Process(
+                target=run_updater_replica,
+                args=(db_path, runs_log_path, f"replica_{replica_number}", start_barrier)
+            )
+            for replica_number in range(self.replicas_count)
+        ]
+        for replica in replicas:
+            replica.start()
+        for replica in replicas:
+            replica.join(timeout=60)
+
+        assert [replica.exitcode for replica in replicas] == [0] * self.replicas_count
+        with open(runs_log_path) as runs_log:
+            assert runs_log.readlines() == ["run\n"]
@@ -0,0 +1,128 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_scoped_session, AsyncSession
+from sqlalchemy.orm import scoped_session, sessionmaker, Session
+
+from updater.update_datetime_memento.update_datetime_cache import UpdateDatetimeLRUCache
+from updater.update_datetime_memento.update_datetime_change_channel import UpdateDatetimeCacheInvalidator
+from updater.update_datetime_memento.update_datetime_db_change_channel import DBRevisionUpdateDatetimeChangeChannel
+from updater.update_datetime_memento.update_datetime_db_repository import \
+    AsyncUpdateDatetimeDBRepository, \
+    UpdateDatetimeDBRecord, \
+    UpdateDatetimeDBRepository
+from updater.update_datetime_memento.update_datetime_memento import \
+    CachingUpdateDatetimeMemento, \
+    UpdateDatetimeMementoWithDBRepo
+
+
+class TestUpdateDatetimeDBRevision:
+
+    @pytest.fixture
+    def session_factory(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'update_datetime.sqlite'}")
+        with engine.begin() as conn:
+            UpdateDatetimeDBRecord.metadata.drop_all(conn)
+            UpdateDatetimeDBRecord.metadata.create_all(conn)
+        yield scoped_session(sessionmaker(autocommit=False, bind=engine, class_=Session))
+        engine.dispose()
+
+    @pytest.fixture
+    def repository(self, session_factory):
+        return UpdateDatetimeDBRepository(session_factory, track_revisions=True)
+
+    @pytest.fixture
+    def update_datetime(self):
+        return datetime.now(tz=timezone.utc).replace(microsecond=0)
+
+    def test_get_changed_since(self, session_factory, repository, update_datetime):
+        with session_factory.begin():
+            assert repository.get_revision() == 0
+            repository.set_many_last_update_datetime({"record_1": update_datetime, "record_2": update_datetime})
+            first_revision = repository.get_revision()
+        with session_factory.begin():
+            repository.set_last_update_datetime("record_2", update_datetime + timedelta(seconds=1))
+            repository.set_last_update_datetime("record_3", update_datetime)
+
+        with session_factory.begin():
+            revision, changed_updates_datetime = repository.get_changed_since(first_revision)
+            assert revision == first_revision + 2
+            assert changed_updates_datetime == {
+                "record_2": update_datetime + timedelta(seconds=1),
+                "record_3": update_datetime,
+            }
+            assert repository.get_changed_since(0)[1].keys() == {"record_1", "record_2", "record_3"}
+            assert repository.get_changed_since(revision) == (revision, {})
+
+    def test_get_changed_since_without_upsert(self, monkeypatch, session_factory, repository, update_datetime):
+        monkeypatch.setattr(session_factory.get_bind().dialect, "name", "unknown")
+        with session_factory.begin():
+            repository.set_last_update_datetime("record_1", update_datetime)
+        with session_factory.begin():
+            repository.set_many_last_update_datetime({"record_1": update_datetime, "record_2": update_datetime})
+
+        with session_factory.begin():
+            assert repository.get_changed_since(1) == (2, {"record_1": update_datetime, "record_2": update_datetime})
+
+    def test_revisions_are_not_tracked_by_default(self, session_factory, update_datetime):
+        repository = UpdateDatetimeDBRepository(session_factory)
+        with session_factory.begin():
+            repository.set_last_update_datetime("record_1", update_datetime)
+
+        with session_factory.begin():
+            assert repository.get_revision() == 0
+            assert repository.get_changed_since(0) == (0, {})
+            assert repository.get_last_update_datetime("record_1") == update_datetime
+
+    def test_db_revision_channel_invalidates_cache(self, session_factory, repository, update_datetime):
+        cache = UpdateDatetimeLRUCache()
+        change_channel = DBRevisionUpdateDatetimeChangeChannel(session_factory, repository)
+        writer_memento = UpdateDatetimeMementoWithDBRepo(session_factory, repository, "record")
+        reader_memento = CachingUpdateDatetimeMemento(
+            UpdateDatetimeMementoWithDBRepo(session_factory, repository, "record"),
+            cache=cache,
+            cache_key="record"
+        )
+        assert change_channel.poll() == []
+
+        writer_memento.store(update_datetime)
+        assert reader_memento.load() == update_datetime
+        writer_memento.store(update_datetime + timedelta(seconds=1))
+        assert reader_memento.load() == update_datetime
+
+        with UpdateDatetimeCacheInvalidator(cache, change_channel):
+            assert reader_memento.load() == update_datetime + timedelta(seconds=1)
+        assert change_channel.poll() == []
+
+    def test_db_revision_channel_requires_tracked_revisions(self, session_factory):
+        with pytest.raises(ValueError):
+            DBRevisionUpdateDatetimeChangeChannel(session_factory, UpdateDatetimeDBRepository(session_factory))
+
+
+class TestAsyncUpdateDatetimeDBRevision:
+
+    @pytest.fixture
+    async def session_factory(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'update_datetime.sqlite'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(UpdateDatetimeDBRecord.metadata.drop_all)
+            await conn.run_sync(UpdateDatetimeDBRecord.metadata.create_all)
+        yield async_scoped_session(sessionmaker(bind=engine, class_=AsyncSession), scopefunc=asyncio.current_task)
+        await engine.dispose()
+
+    async def test_get_changed_since(self, session_factory):
+        repository = AsyncUpdateDatetimeDBRepository(session_factory, track_revisions=True)
+        update_datetime = datetime.now(tz=timezone.utc).replace(microsecond=0)
+        async with session_factory.begin():
+            await repository.set_many_last_update_datetime({"record_1": update_datetime, "record_2": update_datetime})
+            first_revision = await repository.get_revision()
+        async with session_factory.begin():
+            await repository.set_last_update_datetime("record_1", update_datetime + timedelta(seconds=1))
+
+        async with session_factory.begin():
+            revision, changed_updates_datetime = await repository.get_changed_since(first_revision)
+        assert revision == first_revision + 1
+        assert changed_updates_datetime == {"record_1": update_datetime + timedelta(seconds=1)}
+        await session_factory.remove()
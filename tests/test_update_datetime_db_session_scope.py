@@ -0,0 +1,218 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from time import sleep
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_scoped_session, AsyncSession
+from sqlalchemy.orm import scoped_session, sessionmaker, Session
+
+from updatable_items_for_tests import AsyncSleepingUpdatableItem, SyncSleepingUpdatableItem
+from updater.update_datetime_memento.update_datetime_db_repository import \
+    AsyncUpdateDatetimeDBRepository, \
+    UpdateDatetimeDBRecord, \
+    UpdateDatetimeDBRepository
+from updater.update_datetime_memento.update_datetime_db_session_scope import \
+    AsyncUpdateDatetimeDBSessionScope, \
+    is_session_scope_active, \
+    UpdateDatetimeDBSessionScope
+from updater.update_datetime_memento.update_datetime_memento import \
+    AsyncUpdateDatetimeMementoWithDBRepo, \
+    UpdateDatetimeMementoWithDBRepo
+from updater.updater_service.async_updater_service import AsyncUpdaterService
+from updater.updater_service.sync_updater_service import SyncUpdaterService
+
+
+class UpdateCyclesCounter:
+
+    def __init__(self) -> None:
+        self.update_cycles_count = 0
+
+    def __enter__(self) -> None:
+        self.update_cycles_count += 1
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        pass
+
+
+class TestUpdateDatetimeDBSessionScope:
+
+    @pytest.fixture
+    def engine(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'update_datetime.sqlite'}")
+        with engine.begin() as conn:
+            UpdateDatetimeDBRecord.metadata.drop_all(conn)
+            UpdateDatetimeDBRecord.metadata.create_all(conn)
+        yield engine
+        engine.dispose()
+
+    @pytest.fixture
+    def connection_checkouts(self, engine):
+        connection_checkouts = []
+
+        @event.listens_for(engine, "checkout")
+        def receive_checkout(dbapi_connection, connection_record, connection_proxy):
+            connection_checkouts.append(dbapi_connection)
+
+        return connection_checkouts
+
+    @pytest.fixture
+    def session_factory(self, engine):
+        return scoped_session(sessionmaker(autocommit=False, bind=engine, class_=Session))
+
+    @pytest.fixture
+    def repository(self, session_factory):
+        return UpdateDatetimeDBRepository(session_factory)
+
+    @pytest.fixture
+    def mementos(self, session_factory, repository):
+        return [
+            UpdateDatetimeMementoWithDBRepo(
+                db_session_factory=session_factory,
+                update_datetime_repository=repository,
+                memento_name=f"memento_{i}"
+            )
+            for i in range(3)
+        ]
+
+    def test_mementos_share_session_and_connection(self, session_factory, mementos, connection_checkouts):
+        datetime_now = datetime.now(tz=timezone.utc)
+        with UpdateDatetimeDBSessionScope(session_factory):
+            session = session_factory()
+            for memento in mementos:
+                memento.store(datetime_now)
+                assert memento.load() == datetime_now
+            assert session_factory() is session
+            assert is_session_scope_active(session_factory)
+
+        assert len(connection_checkouts) == 1
+        assert not is_session_scope_active(session_factory)
+        assert session_factory() is not session
+        assert mementos[0].load() == datetime_now
+
+    def test_scope_is_closed_after_error(self, session_factory, mementos):
+        with pytest.raises(RuntimeError):
+            with UpdateDatetimeDBSessionScope(session_factory):
+                mementos[0].store(datetime.now(tz=timezone.utc))
+                raise RuntimeError
+        assert not is_session_scope_active(session_factory)
+        assert mementos[0].load() is not None
+
+    @pytest.mark.timeout(60)
+    def test_service_update_cycle_context(self, session_factory, repository, connection_checkouts):
+        item_1 = SyncSleepingUpdatableItem(
+            update_datetime_memento=UpdateDatetimeMementoWithDBRepo(
+                db_session_factory=session_factory,
+                update_datetime_repository=repository,
+                memento_name="item_1"
+            ),
+            update_interval=timedelta(hours=1)
+        )
+        item_to_update = SyncSleepingUpdatableItem(
+            update_datetime_memento=UpdateDatetimeMementoWithDBRepo(
+                db_session_factory=session_factory,
+                update_datetime_repository=repository,
+                memento_name="item_to_update"
+            ),
+            dependencies=[item_1]
+        )
+        update_cycles_counter = UpdateCyclesCounter()
+        updater_service = SyncUpdaterService(
+            item_to_update,
+            update_cycle_contexts=[update_cycles_counter, UpdateDatetimeDBSessionScope(session_factory)]
+        )
+
+        updater_service.start_service()
+        while not updater_service.is_running():
+            sleep(1)
+        updater_service.stop_service()
+        updater_service.join()
+
+        assert len(connection_checkouts) == update_cycles_counter.update_cycles_count
+        assert item_1.get_last_update_datetime() < item_to_update.get_last_update_datetime()
+
+
+class TestAsyncUpdateDatetimeDBSessionScope:
+
+    @pytest.fixture
+    async def engine(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'update_datetime.sqlite'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(UpdateDatetimeDBRecord.metadata.drop_all)
+            await conn.run_sync(UpdateDatetimeDBRecord.metadata.create_all)
+        yield engine
+        await engine.dispose()
+
+    @pytest.fixture
+    def connection_checkouts(self, engine):
+        connection_checkouts = []
+
+        @event.listens_for(engine.sync_engine, "checkout")
+        def receive_checkout(dbapi_connection, connection_record, connection_proxy):
+            connection_checkouts.append(dbapi_connection)
+
+        return connection_checkouts
+
+    @pytest.fixture
+    def session_factory(self, engine):
+        return async_scoped_session(sessionmaker(bind=engine, class_=AsyncSession), scopefunc=asyncio.current_task)
+
+    @pytest.fixture
+    def repository(self, session_factory):
+        return AsyncUpdateDatetimeDBRepository(session_factory)
+
+    def _create_item(self, session_factory, repository, memento_name, **kwargs):
+        return AsyncSleepingUpdatableItem(
+            update_datetime_memento=AsyncUpdateDatetimeMementoWithDBRepo(session_factory, repository, memento_name),
+            **kwargs
+        )
+
+    async def test_mementos_share_session(self, session_factory, repository):
+        mementos = [
+            AsyncUpdateDatetimeMementoWithDBRepo(session_factory, repository, f"memento_{i}")
+            for i in range(3)
+        ]
+        datetime_now = datetime.now(tz=timezone.utc)
+        async with AsyncUpdateDatetimeDBSessionScope(session_factory):
+            session = session_factory()
+            for memento in mementos:
+                await memento.store(datetime_now)
+                assert await memento.load() == datetime_now
+            assert session_factory() is session
+
+        assert not is_session_scope_active(session_factory)
+        assert await mementos[0].load() == datetime_now
+        await session_factory.remove()
+
+    async def test_tasks_share_session(self, session_factory, repository, connection_checkouts):
+        mementos = [
+            AsyncUpdateDatetimeMementoWithDBRepo(session_factory, repository, f"memento_{i}")
+            for i in range(5)
+        ]
+        datetime_now = datetime.now(tz=timezone.utc)
+        async with AsyncUpdateDatetimeDBSessionScope(session_factory):
+            await asyncio.gather(*(memento.store(datetime_now) for memento in mementos))
+            assert await asyncio.gather(*(memento.load() for memento in mementos)) == [datetime_now] * 5
+
+        assert len(connection_checkouts) == 1
+
+    @pytest.mark.timeout(60)
+    async def test_service_update_cycle_context(self, session_factory, repository, connection_checkouts):
+        item_1 = self._create_item(session_factory, repository, "item_1", update_interval=timedelta(hours=1))
+        item_2 = self._create_item(session_factory, repository, "item_2", update_interval=timedelta(hours=1))
+        item_to_update = self._create_item(session_factory, repository, "item_to_update", dependencies=[item_1, item_2])
+        update_cycles_counter = UpdateCyclesCounter()
+        updater_service = AsyncUpdaterService(
+            item_to_update,
+            update_cycle_contexts=[update_cycles_counter, AsyncUpdateDatetimeDBSessionScope(session_factory)]
+        )
+
+        await updater_service.start_service()
+        while item_to_update.update_count == 0:
+            await asyncio.sleep(0.1)
+        await updater_service.stop_service()
+        await updater_service.join()
+
+        assert len(connection_checkouts) == update_cycles_counter.update_cycles_count
+        assert await item_1.async_get_last_update_datetime() < await item_to_update.async_get_last_update_datetime()
+        await session_factory.remove()
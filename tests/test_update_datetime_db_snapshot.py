@@ -0,0 +1,114 @@
+from datetime import timedelta, datetime, timezone
+from time import sleep
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import scoped_session, sessionmaker, Session
+
+from updatable_items_for_tests import SyncSleepingUpdatableItem
+from updater.update_datetime_memento.update_datetime_db_repository import \
+    UpdateDatetimeDBRecord, \
+    UpdateDatetimeDBRepository
+from updater.update_datetime_memento.update_datetime_db_snapshot import UpdateDatetimeDBSnapshot
+from updater.update_datetime_memento.update_datetime_memento import UpdateDatetimeMementoWithDBRepo
+from updater.updater_service.sync_updater_service import SyncUpdaterService
+
+
+class TestUpdateDatetimeDBSnapshot:
+
+    @pytest.fixture
+    def engine(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'update_datetime.sqlite'}")
+        with engine.begin() as conn:
+            UpdateDatetimeDBRecord.metadata.drop_all(conn)
+            UpdateDatetimeDBRecord.metadata.create_all(conn)
+        return engine
+
+    @pytest.fixture
+    def executed_statements(self, engine):
+        executed_statements = []
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def receive_before_cursor_execute(conn, cursor, statement, *args):
+            executed_statements.append(statement)
+
+        return executed_statements
+
+    @pytest.fixture
+    def session_factory(self, engine):
+        db_session_maker = sessionmaker(
+            autocommit=False,
+            bind=engine,
+            class_=Session
+        )
+        return scoped_session(db_session_maker)
+
+    @pytest.fixture
+    def repository(self, session_factory):
+        return UpdateDatetimeDBRepository(session_factory)
+
+    @pytest.fixture
+    def snapshot(self, session_factory, repository):
+        return UpdateDatetimeDBSnapshot(session_factory, repository)
+
+    @pytest.fixture
+    def mementos(self, session_factory, repository):
+        return [
+            UpdateDatetimeMementoWithDBRepo(
+                db_session_factory=session_factory,
+                update_datetime_repository=repository,
+                memento_name=f"memento_{i}"
+            )
+            for i in range(3)
+        ]
+
+    def test_loads_are_served_from_snapshot(self, snapshot, mementos, executed_statements):
+        datetime_now = datetime.now(tz=timezone.utc)
+        for memento in mementos:
+            memento.store(datetime_now)
+
+        executed_statements.clear()
+        with snapshot:
+            for _ in range(5):
+                for memento in mementos:
+                    assert memento.load() == datetime_now
+        assert len([statement for statement in executed_statements if statement.startswith("SELECT")]) == 1
+
+    def test_stores_are_pushed_through_snapshot(self, snapshot, mementos, repository):
+        datetime_now = datetime.now(tz=timezone.utc)
+        with snapshot:
+            assert mementos[0].load() is None
+            mementos[0].store(datetime_now)
+            assert mementos[0].load() == datetime_now
+
+        assert not repository.has_snapshot()
+        assert mementos[0].load() == datetime_now
+
+    @pytest.mark.timeout(60)
+    def test_service_update_cycle_context(self, session_factory, repository, snapshot):
+        item_1 = SyncSleepingUpdatableItem(
+            update_datetime_memento=UpdateDatetimeMementoWithDBRepo(
+                db_session_factory=session_factory,
+                update_datetime_repository=repository,
+                memento_name="item_1"
+            ),
+            update_interval=timedelta(hours=1)
+        )
+        item_to_update = SyncSleepingUpdatableItem(
+            update_datetime_memento=UpdateDatetimeMementoWithDBRepo(
+                db_session_factory=session_factory,
+                update_datetime_repository=repository,
+                memento_name="item_to_update"
+            ),
+            dependencies=[item_1]
+        )
+        updater_service = SyncUpdaterService(item_to_update, update_cycle_contexts=[snapshot])
+
+        updater_service.start_service()
+        while not updater_service.is_running():
+            sleep(1)
+        updater_service.stop_service()
+        updater_service.join()
+
+        assert not repository.has_snapshot()
+        assert item_1.get_last_update_datetime() < item_to_update.get_last_update_datetime()
@@ -2,7 +2,7 @@ from datetime import timedelta, datetime, timezone
 from random import randint
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import scoped_session, sessionmaker, Session
 
 from updater.update_datetime_memento.update_datetime_db_repository import \
@@ -66,3 +66,38 @@ class TestUpdateDatetimeDBStore:
 
         for record_name, record_time in record_to_store.items():
             assert loaded_records[record_name] == record_time
+
+    def test_upsert_update_datetime(self, session_factory, repository, record_to_store):
+        executed_statements = []
+        event.listen(
+            session_factory.get_bind(),
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: executed_statements.append(statement)
+        )
+        updated_datetime = datetime.now(tz=timezone.utc) + timedelta(seconds=1000)
+        with session_factory.begin() as session:
+            repository.set_many_last_update_datetime(record_to_store)
+            for record_name in record_to_store:
+                repository.set_last_update_datetime(record_name, updated_datetime)
+            session.commit()
+
+        assert len(executed_statements) == 1 + len(record_to_store)
+        assert all(statement.startswith("INSERT") for statement in executed_statements)
+        with session_factory.begin():
+            loaded_records = repository.get_all_last_updates_datetime()
+        session_factory.remove()
+        assert loaded_records == dict.fromkeys(record_to_store, updated_datetime)
+
+    def test_set_many_update_datetime_without_upsert(self, monkeypatch, session_factory, repository, record_to_store):
+        monkeypatch.setattr(session_factory.get_bind().dialect, "name", "unknown")
+        with session_factory.begin() as session:
+            repository.set_last_update_datetime("record_0", datetime.now(tz=timezone.utc))
+            session.commit()
+        with session_factory.begin() as session:
+            repository.set_many_last_update_datetime(record_to_store)
+            session.commit()
+
+        with session_factory.begin():
+            loaded_records = repository.get_all_last_updates_datetime()
+        session_factory.remove()
+        assert loaded_records == record_to_store
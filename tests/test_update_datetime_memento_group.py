@@ -0,0 +1,157 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_scoped_session, AsyncSession
+from sqlalchemy.orm import scoped_session, sessionmaker, Session
+
+from updater.metrics import AbstractUpdaterMetricsHook
+from updater.update_datetime_memento.update_datetime_db_repository import \
+    AsyncUpdateDatetimeDBRepository, \
+    UpdateDatetimeDBRecord, \
+    UpdateDatetimeDBRepository
+from updater.update_datetime_memento.update_datetime_db_snapshot import UpdateDatetimeDBSnapshot
+from updater.update_datetime_memento.update_datetime_memento_group import \
+    AsyncUpdateDatetimeMementoGroupWithDBRepo, \
+    InMemoryUpdateDatetimeMementoGroup, \
+    UpdateDatetimeMementoGroupWithDBRepo
+
+
+@pytest.fixture
+def update_datetimes():
+    datetime_now = datetime.now(tz=timezone.utc).replace(microsecond=0)
+    return {f"record_{i}": datetime_now + timedelta(seconds=i) for i in range(5)}
+
+
+class RecordingMetricsHook(AbstractUpdaterMetricsHook):
+
+    def __init__(self) -> None:
+        self.memento_operations = []
+
+    def on_memento_operation(self, memento_name: str, operation: str, duration: float) -> None:
+        self.memento_operations.append((memento_name, operation))
+
+
+class TestInMemoryUpdateDatetimeMementoGroup:
+
+    def test_load_many_returns_stored_update_datetimes(self, update_datetimes):
+        memento_group = InMemoryUpdateDatetimeMementoGroup()
+        memento_group.store_many(update_datetimes)
+
+        assert memento_group.load_many(["record_0", "record_1", "unknown"]) == {
+            "record_0": update_datetimes["record_0"],
+            "record_1": update_datetimes["record_1"],
+        }
+        memento = memento_group.get_memento("record_0")
+        assert memento.load() == update_datetimes["record_0"]
+        memento.store(update_datetimes["record_4"])
+        assert memento_group.load_many(["record_0"]) == {"record_0": update_datetimes["record_4"]}
+        assert memento_group.get_memento("unknown").load() is None
+
+
+class TestUpdateDatetimeMementoGroupWithDBRepo:
+
+    @pytest.fixture
+    def engine(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'update_datetime.sqlite'}")
+        with engine.begin() as conn:
+            UpdateDatetimeDBRecord.metadata.drop_all(conn)
+            UpdateDatetimeDBRecord.metadata.create_all(conn)
+        yield engine
+        engine.dispose()
+
+    @pytest.fixture
+    def session_factory(self, engine):
+        return scoped_session(sessionmaker(autocommit=False, bind=engine, class_=Session))
+
+    @pytest.fixture
+    def repository(self, session_factory):
+        return UpdateDatetimeDBRepository(session_factory)
+
+    @pytest.fixture
+    def memento_group(self, session_factory, repository):
+        return UpdateDatetimeMementoGroupWithDBRepo(session_factory, repository)
+
+    def test_load_many_uses_single_query(self, engine, memento_group, update_datetimes):
+        memento_group.store_many(update_datetimes)
+        executed_statements = []
+        event.listen(
+            engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: executed_statements.append(statement)
+        )
+
+        last_updates_datetime = memento_group.load_many(["record_1", "record_3", "unknown"])
+
+        assert last_updates_datetime == {
+            "record_1": update_datetimes["record_1"],
+            "record_3": update_datetimes["record_3"],
+        }
+        select_statements = [statement for statement in executed_statements if statement.startswith("SELECT")]
+        assert len(select_statements) == 1
+        assert " IN " in select_statements[0]
+        assert memento_group.load_many([]) == {}
+
+    def test_members_share_repository(self, session_factory, repository, memento_group, update_datetimes):
+        memento_group.get_memento("record_0").store(update_datetimes["record_0"])
+        assert memento_group.load_many(["record_0"]) == {"record_0": update_datetimes["record_0"]}
+
+        memento_group.store_many({"record_0": update_datetimes["record_1"]})
+        assert memento_group.get_memento("record_0").load() == update_datetimes["record_1"]
+
+        with UpdateDatetimeDBSnapshot(session_factory, repository):
+            memento_group.store_many({"record_2": update_datetimes["record_2"]})
+            assert memento_group.load_many(["record_0", "record_2"]) == {
+                "record_0": update_datetimes["record_1"],
+                "record_2": update_datetimes["record_2"],
+            }
+
+    def test_bulk_operations_are_timed(self, session_factory, repository, update_datetimes):
+        metrics_hook = RecordingMetricsHook()
+        memento_group = UpdateDatetimeMementoGroupWithDBRepo(
+            session_factory,
+            repository,
+            metrics_hook=metrics_hook,
+            group_name="records"
+        )
+        memento_group.store_many(update_datetimes)
+        memento_group.load_many(update_datetimes)
+
+        assert metrics_hook.memento_operations == [("records", "store_many"), ("records", "load_many")]
+
+
+class TestAsyncUpdateDatetimeMementoGroupWithDBRepo:
+
+    @pytest.fixture
+    async def session_factory(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'update_datetime.sqlite'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(UpdateDatetimeDBRecord.metadata.drop_all)
+            await conn.run_sync(UpdateDatetimeDBRecord.metadata.create_all)
+        yield async_scoped_session(sessionmaker(bind=engine, class_=AsyncSession), scopefunc=asyncio.current_task)
+        await engine.dispose()
+
+    async def test_store_and_load_many(self, session_factory, update_datetimes):
+        memento_group = AsyncUpdateDatetimeMementoGroupWithDBRepo(
+            session_factory,
+            AsyncUpdateDatetimeDBRepository(session_factory)
+        )
+        await memento_group.store_many(update_datetimes)
+
+        assert await memento_group.load_many(update_datetimes) == update_datetimes
+        assert await memento_group.load_many(["unknown"]) == {}
+        assert await memento_group.get_memento("record_2").load() == update_datetimes["record_2"]
+
+    async def test_bulk_operations_are_timed(self, session_factory, update_datetimes):
+        metrics_hook = RecordingMetricsHook()
+        memento_group = AsyncUpdateDatetimeMementoGroupWithDBRepo(
+            session_factory,
+            AsyncUpdateDatetimeDBRepository(session_factory),
+            metrics_hook=metrics_hook,
+            group_name="records"
+        )
+        await memento_group.store_many(update_datetimes)
+        await memento_group.load_many(update_datetimes)
+
+        assert metrics_hook.memento_operations == [("records", "store_many"), ("records", "load_many")]
@@ -0,0 +1,225 @@
+from datetime import timedelta, datetime, timezone
+import threading
+from time import sleep
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import scoped_session, sessionmaker, Session
+
+from updatable_items_for_tests import SyncSleepingUpdatableItem
+from updater.update_datetime_memento.update_datetime_db_repository import \
+    UpdateDatetimeDBRecord, \
+    UpdateDatetimeDBRepository
+from updater.update_datetime_memento.update_datetime_memento import WriteBehindUpdateDatetimeMementoWithDBRepo
+from updater.update_datetime_memento.update_datetime_write_behind_buffer import UpdateDatetimeWriteBehindBuffer
+from updater.updater_service.sync_updater_service import SyncUpdaterService
+
+
+class TestUpdateDatetimeWriteBehind:
+
+    @pytest.fixture
+    def engine(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'update_datetime.sqlite'}")
+        with engine.begin() as conn:
+            UpdateDatetimeDBRecord.metadata.drop_all(conn)
+            UpdateDatetimeDBRecord.metadata.create_all(conn)
+        return engine
+
+    @pytest.fixture
+    def executed_statements(self, engine):
+        executed_statements = []
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def receive_before_cursor_execute(conn, cursor, statement, *args):
+            executed_statements.append(statement)
+
+        return executed_statements
+
+    @pytest.fixture
+    def session_factory(self, engine):
+        db_session_maker = sessionmaker(
+            autocommit=False,
+            bind=engine,
+            class_=Session
+        )
+        return scoped_session(db_session_maker)
+
+    @pytest.fixture
+    def repository(self, session_factory):
+        return UpdateDatetimeDBRepository(session_factory)
+
+    @pytest.fixture
+    def write_behind_buffer(self, session_factory, repository):
+        return UpdateDatetimeWriteBehindBuffer(session_factory, repository, max_pending_count=10)
+
+    def _create_memento(self, session_factory, repository, write_behind_buffer, memento_name):
+        return WriteBehindUpdateDatetimeMementoWithDBRepo(
+            db_session_factory=session_factory,
+            update_datetime_repository=repository,
+            write_behind_buffer=write_behind_buffer,
+            memento_name=memento_name
+        )
+
+    def _load_stored_update_datetimes(self, session_factory, repository):
+        with session_factory.begin():
+            stored_update_datetimes = repository.get_all_last_updates_datetime()
+        session_factory.remove()
+        return stored_update_datetimes
+
+    def test_stores_are_buffered_until_flush(self,
+                                             session_factory,
+                                             repository,
+                                             write_behind_buffer,
+                                             executed_statements):
+        memento_names = [f"memento_{i}" for i in range(3)]
+        mementos = [
+            self._create_memento(session_factory, repository, write_behind_buffer, memento_name)
+            for memento_name in memento_names
+        ]
+        datetime_now = datetime.now(tz=timezone.utc)
+
+        with write_behind_buffer:
+            for memento in mementos:
+                memento.store(datetime_now)
+                assert memento.load() == datetime_now
+            assert not [statement for statement in executed_statements if not statement.startswith("SELECT")]
+            assert write_behind_buffer.get_pending_count() == 3
+
+        assert write_behind_buffer.get_pending_count() == 0
+        assert write_behind_buffer.get_last_flush_duration() is not None
+        stored_update_datetimes = self._load_stored_update_datetimes(session_factory, repository)
+        for memento_name, memento in zip(memento_names, mementos):
+            assert stored_update_datetimes[memento_name] == datetime_now
+            assert memento.load() == datetime_now
+
+    def test_flush_on_pending_count(self, session_factory, repository, write_behind_buffer):
+        datetime_now = datetime.now(tz=timezone.utc)
+        for i in range(10):
+            memento = self._create_memento(session_factory, repository, write_behind_buffer, f"memento_{i}")
+            memento.store(datetime_now)
+
+        assert write_behind_buffer.get_pending_count() == 0
+        assert len(self._load_stored_update_datetimes(session_factory, repository)) == 10
+
+    @pytest.mark.timeout(60)
+    def test_stopped_service_flushes_buffer(self, session_factory, repository, write_behind_buffer):
+        item_to_update = SyncSleepingUpdatableItem(
+            update_datetime_memento=self._create_memento(
+                session_factory, repository, write_behind_buffer, "item_to_update"
+            ),
+            update_interval=timedelta(hours=1)
+        )
+        updater_service = SyncUpdaterService(item_to_update, update_cycle_contexts=[write_behind_buffer])
+
+        updater_service.start_service()
+        while not updater_service.is_running():
+            sleep(1)
+        updater_service.stop_service()
+        updater_service.join()
+
+        stored_update_datetimes = self._load_stored_update_datetimes(session_factory, repository)
+        assert stored_update_datetimes["item_to_update"] == item_to_update.get_last_update_datetime()
+
+    def test_failed_flush_keeps_pending_update_datetimes(self,
+                                                         monkeypatch,
+                                                         session_factory,
+                                                         repository,
+                                                         write_behind_buffer):
+        def set_many_last_update_datetime(*_):
+            raise OperationalError("UPDATE", {}, Exception("database is locked"))
+
+        memento = self._create_memento(session_factory, repository, write_behind_buffer, "memento")
+        datetime_now = datetime.now(tz=timezone.utc)
+        with monkeypatch.context() as patch:
+            patch.setattr(repository, "set_many_last_update_datetime", set_many_last_update_datetime)
+            with write_behind_buffer:
+                memento.store(datetime_now)
+            assert write_behind_buffer.get_pending_count() == 1
+            assert memento.load() == datetime_now
+
+        write_behind_buffer.flush()
+        assert self._load_stored_update_datetimes(session_factory, repository) == {"memento": datetime_now}
+
+    @pytest.mark.timeout(60)
+    def test_service_survives_failed_flush(self, monkeypatch, session_factory, repository):
+        write_behind_buffer = UpdateDatetimeWriteBehindBuffer(
+            session_factory,
+            repository,
+            flush_retry_delay=timedelta(seconds=0.2)
+        )
+        flush_failed_event = threading.Event()
+        set_many_last_update_datetime = repository.set_many_last_update_datetime
+
+        def fail_set_many_last_update_datetime(*_):
+            flush_failed_event.set()
+            raise OperationalError("UPDATE", {}, Exception("database is locked"))
+
+        item_to_update = SyncSleepingUpdatableItem(
+            update_datetime_memento=self._create_memento(
+                session_factory, repository, write_behind_buffer, "item_to_update"
+            ),
+            update_interval=timedelta(hours=1)
+        )
+        updater_service = SyncUpdaterService(item_to_update, update_cycle_contexts=[write_behind_buffer])
+        monkeypatch.setattr(repository, "set_many_last_update_datetime", fail_set_many_last_update_datetime)
+
+        updater_service.start_service()
+        assert flush_failed_event.wait(30)
+        sleep(0.5)
+        assert updater_service.is_running()
+        assert write_behind_buffer.get_pending_count() == 1
+
+        monkeypatch.setattr(repository, "set_many_last_update_datetime", set_many_last_update_datetime)
+        while write_behind_buffer.get_pending_count():
+            sleep(0.1)
+        updater_service.stop_service()
+        updater_service.join()
+
+        stored_update_datetimes = self._load_stored_update_datetimes(session_factory, repository)
+        assert stored_update_datetimes["item_to_update"] == item_to_update.get_last_update_datetime()
+
+    @pytest.mark.timeout(60)
+    def test_stopped_service_retries_failed_flush(self, monkeypatch, session_factory, repository):
+        write_behind_buffer = UpdateDatetimeWriteBehindBuffer(session_factory, repository)
+        flush_failed_event = threading.Event()
+        set_many_last_update_datetime = repository.set_many_last_update_datetime
+
+        def fail_set_many_last_update_datetime(*_):
+            flush_failed_event.set()
+            raise OperationalError("UPDATE", {}, Exception("database is locked"))
+
+        item_to_update = SyncSleepingUpdatableItem(
+            update_datetime_memento=self._create_memento(
+                session_factory, repository, write_behind_buffer, "item_to_update"
+            ),
+            update_interval=timedelta(hours=1)
+        )
+        updater_service = SyncUpdaterService(item_to_update, update_cycle_contexts=[write_behind_buffer])
+        monkeypatch.setattr(repository, "set_many_last_update_datetime", fail_set_many_last_update_datetime)
+
+        updater_service.start_service()
+        assert flush_failed_event.wait(30)
+        while write_behind_buffer.get_next_wake_up_datetime() is None:
+            sleep(0.1)
+        monkeypatch.setattr(repository, "set_many_last_update_datetime", set_many_last_update_datetime)
+        updater_service.stop_service()
+        updater_service.join()
+
+        assert write_behind_buffer.get_pending_count() == 0
+        stored_update_datetimes = self._load_stored_update_datetimes(session_factory, repository)
+        assert stored_update_datetimes["item_to_update"] == item_to_update.get_last_update_datetime()
+
+    def test_stop_raises_when_flush_still_fails(self, monkeypatch, session_factory, repository, write_behind_buffer):
+        def set_many_last_update_datetime(*_):
+            raise OperationalError("UPDATE", {}, Exception("database is locked"))
+
+        memento = self._create_memento(session_factory, repository, write_behind_buffer, "memento")
+        monkeypatch.setattr(repository, "set_many_last_update_datetime", set_many_last_update_datetime)
+        with write_behind_buffer:
+            memento.store(datetime.now(tz=timezone.utc))
+        assert write_behind_buffer.get_next_wake_up_datetime() is not None
+
+        with pytest.raises(OperationalError):
+            write_behind_buffer.on_service_stop()
+        assert write_behind_buffer.get_pending_count() == 1
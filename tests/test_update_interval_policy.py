@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+import pytest
+
+from updater.updatable_item import AbstractSyncUpdatableItem
+from updater.update_interval_policy import AdaptiveUpdateIntervalPolicy
+from updater.update_keychain import UpdateKeychain
+
+
+class SyncChangingUpdatableItem(AbstractSyncUpdatableItem):
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.changed = False
+
+    def _run_update(self) -> bool:
+        return self.changed
+
+
+class TestAdaptiveUpdateIntervalPolicy:
+
+    @pytest.fixture
+    def update_interval_policy(self):
+        return AdaptiveUpdateIntervalPolicy(
+            min_update_interval=timedelta(seconds=10),
+            max_update_interval=timedelta(seconds=60),
+            initial_update_interval=timedelta(seconds=20)
+        )
+
+    @pytest.fixture
+    def item(self, update_interval_policy):
+        return SyncChangingUpdatableItem(update_interval_policy=update_interval_policy)
+
+    def test_interval_is_bounded(self, update_interval_policy):
+        update_interval_policy.on_update(changed=False)
+        assert update_interval_policy.get_update_interval() == timedelta(seconds=40)
+        update_interval_policy.on_update(changed=False)
+        assert update_interval_policy.get_update_interval() == timedelta(seconds=60)
+
+        for _ in range(3):
+            update_interval_policy.on_update(changed=True)
+        assert update_interval_policy.get_update_interval() == timedelta(seconds=10)
+
+    def test_item_update_adapts_next_update_datetime(self, item):
+        item.update()
+        assert item.get_next_update_datetime() - item.get_last_update_datetime() == timedelta(seconds=40)
+
+        item.changed = True
+        item.update()
+        assert item.get_next_update_datetime() - item.get_last_update_datetime() == timedelta(seconds=20)
+
+    def test_invalid_arguments(self, update_interval_policy):
+        with pytest.raises(ValueError):
+            AdaptiveUpdateIntervalPolicy(timedelta(seconds=60), timedelta(seconds=10))
+        with pytest.raises(ValueError):
+            UpdateKeychain(update_interval=timedelta(seconds=10), update_interval_policy=update_interval_policy)
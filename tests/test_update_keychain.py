@@ -70,3 +70,26 @@ class TestUpdaterKeychain:
         datetime2 = datetime.now(tz=timezone.utc)
 
         assert is_need_update_item(keychain_7, datetime2) is True
+
+    def test_update_jitter_is_deterministic_and_bounded(self):
+        update_interval = timedelta(seconds=600)
+        last_update_datetime = datetime.now(tz=timezone.utc)
+        next_update_datetimes = set()
+        for item_number in range(20):
+            keychain = UpdateKeychain(
+                update_interval=update_interval,
+                update_jitter=0.5,
+                jitter_key=f"keychain_{item_number}"
+            )
+            keychain.set_last_update_datetime(last_update_datetime)
+            next_update_datetime = keychain.get_next_update_datetime()
+            assert keychain.get_next_update_datetime() == next_update_datetime
+            assert last_update_datetime + update_interval <= next_update_datetime
+            assert next_update_datetime < last_update_datetime + update_interval * 1.5
+            next_update_datetimes.add(next_update_datetime)
+
+        assert len(next_update_datetimes) == 20
+        with pytest.raises(ValueError):
+            UpdateKeychain(update_interval=update_interval, update_jitter=2, jitter_key="keychain")
+        with pytest.raises(ValueError):
+            UpdateKeychain(update_interval=update_interval, update_jitter=0.5)
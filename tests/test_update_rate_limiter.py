@@ -0,0 +1,47 @@
+import time
+
+import pytest
+
+from updatable_items_for_tests import SyncSleepingUpdatableItem
+from updater.update_rate_limiter import UpdateRateLimiter
+from updater.updater_service.sync_updater_service import SyncUpdaterService
+
+
+class TestUpdateRateLimiter:
+
+    @pytest.fixture
+    def clock(self):
+        return [0.0]
+
+    @pytest.fixture
+    def rate_limiter(self, clock):
+        return UpdateRateLimiter(updates_per_second=2, burst=2, clock=lambda: clock[0])
+
+    def test_reserve(self, rate_limiter, clock):
+        assert rate_limiter.reserve() == 0
+        assert rate_limiter.reserve() == 0
+        assert rate_limiter.reserve() == 0.5
+        assert rate_limiter.reserve() == 1.0
+
+        clock[0] = 10.0
+        assert rate_limiter.reserve() == 0
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            UpdateRateLimiter(updates_per_second=0)
+
+    @pytest.mark.timeout(60)
+    def test_service_updates_are_rate_limited(self):
+        items = [SyncSleepingUpdatableItem(time_to_sleep=0) for _ in range(4)]
+        item_to_update = SyncSleepingUpdatableItem(time_to_sleep=0, dependencies=items)
+        updater_service = SyncUpdaterService(item_to_update, rate_limiter=UpdateRateLimiter(updates_per_second=10))
+
+        start_time = time.monotonic()
+        updater_service.start_service()
+        while item_to_update.update_count == 0:
+            time.sleep(0.01)
+        elapsed_time = time.monotonic() - start_time
+        updater_service.stop_service()
+        updater_service.join()
+
+        assert elapsed_time >= 0.4
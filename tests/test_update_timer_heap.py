@@ -0,0 +1,57 @@
+from datetime import timedelta, datetime, timezone
+
+import pytest
+
+from updater.update_keychain import UpdateKeychain
+from updater.update_timer_heap import UpdateTimerHeap
+
+
+class TestUpdateTimerHeap:
+
+    @pytest.fixture
+    def datetime_now(self):
+        return datetime.now(tz=timezone.utc)
+
+    @pytest.fixture
+    def keychains(self):
+        return [UpdateKeychain() for _ in range(5)]
+
+    @pytest.fixture
+    def update_timer_heap(self, keychains, datetime_now):
+        update_timer_heap = UpdateTimerHeap()
+        for i, keychain in enumerate(keychains):
+            update_timer_heap.schedule(keychain, datetime_now + timedelta(seconds=10 * (i + 1)))
+        return update_timer_heap
+
+    def test_pop_only_due_items(self, update_timer_heap, keychains, datetime_now):
+        assert update_timer_heap.peek_next_due_datetime() == datetime_now + timedelta(seconds=10)
+        assert update_timer_heap.pop_due_items(datetime_now) == []
+        assert update_timer_heap.pop_due_items(datetime_now + timedelta(seconds=25)) == keychains[:2]
+        assert len(update_timer_heap) == 3
+        assert keychains[0] not in update_timer_heap
+
+    def test_decrease_and_increase_key(self, update_timer_heap, keychains, datetime_now):
+        update_timer_heap.schedule(keychains[4], datetime_now + timedelta(seconds=1))
+        update_timer_heap.schedule(keychains[0], datetime_now + timedelta(seconds=100))
+
+        assert update_timer_heap.peek_next_due_datetime() == datetime_now + timedelta(seconds=1)
+        assert update_timer_heap.get_due_datetime(keychains[0]) == datetime_now + timedelta(seconds=100)
+        assert update_timer_heap.pop_due_items(datetime_now + timedelta(seconds=50)) == keychains[4:] + keychains[1:4]
+        assert update_timer_heap.pop_due_items(datetime_now + timedelta(seconds=100)) == keychains[:1]
+        assert update_timer_heap.peek_next_due_datetime() is None
+
+    def test_cancel(self, update_timer_heap, keychains, datetime_now):
+        update_timer_heap.cancel(keychains[0])
+
+        assert update_timer_heap.peek_next_due_datetime() == datetime_now + timedelta(seconds=20)
+        assert keychains[0] not in update_timer_heap.pop_due_items(datetime_now + timedelta(seconds=100))
+
+    def test_many_reschedules(self, keychains, datetime_now):
+        update_timer_heap = UpdateTimerHeap()
+        for i in range(1000):
+            for keychain in keychains:
+                update_timer_heap.schedule(keychain, datetime_now + timedelta(seconds=i))
+
+        assert len(update_timer_heap) == len(keychains)
+        assert update_timer_heap.pop_due_items(datetime_now + timedelta(seconds=998)) == []
+        assert len(update_timer_heap.pop_due_items(datetime_now + timedelta(seconds=999))) == len(keychains)
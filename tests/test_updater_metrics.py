@@ -0,0 +1,96 @@
+from datetime import timedelta
+from time import sleep
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker, Session
+
+from updatable_items_for_tests import SyncSleepingUpdatableItem
+from updater.metrics import UpdaterMetrics
+from updater.update_datetime_memento.update_datetime_db_repository import \
+    UpdateDatetimeDBRecord, \
+    UpdateDatetimeDBRepository
+from updater.update_datetime_memento.update_datetime_memento import UpdateDatetimeMementoWithDBRepo
+from updater.updater_service.sync_updater_service import SyncUpdaterService
+
+
+class TestUpdaterMetrics:
+
+    @pytest.fixture
+    def metrics(self):
+        return UpdaterMetrics(duration_buckets=(0.01, 1.0))
+
+    @pytest.fixture
+    def item_1(self):
+        return SyncSleepingUpdatableItem(time_to_sleep=0.05)
+
+    @pytest.fixture
+    def item_to_update(self, item_1):
+        return SyncSleepingUpdatableItem(
+            time_to_sleep=0,
+            update_interval=timedelta(hours=1),
+            dependencies=[item_1]
+        )
+
+    def test_histogram_rendering(self, metrics, item_1):
+        metrics.on_item_update(item_1, 0.005, True)
+        metrics.on_item_update(item_1, 0.5, True)
+        metrics.on_item_update(item_1, 2.0, False)
+        metrics.on_update_cycle(0.5)
+        metrics.on_forced_items_queue_depth(3)
+
+        prometheus_text = metrics.render_prometheus_text()
+
+        assert 'updater_item_update_duration_seconds_bucket{item="SyncSleepingUpdatableItem",le="0.01"} 1' \
+               in prometheus_text
+        assert 'updater_item_update_duration_seconds_bucket{item="SyncSleepingUpdatableItem",le="1.0"} 2' \
+               in prometheus_text
+        assert 'updater_item_update_duration_seconds_bucket{item="SyncSleepingUpdatableItem",le="+Inf"} 3' \
+               in prometheus_text
+        assert 'updater_item_updates_total{item="SyncSleepingUpdatableItem",result="failure"} 1' in prometheus_text
+        assert 'updater_item_updates_total{item="SyncSleepingUpdatableItem",result="success"} 2' in prometheus_text
+        assert "updater_update_cycle_duration_seconds_count 1" in prometheus_text
+        assert "updater_forced_items_queue_depth 3" in prometheus_text
+        assert metrics.get_item_updates_count(item_1) == 2
+        assert metrics.get_item_updates_count(item_1, succeeded=False) == 1
+
+    @pytest.mark.timeout(60)
+    def test_service_reports_metrics(self, item_1, item_to_update):
+        item_labels = {item_1: "item_1", item_to_update: "item_to_update"}
+        metrics = UpdaterMetrics(item_label_getter=item_labels.__getitem__)
+        updater_service = SyncUpdaterService(item_to_update, metrics_hook=metrics)
+        updater_service.start_service()
+        while not updater_service.is_running():
+            sleep(0.1)
+        while item_to_update.update_count == 0:
+            sleep(0.1)
+        updater_service.force_item_update(item_1)
+        while item_to_update.update_count < 2:
+            sleep(0.1)
+        updater_service.stop_service()
+        updater_service.join()
+
+        prometheus_text = metrics.render_prometheus_text()
+
+        assert metrics.get_item_updates_count(item_1) == 2
+        assert metrics.get_item_updates_count(item_to_update) == 2
+        assert 'updater_item_staleness_lag_seconds{item="item_to_update"}' in prometheus_text
+        assert "updater_forced_items_queue_depth 1" in prometheus_text
+
+    def test_db_memento_reports_metrics(self, metrics):
+        engine = create_engine("sqlite:///:memory:")
+        with engine.begin() as conn:
+            UpdateDatetimeDBRecord.metadata.create_all(conn)
+        session_factory = scoped_session(sessionmaker(autocommit=False, bind=engine, class_=Session))
+        repository = UpdateDatetimeDBRepository(session_factory)
+        memento = UpdateDatetimeMementoWithDBRepo(
+            session_factory,
+            repository,
+            "memento",
+            metrics_hook=metrics
+        )
+
+        memento.load()
+
+        assert 'updater_memento_operation_duration_seconds_count{memento="memento",operation="load"} 1' \
+               in metrics.render_prometheus_text()
@@ -13,8 +13,10 @@ class AsyncSleepingUpdatableItem(AbstractAsyncUpdatableItem):
                  ) -> None:
         super().__init__(*args, **kwargs)
         self._time_to_sleep = time_to_sleep
+        self.update_count = 0
 
     async def _run_update(self) -> None:
+        self.update_count += 1
         await asyncio.sleep(self._time_to_sleep)
 
 
@@ -27,6 +29,40 @@ class SyncSleepingUpdatableItem(AbstractSyncUpdatableItem):
                  ) -> None:
         super().__init__(*args, **kwargs)
         self._time_to_sleep = time_to_sleep
+        self.update_count = 0
 
     def _run_update(self) -> None:
+        self.update_count += 1
         sleep(self._time_to_sleep)
+
+
+class AsyncFailingUpdatableItem(AsyncSleepingUpdatableItem):
+
+    def __init__(self,
+                 *args,
+                 failures_count: int = 1,
+                 **kwargs
+                 ) -> None:
+        super().__init__(*args, **kwargs)
+        self._failures_count = failures_count
+
+    async def _run_update(self) -> None:
+        await super()._run_update()
+        if self.update_count <= self._failures_count:
+            raise RuntimeError(f"Update {self.update_count} failed")
+
+
+class SyncFailingUpdatableItem(SyncSleepingUpdatableItem):
+
+    def __init__(self,
+                 *args,
+                 failures_count: int = 1,
+                 **kwargs
+                 ) -> None:
+        super().__init__(*args, **kwargs)
+        self._failures_count = failures_count
+
+    def _run_update(self) -> None:
+        super()._run_update()
+        if self.update_count <= self._failures_count:
+            raise RuntimeError(f"Update {self.update_count} failed")